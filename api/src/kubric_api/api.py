@@ -1,3 +1,7 @@
+import asyncio
+import base64
+import binascii
+import hashlib
 import io
 import shutil
 import sys
@@ -5,19 +9,26 @@ from contextlib import asynccontextmanager
 from uuid import uuid4
 from pathlib import Path
 from enum import Enum
+from email.utils import format_datetime
 
 import click
 from fastapi import BackgroundTasks, FastAPI, File, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 # from loguru import logger
 import logging
 from kubric_api.models import VideoUploadResponse
 from kubric_api.models import ProcessVideoRequest
+from kubric_api.models import CompleteUploadRequest, PresignUploadRequest, PresignUploadResponse
 from fastmcp.client import Client
+from minio.error import S3Error
 from kubric_api.config import get_settings
-from kubric_api.dependencies import MinIOClient
+from kubric_api.db import init_db
+from kubric_api.dependencies import ContentIndex, MinIOClient, ResumableUploads
+from kubric_api.services.content_index import ContentIndexService
+from kubric_api.services.resumable import UploadError, UploadState
+from kubric_api.streaming import etag_matches, hash_chunks, parse_byte_range, read_file_part
 import uuid
 
 # Get the directory where this file is located
@@ -35,6 +46,11 @@ LOGS_DIR.mkdir(exist_ok=True)
 logger = logging.getLogger("uvicorn")
 
 
+TUS_VERSION = "1.0.0"
+# ingestion tool registered by the MCP server (kubric_mcp.server)
+PROCESS_VIDEO_TOOL = "process_video"
+
+
 class TaskStatus(str, Enum):
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -46,6 +62,11 @@ class TaskStatus(str, Enum):
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     app.state.bg_task_status = dict()
+    try:
+        await asyncio.to_thread(init_db)
+    except Exception as e:
+        # only resumable uploads need the database
+        logger.error(f"Error initializing database : {e}")
     yield
     # app.state.agent.reset_memory()
 
@@ -57,17 +78,27 @@ app = FastAPI(
 )
 
 
+STREAMED_CONTENT_TYPES = ("multipart/form-data", "application/octet-stream", "application/offset+octet-stream")
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
+    # Uploads are streamed by their endpoints, reading them here would
+    # buffer the whole video in memory
+    if request.headers.get("content-type", "").startswith(STREAMED_CONTENT_TYPES):
+        logger.info(
+            f"📥 {request.method} {request.url.path} | Body: <streamed upload>")
+        response = await call_next(request)
+        logger.info(
+            f"📤 {request.method} {request.url.path} | Status: {response.status_code}")
+        return response
+
     # Read and log the request body
     body = await request.body()
 
-    # Create a new receive function that returns the body
-    async def receive():
-        return {"type": "http.request", "body": body}
-
-    # Replace the request's receive with our custom one
-    request._receive = receive
+    # BaseHTTPMiddleware replays the cached body to the endpoint, replacing
+    # request._receive would also swallow the client's disconnect message
+    # that streaming responses listen for
 
     # Log the request details
     try:
@@ -91,9 +122,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-
+    expose_headers=["Location", "Tus-Resumable", "Upload-Offset", "Upload-Length",
+                    "Upload-Part-Size", "Upload-Parts", "Upload-Object-Name", "Upload-Task-Id",
+                    "Accept-Ranges", "Content-Range", "Content-Length", "ETag"],
 )
 
+
+@app.exception_handler(UploadError)
+async def upload_error_handler(request: Request, exc: UploadError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail},
+                        headers={"Tus-Resumable": TUS_VERSION})
+
 app.mount("/media", StaticFiles(directory=str(SHARED_MEDIA_DIR)), name="media")
 
 
@@ -106,33 +145,274 @@ async def root():
 
 
 @app.post("/upload-video", response_model=VideoUploadResponse)
-async def upload_video(file: UploadFile = File(...), minio: MinIOClient = None):
+async def upload_video(request: Request, minio: MinIOClient = None, content_index: ContentIndex = None):
     """
     Upload a video and return the path
+
+    The multipart body is parsed as it arrives and the `file` field is
+    streamed straight into a MinIO multipart upload while its SHA-256 is
+    computed. A file uploaded before resolves to the existing object
     """
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="no file upload")
+    part, chunks = await read_file_part(request, field_name="file")
     video_id = uuid.uuid4()
-    file_ext = Path(file.filename).suffix.lower()
+    file_ext = Path(part.filename).suffix.lower()
     object_name = f"{video_id}{file_ext}"
-    content = await file.read()
+    digest = hashlib.sha256()
     logger.info("uploading ")
     try:
-        object_name = minio.upload_file(
-            file_data=io.BytesIO(content),
+        size = await minio.upload_stream(
+            hash_chunks(chunks, digest),
             object_name=object_name,
-            content_type=file.content_type,
-            metadata={
-                "original_filename": file.filename,
-                "video_id": str(video_id)
-            }
+            content_type=part.content_type,
+            metadata=minio.upload_metadata(str(video_id), part.filename)
         )
+        video_path = await asyncio.to_thread(
+            content_index.deduplicate, digest.hexdigest(), object_name, size)
+        if video_path != object_name:
+            return VideoUploadResponse(message="Video already uploaded", video_path=video_path)
 
         return VideoUploadResponse(message="Video uploaded successfully", video_path=str(object_name))
 
     except Exception as e:
-        logger.error("Error uploading videos : {e}")
+        logger.error(f"Error uploading videos : {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/uploads/presign", response_model=PresignUploadResponse)
+async def presign_upload(request: PresignUploadRequest, minio: MinIOClient = None):
+    """
+    Issue a presigned PUT URL so the client uploads the video straight to
+    MinIO, then calls /uploads/complete
+    """
+    if not request.filename:
+        raise HTTPException(status_code=400, detail="no file upload")
+    video_id = str(uuid.uuid4())
+    object_name = f"{video_id}{Path(request.filename).suffix.lower()}"
+    try:
+        upload_url, headers = await asyncio.to_thread(
+            minio.presigned_upload, object_name, request.content_type,
+            minio.upload_metadata(video_id, request.filename))
+    except Exception as e:
+        logger.error(f"Error presigning upload : {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    return PresignUploadResponse(
+        video_id=video_id,
+        object_name=object_name,
+        upload_url=upload_url,
+        headers=headers,
+        expires_in=settings.MINIO_PRESIGNED_EXPIRY_SECONDS,
+    )
+
+
+async def index_upload(content_index: ContentIndexService, object_name: str) -> str:
+    """
+    Hash and claim an upload that went straight to MinIO, returns the object
+    holding its content
+    """
+    try:
+        return await asyncio.to_thread(content_index.index_object, object_name)
+    except Exception as e:
+        # the upload itself is complete, it is kept as is even when it duplicates another
+        logger.error(f"Error indexing upload {object_name} : {e}")
+        return object_name
+
+
+@app.post("/uploads/complete", response_model=VideoUploadResponse)
+async def complete_upload(request: CompleteUploadRequest, bg_tasks: BackgroundTasks, fastapi_request: Request,
+                          minio: MinIOClient = None, content_index: ContentIndex = None):
+    """
+    Confirm a presigned upload and start processing the video. The object is
+    hashed like streamed uploads, a duplicate resolves to the existing copy
+    """
+    try:
+        video_id = str(uuid.UUID(Path(request.object_name).stem))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="object name was not issued by /uploads/presign")
+    try:
+        await asyncio.to_thread(
+            minio.finalize_upload, request.object_name,
+            minio.upload_metadata(video_id, request.original_filename))
+    except S3Error as e:
+        status_code = 404 if e.code in ("NoSuchKey", "NoSuchObject") else 500
+        raise HTTPException(status_code=status_code, detail=str(e))
+
+    video_path = await index_upload(content_index, request.object_name)
+    message = "Video already uploaded" if video_path != request.object_name else "Video uploaded successfully"
+    task_id = schedule_processing(bg_tasks, fastapi_request, video_path)
+    return VideoUploadResponse(message=message, video_path=video_path, task_id=task_id)
+
+
+def parse_upload_metadata(header: str) -> dict:
+    """tus Upload-Metadata: comma separated `key base64(value)` pairs"""
+    metadata = {}
+    for pair in filter(None, (item.strip() for item in header.split(","))):
+        key, _, value = pair.partition(" ")
+        try:
+            metadata[key] = base64.b64decode(value).decode("utf-8") if value else ""
+        except (binascii.Error, UnicodeDecodeError):
+            raise HTTPException(status_code=400, detail=f"invalid Upload-Metadata value for {key}")
+    return metadata
+
+
+def upload_headers(state: UploadState) -> dict:
+    return {
+        "Tus-Resumable": TUS_VERSION,
+        "Upload-Offset": str(state.offset),
+        "Upload-Length": str(state.length),
+        "Upload-Part-Size": str(state.part_size),
+        "Upload-Parts": ",".join(map(str, state.committed_parts)),
+        "Cache-Control": "no-store",
+    }
+
+
+@app.post("/uploads/resumable", status_code=201)
+async def create_resumable_upload(fastapi_request: Request, uploads: ResumableUploads = None):
+    """
+    Create a resumable upload (tus creation). Expects `Upload-Length` and an
+    `Upload-Metadata` with the filename; the response's `Location` is the
+    upload URL and `Upload-Part-Size` the size every PATCH must carry
+    """
+    try:
+        length = int(fastapi_request.headers["upload-length"])
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="Upload-Length header is required")
+    metadata = parse_upload_metadata(fastapi_request.headers.get("upload-metadata", ""))
+    if not metadata.get("filename"):
+        raise HTTPException(status_code=400, detail="no file upload")
+    state = await asyncio.to_thread(
+        uploads.create, metadata["filename"], metadata.get("filetype") or "video/mp4", length)
+    return Response(status_code=201, headers={
+        **upload_headers(state),
+        "Location": str(fastapi_request.url_for("resumable_upload_offset", upload_id=state.upload_id)),
+    })
+
+
+@app.head("/uploads/resumable/{upload_id}", name="resumable_upload_offset")
+async def resumable_upload_offset(upload_id: str, uploads: ResumableUploads = None):
+    """
+    Offset to resume from, plus every committed part for parallel clients
+    """
+    state = await asyncio.to_thread(uploads.get, upload_id)
+    return Response(status_code=200, headers=upload_headers(state))
+
+
+@app.patch("/uploads/resumable/{upload_id}")
+async def upload_resumable_part(upload_id: str, fastapi_request: Request, bg_tasks: BackgroundTasks,
+                                uploads: ResumableUploads = None, content_index: ContentIndex = None):
+    """
+    Upload the part starting at `Upload-Offset`. Unlike tus core, any part
+    aligned to `Upload-Part-Size` is accepted so parts can go in parallel.
+    The request that commits the last part completes the upload, hashes it
+    and starts processing; `Upload-Object-Name` is the existing copy for a
+    duplicate
+    """
+    if fastapi_request.headers.get("content-type") != "application/offset+octet-stream":
+        raise HTTPException(status_code=415, detail="expected application/offset+octet-stream")
+    try:
+        offset = int(fastapi_request.headers["upload-offset"])
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="Upload-Offset header is required")
+
+    # the part size is fixed when the upload is created, the setting may have changed since
+    state = await asyncio.to_thread(uploads.get, upload_id)
+    data = bytearray()
+    async for chunk in fastapi_request.stream():
+        data += chunk
+        if len(data) > state.part_size:
+            raise HTTPException(status_code=413, detail="a PATCH carries at most one part")
+    state, completed = await asyncio.to_thread(uploads.write_part, upload_id, offset, bytes(data))
+
+    headers = upload_headers(state)
+    if completed:
+        video_path = await index_upload(content_index, state.object_name)
+        headers["Upload-Object-Name"] = video_path
+        headers["Upload-Task-Id"] = schedule_processing(bg_tasks, fastapi_request, video_path)
+    return Response(status_code=204, headers=headers)
+
+
+@app.delete("/uploads/resumable/{upload_id}", status_code=204)
+async def abort_resumable_upload(upload_id: str, uploads: ResumableUploads = None):
+    """
+    Abort an upload and drop its parts (tus termination)
+    """
+    await asyncio.to_thread(uploads.abort, upload_id)
+    return Response(status_code=204, headers={"Tus-Resumable": TUS_VERSION})
+
+
+@app.api_route("/videos/{object_name:path}", methods=["GET", "HEAD"])
+async def stream_video(object_name: str, fastapi_request: Request, minio: MinIOClient = None):
+    """
+    Serve a video from MinIO with Range support for playback and seeking.
+    Ranges become ranged GETs against MinIO and the bytes are streamed
+    through. ETag / If-None-Match / If-Range let browsers and CDNs cache
+    segments
+    """
+    try:
+        stat = await asyncio.to_thread(minio.stat_file, object_name)
+    except S3Error as e:
+        status_code = 404 if e.code in ("NoSuchKey", "NoSuchObject") else 500
+        raise HTTPException(status_code=status_code, detail=str(e))
+
+    etag = f'"{stat.etag}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": settings.VIDEO_CACHE_CONTROL,
+    }
+    if stat.last_modified:
+        headers["Last-Modified"] = format_datetime(stat.last_modified, usegmt=True)
+    if etag_matches(fastapi_request.headers.get("if-none-match"), [etag]):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if_range = fastapi_request.headers.get("if-range")
+    if if_range is None or etag_matches(if_range, [etag]):
+        try:
+            byte_range = parse_byte_range(fastapi_request.headers.get("range"), stat.size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat.size}"})
+
+    status_code = 200
+    offset, length = 0, stat.size
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        offset, length = start, end - start + 1
+        headers["Content-Range"] = f"bytes {start}-{end}/{stat.size}"
+    headers["Content-Length"] = str(length)
+    media_type = stat.content_type or "application/octet-stream"
+
+    if fastapi_request.method == "HEAD" or length == 0:
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    # a sync iterator, Starlette pulls it from its threadpool
+    body = minio.iter_file(object_name, offset=offset, length=length,
+                           chunk_size=settings.VIDEO_STREAM_CHUNK_SIZE)
+    return StreamingResponse(body, status_code=status_code, headers=headers, media_type=media_type)
+
+
+def schedule_processing(bg_tasks: BackgroundTasks, fastapi_request: Request, video_path: str) -> str:
+    """Run the MCP ingestion of an uploaded video once the response is sent, returns the task id"""
+    task_id = str(uuid4())
+    bg_tasks.add_task(background_process_video, video_path, task_id, fastapi_request.app.state.bg_task_status)
+    return task_id
+
+
+async def background_process_video(video_path: str, task_id: str, bg_task_status: dict):
+    """
+    Background task to process the video
+    """
+    bg_task_status[task_id] = TaskStatus.IN_PROGRESS
+
+    try:
+        mcp_client = Client(settings.MCP_SERVER)
+        async with mcp_client:
+            result = await mcp_client.call_tool(PROCESS_VIDEO_TOOL, {"video_path": video_path})
+            logger.info(f"Video processing result: {result}")
+        bg_task_status[task_id] = TaskStatus.COMPLETED
+    except Exception as e:
+        logger.error(f"Error processing video {video_path}: {e}")
+        bg_task_status[task_id] = TaskStatus.FAILED
+        # Don't raise HTTPException in background task as response is already sent
 
 
 @app.post("/process-video")
@@ -146,24 +426,8 @@ async def process_video(request: ProcessVideoRequest, bg_tasks: BackgroundTasks,
     # Log comprehensive request details
     logger.info(f"Received process_video request: {request.model_dump()}")
 
-    async def background_process_video(video_path: str, task_id: str):
-        """
-        Background task to process the video
-        """
-        bg_task_status[task_id] = TaskStatus.IN_PROGRESS
-
-        try:
-            mcp_client = Client(settings.MCP_SERVER)
-            async with mcp_client:
-                result = await mcp_client.call_tool("process_video", {"video_path": video_path})
-                logger.info(f"Video processing result: {result}")
-            bg_task_status[task_id] = TaskStatus.COMPLETED
-        except Exception as e:
-            logger.error(f"Error processing video {video_path}: {e}")
-            bg_task_status[task_id] = TaskStatus.FAILED
-            # Don't raise HTTPException in background task as response is already sent
     logger.error(f"Path to video, {request.video_path}")
-    bg_tasks.add_task(background_process_video, request.video_path, task_id)
+    bg_tasks.add_task(background_process_video, request.video_path, task_id, bg_task_status)
     # return ProcessVideoResponse(message="Task completed Successfully", task_id=task_id)
     return True
 
@@ -17,6 +17,19 @@ class Settings(BaseSettings):
     MINIO_SECRET_KEY: str
     MINIO_BUCKET_NAME: str
     MINIO_SECURE: str = False
+    # multipart part size for streamed uploads, S3 needs at least 5 MiB
+    MINIO_UPLOAD_PART_SIZE: int = 16 * 1024 * 1024
+    # request body chunks buffered between the request and the upload thread
+    MINIO_UPLOAD_QUEUE_CHUNKS: int = 64
+    # /upload-video bodies streamed to MinIO at once, further uploads wait for a thread
+    MINIO_STREAM_UPLOAD_WORKERS: int = 8
+    # endpoint the browser uses for presigned uploads, defaults to MINIO_ENDPOINT
+    MINIO_PUBLIC_ENDPOINT: str | None = None
+    MINIO_REGION: str = "us-east-1"
+    MINIO_PRESIGNED_EXPIRY_SECONDS: int = 3600
+    # objects are written once under fresh names, so served bytes never change
+    VIDEO_CACHE_CONTROL: str = "public, max-age=86400"
+    VIDEO_STREAM_CHUNK_SIZE: int = 256 * 1024
 
     # --- GROQ Configuration ---
     GROQ_API_KEY: str
@@ -2,7 +2,10 @@ from typing import Annotated
 from fastapi import Depends
 from kubric_api.config import get_settings, Settings
 
+from kubric_api.db import SessionLocal
 from kubric_api.services.minio import MinIOService, get_minio_service
+from kubric_api.services.content_index import ContentIndexService
+from kubric_api.services.resumable import ResumableUploadService
 
 
 def get_minio_client(
@@ -12,3 +15,21 @@ def get_minio_client(
 
 
 MinIOClient = Annotated[MinIOService, Depends(get_minio_client)]
+
+
+def get_resumable_upload_service(
+        settings: Annotated[Settings, Depends(get_settings)]
+) -> ResumableUploadService:
+    return ResumableUploadService(get_minio_service(settings), SessionLocal, settings.MINIO_UPLOAD_PART_SIZE)
+
+
+ResumableUploads = Annotated[ResumableUploadService, Depends(get_resumable_upload_service)]
+
+
+def get_content_index_service(
+        settings: Annotated[Settings, Depends(get_settings)]
+) -> ContentIndexService:
+    return ContentIndexService(get_minio_service(settings), SessionLocal)
+
+
+ContentIndex = Annotated[ContentIndexService, Depends(get_content_index_service)]
@@ -14,3 +14,21 @@ class ProcessVideoRequest(BaseModel):
 class ProcessVideoResponse(BaseModel):
     message: str
     task_id: str
+
+
+class PresignUploadRequest(BaseModel):
+    filename: str
+    content_type: str = "video/mp4"
+
+
+class PresignUploadResponse(BaseModel):
+    video_id: str
+    object_name: str
+    upload_url: str
+    headers: dict[str, str]
+    expires_in: int
+
+
+class CompleteUploadRequest(BaseModel):
+    object_name: str
+    original_filename: str
@@ -0,0 +1,84 @@
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import sessionmaker
+from typing import Optional
+import hashlib
+import logging
+
+from kubric_api.services.minio import MinIOService
+from kubric_api.tables import UploadedContent
+
+logger = logging.getLogger("uvicorn")
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ContentIndexService:
+    """
+    Content addressed index of uploaded videos, so a file uploaded twice is
+    stored and processed once
+    """
+
+    def __init__(self, minio: MinIOService, session_factory: sessionmaker):
+        self.minio = minio
+        self.session_factory = session_factory
+
+    def claim(self, content_sha256: str, object_name: str, size_bytes: int) -> Optional[str]:
+        """
+        Register `object_name` as the object for this content. Returns the
+        object already holding the same content, if there is one.
+        """
+        with self.session_factory() as session:
+            statement = insert(UploadedContent).values(
+                content_sha256=content_sha256, object_name=object_name, size_bytes=size_bytes)
+            inserted = session.execute(
+                statement.on_conflict_do_nothing(index_elements=[UploadedContent.content_sha256])
+                .returning(UploadedContent.object_name)
+            ).first()
+            if inserted is not None:
+                session.commit()
+                return None
+
+            existing = session.execute(
+                select(UploadedContent.object_name)
+                .where(UploadedContent.content_sha256 == content_sha256)
+                .with_for_update()
+            ).scalar_one()
+            if existing != object_name and self.minio.object_exists(existing):
+                session.commit()
+                return existing
+            # the earlier copy is gone, this upload takes its place
+            session.execute(
+                update(UploadedContent)
+                .where(UploadedContent.content_sha256 == content_sha256)
+                .values(object_name=object_name, size_bytes=size_bytes)
+            )
+            session.commit()
+            return None
+
+    def deduplicate(self, content_sha256: str, object_name: str, size_bytes: int) -> str:
+        """
+        Object name to use for a finished upload: the existing copy for
+        duplicate content, in which case the new object is removed, otherwise
+        `object_name`, tagged with its hash for the MCP
+        """
+        existing = self.claim(content_sha256, object_name, size_bytes)
+        if existing is not None:
+            self.minio.remove_file(object_name)
+            logger.info(f"Duplicate upload {object_name}, reusing {existing}")
+            return existing
+        self.minio.set_content_hash(object_name, content_sha256)
+        return object_name
+
+    def index_object(self, object_name: str) -> str:
+        """
+        Hash an object that was uploaded straight to MinIO (presigned or
+        resumable) by streaming it back, then deduplicate it like a streamed
+        upload. Returns the object name to use
+        """
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in self.minio.iter_file(object_name, chunk_size=HASH_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+        return self.deduplicate(digest.hexdigest(), object_name, size)
@@ -1,15 +1,53 @@
+import minio
 from minio import Minio
+from minio.commonconfig import REPLACE, CopySource, Tags
+from minio.datatypes import Object, Part
 from minio.error import S3Error
-from typing import Optional, BinaryIO
-from datetime import datetime
+from typing import AsyncIterator, Iterator, Optional, BinaryIO
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+from datetime import datetime, timedelta
+from urllib.parse import quote
 import logging
 import io
 from pathlib import Path
 from kubric_api.config import Settings
+from kubric_api.streaming import QueueReader
 
 logger = logging.getLogger("uvicorn")
 
 
+class MultipartClient:
+    """
+    The S3 multipart calls resumable uploads are built on. The minio SDK
+    only has them as private Minio methods, so they are reached through this
+    adapter alone; it fails on startup when a minio release drops one of
+    them (minio is pinned to 7.2.x in pyproject, see
+    tests/test_minio_multipart.py)
+    """
+    METHODS = ("_create_multipart_upload", "_upload_part", "_complete_multipart_upload", "_abort_multipart_upload")
+
+    def __init__(self, client: Minio):
+        missing = [name for name in self.METHODS if not callable(getattr(client, name, None))]
+        if missing:
+            raise RuntimeError(f"minio {minio.__version__} has no {', '.join(missing)}, check the minio pin")
+        self.client = client
+
+    def create(self, bucket_name: str, object_name: str, headers: dict) -> str:
+        return self.client._create_multipart_upload(bucket_name, object_name, headers)
+
+    def upload_part(self, bucket_name: str, object_name: str, upload_id: str, part_number: int, data: bytes) -> str:
+        return self.client._upload_part(bucket_name, object_name, data, None, upload_id, part_number)
+
+    def complete(self, bucket_name: str, object_name: str, upload_id: str, parts: list[tuple[int, str]]):
+        self.client._complete_multipart_upload(
+            bucket_name, object_name, upload_id,
+            [Part(part_number, etag) for part_number, etag in sorted(parts)])
+
+    def abort(self, bucket_name: str, object_name: str, upload_id: str):
+        self.client._abort_multipart_upload(bucket_name, object_name, upload_id)
+
+
 class MinIOService:
     """
     Minio service for managing file storage operations.
@@ -26,6 +64,18 @@ class MinIOService:
             secure=False
         )
         self.bucket_name = setting.MINIO_BUCKET_NAME
+        # presigned URLs are signed for the host the browser talks to
+        self.public_client = Minio(
+            endpoint=setting.MINIO_PUBLIC_ENDPOINT,
+            access_key=setting.MINIO_ACCESS_KEY,
+            secret_key=setting.MINIO_SECRET_KEY,
+            secure=False,
+            region=setting.MINIO_REGION
+        ) if setting.MINIO_PUBLIC_ENDPOINT else self.client
+        self.multipart = MultipartClient(self.client)
+        # streamed uploads hold their thread for the whole body, keep them off the default executor
+        self._upload_executor = ThreadPoolExecutor(
+            max_workers=setting.MINIO_STREAM_UPLOAD_WORKERS, thread_name_prefix="minio-upload")
 
     def _ensure_bucket_exists(self):
         """create bucket if it doesn't exists"""
@@ -70,6 +120,157 @@ class MinIOService:
             logger.error(f"Error uploading file: {e}")
             raise
 
+    async def upload_stream(self, chunks: AsyncIterator[bytes], object_name: str, content_type: str = "video/mp4", metadata: Optional[dict] = None) -> int:
+        """
+        Stream chunks into a MinIO multipart upload of `MINIO_UPLOAD_PART_SIZE`
+        parts. put_object runs on one of `MINIO_STREAM_UPLOAD_WORKERS` upload
+        threads and reads from a bounded queue, so memory per upload stays
+        around one part.
+        Args:
+            chunks: Async iterator over the file content
+            object_name: Object name in MinIO(path/filename)
+            content_type: MIME type of the file
+            metadata: Additional metadata as key-value pairs
+
+        Return:
+            int: Number of bytes uploaded
+        """
+        reader = QueueReader(self.setting.MINIO_UPLOAD_QUEUE_CHUNKS)
+
+        def put():
+            try:
+                self.client.put_object(
+                    bucket_name=self.bucket_name,
+                    object_name=object_name,
+                    data=reader,
+                    length=-1,
+                    part_size=self.setting.MINIO_UPLOAD_PART_SIZE,
+                    content_type=content_type,
+                    metadata=metadata or {}
+                )
+            finally:
+                reader.abandon()
+
+        upload = asyncio.get_running_loop().run_in_executor(self._upload_executor, put)
+        try:
+            async for chunk in chunks:
+                if not await reader.put(chunk):
+                    break
+            await reader.finish()
+        except BaseException as e:
+            # makes put_object raise, which aborts the multipart upload
+            await reader.finish(e)
+            await asyncio.gather(upload, return_exceptions=True)
+            raise
+        try:
+            await upload
+        except S3Error as e:
+            logger.error(f"Error uploading file: {e}")
+            raise
+        logger.info(f"Successfully Uploaded: {object_name} ({reader.bytes_read} bytes)")
+        return reader.bytes_read
+
+    @staticmethod
+    def upload_metadata(video_id: str, original_filename: str) -> dict:
+        """Object metadata set on every uploaded video, header safe"""
+        return {
+            "original_filename": quote(original_filename, safe=" ._-()"),
+            "video_id": video_id
+        }
+
+    def presigned_upload(self, object_name: str, content_type: str, metadata: dict) -> tuple[str, dict]:
+        """
+        Presigned PUT URL for a direct browser upload
+        Return:
+            tuple: URL and the headers the client has to send with the PUT
+        """
+        url = self.public_client.get_presigned_url(
+            "PUT",
+            self.bucket_name,
+            object_name,
+            expires=timedelta(seconds=self.setting.MINIO_PRESIGNED_EXPIRY_SECONDS)
+        )
+        headers = {"Content-Type": content_type}
+        headers.update({f"x-amz-meta-{key}": value for key, value in metadata.items()})
+        return url, headers
+
+    def finalize_upload(self, object_name: str, metadata: dict) -> Object:
+        """
+        Check a direct upload landed and carries `metadata`. Presigned URLs
+        only sign the host, so when the client dropped the metadata headers
+        they are set with a server side copy onto the object itself.
+        """
+        try:
+            stat = self.client.stat_object(self.bucket_name, object_name)
+            if all(stat.metadata.get(f"x-amz-meta-{key}") == value for key, value in metadata.items()):
+                return stat
+            self.client.copy_object(
+                self.bucket_name,
+                object_name,
+                CopySource(self.bucket_name, object_name),
+                metadata={"Content-Type": stat.content_type, **metadata},
+                metadata_directive=REPLACE
+            )
+            logger.info(f"Restored upload metadata: {object_name}")
+            return self.client.stat_object(self.bucket_name, object_name)
+        except S3Error as e:
+            logger.error(f"Error finalizing upload: {e}")
+            raise
+
+    def create_multipart_upload(self, object_name: str, content_type: str, metadata: dict) -> str:
+        """Start a multipart upload and return its upload id"""
+        headers = {"Content-Type": content_type}
+        headers.update({f"x-amz-meta-{key}": value for key, value in metadata.items()})
+        return self.multipart.create(self.bucket_name, object_name, headers)
+
+    def upload_part(self, object_name: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """Upload one part of a multipart upload and return its ETag"""
+        return self.multipart.upload_part(self.bucket_name, object_name, upload_id, part_number, data)
+
+    def complete_multipart_upload(self, object_name: str, upload_id: str, parts: list[tuple[int, str]]):
+        """Assemble the object from (part_number, etag) pairs"""
+        self.multipart.complete(self.bucket_name, object_name, upload_id, parts)
+        logger.info(f"Successfully Uploaded: {object_name}")
+
+    def abort_multipart_upload(self, object_name: str, upload_id: str):
+        self.multipart.abort(self.bucket_name, object_name, upload_id)
+
+    def object_exists(self, object_name: str) -> bool:
+        try:
+            self.client.stat_object(self.bucket_name, object_name)
+            return True
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return False
+            raise
+
+    def set_content_hash(self, object_name: str, content_sha256: str):
+        """
+        Record the content hash as an object tag, tags can be set after the
+        upload without rewriting the object
+        """
+        tags = Tags.new_object_tags()
+        tags["content_sha256"] = content_sha256
+        self.client.set_object_tags(self.bucket_name, object_name, tags)
+
+    def remove_file(self, object_name: str):
+        self.client.remove_object(self.bucket_name, object_name)
+
+    def stat_file(self, object_name: str) -> Object:
+        return self.client.stat_object(self.bucket_name, object_name)
+
+    def iter_file(self, object_name: str, offset: int = 0, length: int = 0, chunk_size: int = 256 * 1024) -> Iterator[bytes]:
+        """
+        Stream `length` bytes (0 for the rest) of an object from `offset`
+        with a ranged GET, chunk by chunk
+        """
+        response = self.client.get_object(self.bucket_name, object_name, offset=offset, length=length)
+        try:
+            yield from response.stream(chunk_size)
+        finally:
+            response.close()
+            response.release_conn()
+
     def get_file(self, file_path: str):
         try:
             video_object = self.client.get_object(
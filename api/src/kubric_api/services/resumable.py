@@ -0,0 +1,166 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import sessionmaker
+from dataclasses import dataclass
+from pathlib import Path
+import logging
+import uuid
+
+from kubric_api.services.minio import MinIOService
+from kubric_api.tables import ResumableUpload, ResumableUploadPart, UploadStatus
+
+logger = logging.getLogger("uvicorn")
+
+
+class UploadError(Exception):
+    """Raised for requests that break the upload protocol"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class UploadState:
+    upload_id: str
+    object_name: str
+    filename: str
+    length: int
+    part_size: int
+    status: UploadStatus
+    committed_parts: list[int]
+
+    @property
+    def offset(self) -> int:
+        """Bytes committed contiguously from the start, what a sequential client resumes from"""
+        offset = 0
+        for expected, part_number in enumerate(sorted(self.committed_parts), start=1):
+            if part_number != expected:
+                break
+            offset = min(part_number * self.part_size, self.length)
+        return offset
+
+
+class ResumableUploadService:
+    """
+    tus-style resumable uploads on top of MinIO multipart uploads.
+
+    An upload is split into `part_size` parts, part N covering the bytes from
+    offset (N - 1) * part_size. Each PATCH carries exactly one part, so parts
+    can be sent in any order and in parallel, and a dropped connection only
+    loses the part in flight. State lives in Postgres, so any API replica can
+    continue an upload; the multipart upload is completed by whichever
+    request commits the last missing part.
+    """
+
+    def __init__(self, minio: MinIOService, session_factory: sessionmaker, part_size: int):
+        self.minio = minio
+        self.session_factory = session_factory
+        self.part_size = part_size
+
+    @staticmethod
+    def _state(upload: ResumableUpload, parts: list[int]) -> UploadState:
+        return UploadState(
+            upload_id=str(upload.id),
+            object_name=upload.object_name,
+            filename=upload.filename,
+            length=upload.length,
+            part_size=upload.part_size,
+            status=upload.status,
+            committed_parts=sorted(parts),
+        )
+
+    def _load(self, session, upload_id: str, for_update: bool = False) -> ResumableUpload:
+        try:
+            key = uuid.UUID(upload_id)
+        except ValueError:
+            raise UploadError(404, "unknown upload")
+        query = select(ResumableUpload).where(ResumableUpload.id == key)
+        if for_update:
+            query = query.with_for_update()
+        upload = session.execute(query).scalar_one_or_none()
+        if upload is None:
+            raise UploadError(404, "unknown upload")
+        return upload
+
+    def _parts(self, session, upload: ResumableUpload) -> list[tuple[int, str]]:
+        return [tuple(row) for row in session.execute(
+            select(ResumableUploadPart.part_number, ResumableUploadPart.etag)
+            .where(ResumableUploadPart.upload_id == upload.id)).all()]
+
+    def create(self, filename: str, content_type: str, length: int) -> UploadState:
+        if length <= 0:
+            raise UploadError(400, "Upload-Length must be positive")
+        video_id = uuid.uuid4()
+        object_name = f"{video_id}{Path(filename).suffix.lower()}"
+        multipart_upload_id = self.minio.create_multipart_upload(
+            object_name, content_type, self.minio.upload_metadata(str(video_id), filename))
+        with self.session_factory() as session:
+            upload = ResumableUpload(
+                id=video_id,
+                object_name=object_name,
+                multipart_upload_id=multipart_upload_id,
+                filename=filename,
+                content_type=content_type,
+                length=length,
+                part_size=self.part_size,
+                status=UploadStatus.UPLOADING,
+            )
+            session.add(upload)
+            session.commit()
+            return self._state(upload, [])
+
+    def get(self, upload_id: str) -> UploadState:
+        with self.session_factory() as session:
+            upload = self._load(session, upload_id)
+            return self._state(upload, [number for number, _ in self._parts(session, upload)])
+
+    def write_part(self, upload_id: str, offset: int, data: bytes) -> tuple[UploadState, bool]:
+        """
+        Store the part starting at `offset`. Returns the new state and whether
+        this request completed the upload.
+        """
+        with self.session_factory() as session:
+            upload = self._load(session, upload_id)
+            if upload.status != UploadStatus.UPLOADING:
+                raise UploadError(409 if upload.status == UploadStatus.COMPLETED else 410,
+                                  f"upload is {upload.status.value}")
+            if offset < 0 or offset >= upload.length or offset % upload.part_size:
+                raise UploadError(409, f"Upload-Offset must be a multiple of {upload.part_size} below {upload.length}")
+            part_number = offset // upload.part_size + 1
+            if len(data) != upload.part_length(part_number):
+                raise UploadError(400, f"part {part_number} must be {upload.part_length(part_number)} bytes")
+            object_name, multipart_upload_id = upload.object_name, upload.multipart_upload_id
+
+        # no transaction or row lock is held while the part is in flight
+        etag = self.minio.upload_part(object_name, multipart_upload_id, part_number, data)
+
+        with self.session_factory() as session:
+            # the row lock serialises the completion check across replicas. It
+            # is taken before the part insert, whose foreign key check would
+            # otherwise share-lock the row first and deadlock parallel parts
+            upload = self._load(session, upload_id, for_update=True)
+            statement = insert(ResumableUploadPart).values(
+                upload_id=upload.id, part_number=part_number, etag=etag, size=len(data))
+            session.execute(statement.on_conflict_do_update(
+                index_elements=[ResumableUploadPart.upload_id, ResumableUploadPart.part_number],
+                set_={"etag": statement.excluded.etag, "size": statement.excluded.size},
+            ))
+            parts = self._parts(session, upload)
+            completed = upload.status == UploadStatus.UPLOADING and len(parts) == upload.parts_count
+            if completed:
+                self.minio.complete_multipart_upload(object_name, multipart_upload_id, parts)
+                upload.status = UploadStatus.COMPLETED
+            session.commit()
+            return self._state(upload, [number for number, _ in parts]), completed
+
+    def abort(self, upload_id: str):
+        with self.session_factory() as session:
+            upload = self._load(session, upload_id, for_update=True)
+            if upload.status == UploadStatus.COMPLETED:
+                raise UploadError(409, "upload is completed")
+            if upload.status == UploadStatus.UPLOADING:
+                self.minio.abort_multipart_upload(upload.object_name, upload.multipart_upload_id)
+                upload.status = UploadStatus.ABORTED
+            session.commit()
@@ -0,0 +1,208 @@
+import asyncio
+import hashlib
+import queue
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request
+from python_multipart import MultipartParser
+from python_multipart.multipart import parse_options_header
+
+
+@dataclass
+class FilePart:
+    field_name: str
+    filename: str
+    content_type: str
+
+
+class QueueReader:
+    """
+    File-like object fed from the event loop and read by a blocking client
+    (MinIO's put_object) in a worker thread.
+
+    At most `max_chunks` request chunks are queued, so the producer waits
+    for the upload instead of buffering the body in memory. The producer
+    waits on the event loop, only the reading side holds a thread.
+    """
+    _EOF = object()
+
+    def __init__(self, max_chunks: int):
+        self._queue: "queue.Queue" = queue.Queue()
+        self._slots = asyncio.Semaphore(max_chunks)
+        self._loop = asyncio.get_running_loop()
+        self._buffer = bytearray()
+        self._eof = False
+        self._abandoned = False
+        self.bytes_read = 0
+
+    async def put(self, item) -> bool:
+        """Queue a chunk, returns False once the reader has gone away"""
+        if self._abandoned:
+            return False
+        await self._slots.acquire()
+        if self._abandoned:
+            return False
+        self._queue.put_nowait(item)
+        return True
+
+    async def finish(self, error: Optional[BaseException] = None):
+        """Signal end of stream, or make the reader raise `error`"""
+        # never waits for a slot, the reader may already be gone
+        if not self._abandoned:
+            self._queue.put_nowait(error if error is not None else self._EOF)
+
+    def _release_slot(self):
+        self._loop.call_soon_threadsafe(self._slots.release)
+
+    def abandon(self):
+        """Called by the reader when it stops reading, wakes a waiting producer"""
+        self._abandoned = True
+        self._release_slot()
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            item = self._queue.get()
+            if item is self._EOF:
+                self._eof = True
+            elif isinstance(item, BaseException):
+                raise item
+            else:
+                self._buffer += item
+                self._release_slot()
+        if size < 0 or size > len(self._buffer):
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self.bytes_read += len(data)
+        return data
+
+
+async def iter_multipart(request: Request) -> AsyncIterator[Tuple[str, object]]:
+    """
+    Parse a multipart/form-data body as it arrives and yield
+    ("headers", {name: value}), ("data", bytes) and ("end", None) events per
+    part, without buffering parts in memory or on disk.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="expected a multipart/form-data body")
+
+    events = []
+    headers = {}
+    header_field = bytearray()
+    header_value = bytearray()
+
+    def on_part_begin():
+        headers.clear()
+
+    def on_header_field(data: bytes, start: int, end: int):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        events.append(("headers", dict(headers)))
+
+    def on_part_data(data: bytes, start: int, end: int):
+        events.append(("data", bytes(data[start:end])))
+
+    def on_part_end():
+        events.append(("end", None))
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    async for chunk in request.stream():
+        parser.write(chunk)
+        for event in events:
+            yield event
+        events.clear()
+    parser.finalize()
+    for event in events:
+        yield event
+
+
+async def read_file_part(request: Request, field_name: str = "file") -> Tuple[FilePart, AsyncIterator[bytes]]:
+    """
+    Advance the multipart body to the file field `field_name` and return its
+    headers with an iterator over its data
+    """
+    events = iter_multipart(request)
+    part = None
+    async for kind, value in events:
+        if kind != "headers":
+            continue
+        _, disposition = parse_options_header(value.get(b"content-disposition", b""))
+        if disposition.get(b"name", b"").decode() == field_name and disposition.get(b"filename"):
+            part = FilePart(
+                field_name=field_name,
+                filename=disposition[b"filename"].decode("utf-8", errors="replace"),
+                content_type=value.get(b"content-type", b"application/octet-stream").decode(),
+            )
+            break
+    if part is None:
+        raise HTTPException(status_code=400, detail="no file upload")
+
+    async def data() -> AsyncIterator[bytes]:
+        async for kind, value in events:
+            if kind == "data":
+                yield value
+            elif kind == "end":
+                return
+
+    return part, data()
+
+
+async def hash_chunks(chunks: AsyncIterator[bytes], digest: "hashlib._Hash") -> AsyncIterator[bytes]:
+    """Pass chunks through while feeding them to `digest`"""
+    async for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    First range of a `Range: bytes=...` header as an inclusive (start, end)
+    pair, None when the whole object should be served. Raises ValueError
+    for a range that cannot be satisfied.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    first = header[len("bytes="):].split(",")[0].strip()
+    start, _, end = first.partition("-")
+    try:
+        if not start:
+            suffix = int(end)
+            if suffix <= 0:
+                raise ValueError("empty suffix range")
+            return max(size - suffix, 0), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        raise ValueError(f"invalid range {first}")
+    if start >= size or end < start:
+        raise ValueError(f"range {first} outside of {size} bytes")
+    return start, min(end, size - 1)
+
+
+def etag_matches(header: Optional[str], etags: Sequence[str]) -> bool:
+    """Weak comparison of an If-None-Match / If-Range header against ETags"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return any(etag in candidates for etag in etags)
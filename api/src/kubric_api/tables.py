@@ -0,0 +1,60 @@
+from sqlalchemy import BigInteger, Column, DateTime, Enum as PGEnum, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime, timezone
+from enum import Enum
+import uuid
+
+from kubric_api.db import Base
+
+
+class UploadStatus(str, Enum):
+    UPLOADING = "uploading"
+    COMPLETED = "completed"
+    ABORTED = "aborted"
+
+
+class ResumableUpload(Base):
+    """
+    A resumable upload backed by a MinIO multipart upload. The id doubles as
+    the video id set in the object metadata.
+    """
+    __tablename__ = "resumable_uploads"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    object_name = Column(String(500), nullable=False, unique=True)
+    multipart_upload_id = Column(String(1024), nullable=False)
+    filename = Column(String(255), nullable=False)
+    content_type = Column(String(255), nullable=False)
+    length = Column(BigInteger, nullable=False)
+    part_size = Column(BigInteger, nullable=False)
+    status = Column(PGEnum(UploadStatus), nullable=False, default=UploadStatus.UPLOADING)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+
+    @property
+    def parts_count(self) -> int:
+        return -(-self.length // self.part_size)
+
+    def part_length(self, part_number: int) -> int:
+        return min(self.part_size, self.length - (part_number - 1) * self.part_size)
+
+
+class ResumableUploadPart(Base):
+    __tablename__ = "resumable_upload_parts"
+
+    upload_id = Column(UUID(as_uuid=True), ForeignKey("resumable_uploads.id", ondelete="CASCADE"), primary_key=True)
+    part_number = Column(Integer, primary_key=True)
+    etag = Column(String(255), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+class UploadedContent(Base):
+    """First object stored for each distinct upload content"""
+    __tablename__ = "uploaded_contents"
+
+    content_sha256 = Column(String(64), primary_key=True)
+    object_name = Column(String(500), nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -0,0 +1,12 @@
+import os
+
+# Settings are read once at import time, the tests never reach these services
+os.environ.setdefault("MINIO_ENDPOINT", "localhost:9000")
+os.environ.setdefault("MINIO_ACCESS_KEY", "test")
+os.environ.setdefault("MINIO_SECRET_KEY", "test")
+os.environ.setdefault("MINIO_BUCKET_NAME", "videos")
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("MINIO_SECURE", "false")
+# small parts and queue keep the memory bound of the streaming tests tight
+os.environ.setdefault("MINIO_UPLOAD_PART_SIZE", str(8 * 1024 * 1024))
+os.environ.setdefault("MINIO_UPLOAD_QUEUE_CHUNKS", "8")
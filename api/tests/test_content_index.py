@@ -0,0 +1,23 @@
+import hashlib
+
+from kubric_api.services.content_index import ContentIndexService
+
+
+class StoredObjects:
+    def __init__(self, objects):
+        self.objects = objects
+
+    def iter_file(self, object_name, offset=0, length=0, chunk_size=256 * 1024):
+        data = self.objects[object_name]
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+
+
+def test_index_object_hashes_the_stored_object(monkeypatch):
+    data = bytes(range(256)) * 20000
+    service = ContentIndexService(StoredObjects({"new.mp4": data}), session_factory=None)
+    deduplicated = []
+    monkeypatch.setattr(service, "deduplicate", lambda *args: deduplicated.append(args) or "existing.mp4")
+
+    assert service.index_object("new.mp4") == "existing.mp4"
+    assert deduplicated == [(hashlib.sha256(data).hexdigest(), "new.mp4", len(data))]
@@ -0,0 +1,62 @@
+from urllib3 import HTTPHeaderDict
+
+from minio import Minio
+
+from kubric_api.services.minio import MultipartClient
+
+
+class Response:
+    def __init__(self, data: bytes = b"", headers: dict = None):
+        self.status = 200
+        self.data = data
+        self.headers = HTTPHeaderDict(headers or {})
+
+
+def recording_client(responses):
+    """A real Minio client whose HTTP layer records requests and replays `responses`"""
+    client = Minio("localhost:9000", access_key="test", secret_key="test", secure=False, region="us-east-1")
+    requests = []
+
+    def url_open(method, region, bucket_name=None, object_name=None, body=None, headers=None,
+                 query_params=None, preload_content=True, no_body_trace=False):
+        requests.append((method, bucket_name, object_name, query_params, body))
+        return responses.pop(0)
+
+    client._url_open = url_open
+    return client, requests
+
+
+def test_multipart_calls_reach_s3():
+    client, requests = recording_client([
+        Response(b"<InitiateMultipartUploadResult><UploadId>upload-1</UploadId></InitiateMultipartUploadResult>"),
+        Response(headers={"etag": '"etag-2"'}),
+        Response(b"<CompleteMultipartUploadResult><Bucket>videos</Bucket><Key>a.mp4</Key>"
+                 b"<ETag>\"final\"</ETag></CompleteMultipartUploadResult>"),
+        Response(),
+    ])
+    multipart = MultipartClient(client)
+
+    assert multipart.create("videos", "a.mp4", {"Content-Type": "video/mp4"}) == "upload-1"
+    assert multipart.upload_part("videos", "a.mp4", "upload-1", 2, b"part two") == "etag-2"
+    multipart.complete("videos", "a.mp4", "upload-1", [(2, "etag-2"), (1, "etag-1")])
+    multipart.abort("videos", "a.mp4", "upload-1")
+
+    create, upload, complete, abort = requests
+    assert create[:4] == ("POST", "videos", "a.mp4", {"uploads": ""})
+    assert upload == ("PUT", "videos", "a.mp4", {"partNumber": "2", "uploadId": "upload-1"}, b"part two")
+    assert complete[:4] == ("POST", "videos", "a.mp4", {"uploadId": "upload-1"})
+    # parts are sent in part number order
+    assert complete[4].index(b"etag-1") < complete[4].index(b"etag-2")
+    assert abort[:4] == ("DELETE", "videos", "a.mp4", {"uploadId": "upload-1"})
+
+
+def test_missing_private_method_fails_fast():
+    class OldMinio:
+        _create_multipart_upload = _upload_part = _complete_multipart_upload = lambda *args: None
+
+    try:
+        MultipartClient(OldMinio())
+    except RuntimeError as e:
+        assert "_abort_multipart_upload" in str(e)
+    else:
+        raise AssertionError("MultipartClient accepted a client without _abort_multipart_upload")
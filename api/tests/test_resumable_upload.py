@@ -0,0 +1,91 @@
+import asyncio
+
+import httpx
+
+import kubric_api.api as api
+from kubric_api.dependencies import get_content_index_service, get_resumable_upload_service
+from kubric_api.services.resumable import UploadState
+from kubric_api.tables import UploadStatus
+
+PART_SIZE = 4
+
+
+class OnePartUploads:
+    """Resumable uploads stand-in: one upload of two PART_SIZE parts"""
+
+    def __init__(self):
+        self.state = UploadState(upload_id="u", object_name="video.mp4", filename="video.mp4", length=2 * PART_SIZE,
+                                 part_size=PART_SIZE, status=UploadStatus.UPLOADING, committed_parts=[])
+
+    def get(self, upload_id):
+        return self.state
+
+    def write_part(self, upload_id, offset, data):
+        self.state.committed_parts.append(offset // PART_SIZE + 1)
+        return self.state, len(self.state.committed_parts) == 2
+
+
+class DuplicateContent:
+    """Content index that already holds the upload's bytes as existing.mp4"""
+
+    def __init__(self):
+        self.indexed = []
+
+    def index_object(self, object_name):
+        self.indexed.append(object_name)
+        return "existing.mp4"
+
+
+class RecordingMcpClient:
+    calls = []
+
+    def __init__(self, url):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+
+
+def patch(client, offset, data):
+    return client.patch("/uploads/resumable/u", content=data, headers={
+        "content-type": "application/offset+octet-stream", "upload-offset": str(offset)})
+
+
+def test_part_size_comes_from_the_upload_and_completion_starts_processing(monkeypatch):
+    monkeypatch.setattr(api, "Client", RecordingMcpClient)
+    uploads = OnePartUploads()
+    content_index = DuplicateContent()
+    api.app.dependency_overrides[get_resumable_upload_service] = lambda: uploads
+    api.app.dependency_overrides[get_content_index_service] = lambda: content_index
+    api.app.state.bg_task_status = {}
+
+    async def run():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # the setting allows far larger parts, the upload row does not
+            too_big = await patch(client, 0, b"x" * (PART_SIZE + 1))
+            first = await patch(client, 0, b"x" * PART_SIZE)
+            last = await patch(client, PART_SIZE, b"y" * PART_SIZE)
+            return too_big, first, last
+
+    try:
+        too_big, first, last = asyncio.run(run())
+    finally:
+        api.app.dependency_overrides.clear()
+
+    assert api.settings.MINIO_UPLOAD_PART_SIZE > PART_SIZE + 1
+    assert too_big.status_code == 413
+    assert first.status_code == 204 and "Upload-Task-Id" not in first.headers
+    assert last.status_code == 204
+    task_id = last.headers["Upload-Task-Id"]
+    # the completed upload is hashed once and resolves to the existing copy
+    assert content_index.indexed == ["video.mp4"]
+    assert last.headers["Upload-Object-Name"] == "existing.mp4"
+    assert RecordingMcpClient.calls == [(api.PROCESS_VIDEO_TOOL, {"video_path": "existing.mp4"})]
+    assert api.app.state.bg_task_status[task_id] == api.TaskStatus.COMPLETED
@@ -0,0 +1,99 @@
+import asyncio
+import hashlib
+import os
+import threading
+import tracemalloc
+
+import httpx
+
+from kubric_api.api import app
+from kubric_api.config import get_settings
+from kubric_api.dependencies import get_content_index_service, get_minio_client
+from kubric_api.services.minio import MinIOService
+
+MiB = 1024 * 1024
+# multi-GB by default, KUBRIC_TEST_UPLOAD_BYTES shrinks it for quick runs
+UPLOAD_BYTES = int(os.getenv("KUBRIC_TEST_UPLOAD_BYTES", 2 * 1024 * MiB))
+REQUEST_CHUNK = MiB
+BOUNDARY = "kubric-test-boundary"
+
+
+class StreamingMinio:
+    """Minio client stand-in that consumes put_object's stream part by part"""
+
+    def __init__(self):
+        self.objects = {}
+        self.threads = set()
+
+    def put_object(self, bucket_name, object_name, data, length, part_size=0, content_type=None, metadata=None):
+        assert length == -1 and part_size
+        self.threads.add(threading.current_thread().name)
+        digest = hashlib.sha256()
+        size = 0
+        while True:
+            part = data.read(part_size)
+            if not part:
+                break
+            digest.update(part)
+            size += len(part)
+        self.objects[object_name] = (size, digest.hexdigest())
+
+
+class NoDuplicates:
+    def deduplicate(self, content_sha256, object_name, size_bytes):
+        return object_name
+
+
+def file_chunk(index: int) -> bytes:
+    # every chunk differs, so reordered or dropped chunks change the hash
+    return index.to_bytes(8, "big") * (REQUEST_CHUNK // 8)
+
+
+async def multipart_body(size: int):
+    yield (f"--{BOUNDARY}\r\n"
+           f'Content-Disposition: form-data; name="file"; filename="big.mp4"\r\n'
+           f"Content-Type: video/mp4\r\n\r\n").encode()
+    for index, offset in enumerate(range(0, size, REQUEST_CHUNK)):
+        yield file_chunk(index)[:size - offset]
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def expected_digest(size: int) -> str:
+    digest = hashlib.sha256()
+    for index, offset in enumerate(range(0, size, REQUEST_CHUNK)):
+        digest.update(file_chunk(index)[:size - offset])
+    return digest.hexdigest()
+
+
+def test_upload_video_streams_multi_gb_body_in_bounded_memory():
+    settings = get_settings()
+    minio = MinIOService(settings)
+    minio.client = StreamingMinio()
+    app.dependency_overrides[get_minio_client] = lambda: minio
+    app.dependency_overrides[get_content_index_service] = lambda: NoDuplicates()
+
+    async def upload():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+            return await client.post(
+                "/upload-video", content=multipart_body(UPLOAD_BYTES),
+                headers={"content-type": f"multipart/form-data; boundary={BOUNDARY}"})
+
+    tracemalloc.start()
+    try:
+        response = asyncio.run(upload())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200, response.text
+    object_name = response.json()["video_path"]
+    size, digest = minio.client.objects[object_name]
+    assert size == UPLOAD_BYTES
+    assert digest == expected_digest(UPLOAD_BYTES)
+    # a part being read plus the queued request chunks, copies included
+    bound = 3 * settings.MINIO_UPLOAD_PART_SIZE + 2 * settings.MINIO_UPLOAD_QUEUE_CHUNKS * REQUEST_CHUNK + 16 * MiB
+    assert peak < bound, f"peak {peak / MiB:.0f} MiB over the {bound / MiB:.0f} MiB bound"
+    # the upload stays off the default executor that asyncio.to_thread shares
+    assert all(name.startswith("minio-upload") for name in minio.client.threads)
@@ -0,0 +1,58 @@
+"""
+Payload bytes and wall time of every transcription audio codec.
+
+    python benchmarks/audio_codec.py --video path/to/video.mp4 --chunks 12 --transcribe
+"""
+import asyncio
+import time
+
+import click
+
+from kubric_mcp.config import get_settings
+from kubric_mcp.video.ingestion.audio_codec import CODECS, encode_pcm
+from kubric_mcp.video.ingestion.audio_stream import iter_pcm_segments, plan_audio_chunks, probe_duration
+from kubric_mcp.video.ingestion.transcriber import get_transcriber
+
+
+async def time_transcription(payloads_by_codec):
+    # one event loop for every codec, the transcriber's limiter is bound to it
+    transcriber = get_transcriber()
+    seconds = {}
+    for codec, payloads in payloads_by_codec.items():
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            transcriber.transcribe(payload.to_buffer(f"chunk_{index}")) for index, payload in enumerate(payloads)))
+        seconds[codec] = time.perf_counter() - started
+    return seconds
+
+
+@click.command()
+@click.option("--video", required=True, help="Video whose audio track is chunked and encoded")
+@click.option("--chunks", default=12, help="Number of chunks to encode per codec")
+@click.option("--codec", "codecs", multiple=True, default=list(CODECS), help="Codecs to benchmark")
+@click.option("--transcribe/--no-transcribe", default=False, help="Also time transcription of the payloads")
+def benchmark(video, chunks, codecs, transcribe):
+    settings = get_settings()
+    segments = plan_audio_chunks(probe_duration(video), settings.AUDIO_CHUNK_LENGTH)[:chunks]
+    pcm = [chunk.pcm for chunk in iter_pcm_segments(video, segments)]
+    raw_bytes = sum(samples.nbytes for samples in pcm)
+    print(f"{len(pcm)} chunks, {raw_bytes / 1e6:.2f} MB of PCM")
+
+    payloads_by_codec, encode_seconds = {}, {}
+    for codec in codecs:
+        started = time.perf_counter()
+        payloads_by_codec[codec] = [encode_pcm(samples, codec, bitrate=settings.AUDIO_OPUS_BITRATE) for samples in pcm]
+        encode_seconds[codec] = time.perf_counter() - started
+    transcribe_seconds = asyncio.run(time_transcription(payloads_by_codec)) if transcribe else {}
+
+    for codec, payloads in payloads_by_codec.items():
+        payload_bytes = sum(len(payload.data) for payload in payloads)
+        line = (f"{codec:>5}: {payload_bytes / 1e6:8.2f} MB ({payload_bytes / raw_bytes:6.1%} of PCM), "
+                f"encode {encode_seconds[codec]:6.2f}s")
+        if codec in transcribe_seconds:
+            line += f", transcribe {transcribe_seconds[codec]:6.2f}s"
+        print(line)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,39 @@
+"""
+Frames/sec of every image embedding backend and their parity with torch.
+
+    python benchmarks/image_embedding.py --video path/to/video.mp4 --frames 128
+"""
+import click
+
+from kubric_mcp.video.ingestion.frame_sampler import FrameSampler
+from kubric_mcp.video.ingestion.image_embedding import (
+    BACKENDS, get_image_embedding_backend, measure_throughput, parity_check, synthetic_frames)
+
+
+@click.command()
+@click.option("--video", default=None, help="Sample frames from this video instead of synthetic frames")
+@click.option("--frames", default=128, help="Number of frames to embed per round")
+@click.option("--rounds", default=3, help="Timed rounds per backend")
+@click.option("--backend", "backends", multiple=True, default=list(BACKENDS), help="Backends to benchmark")
+def benchmark(video, frames, rounds, backends):
+    if video:
+        sampled = []
+        for frame in FrameSampler(video, interval_seconds=1.0):
+            sampled.append(frame.image)
+            if len(sampled) >= frames:
+                break
+    else:
+        sampled = synthetic_frames(frames)
+
+    reference = get_image_embedding_backend("torch")
+    for name in backends:
+        backend = get_image_embedding_backend(name)
+        batch_size = backend.tuned_batch_size()
+        fps = measure_throughput(backend, sampled, batch_size, rounds=rounds)
+        print(f"{name:>6}: {fps:8.1f} frames/s (batch size {batch_size})")
+        if backend is not reference:
+            parity_check(reference, backend, sampled)
+
+
+if __name__ == "__main__":
+    benchmark()
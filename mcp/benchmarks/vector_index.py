@@ -0,0 +1,174 @@
+"""
+Recall and latency of the HNSW and IVFFlat indexes by ef_search / probes, on
+a synthetic corpus of clustered unit vectors. Recall@k is measured against
+exact top-k computed in numpy while the corpus is loaded.
+
+    python benchmarks/vector_index.py --rows 1000000 --dim 512 --method hnsw
+    python benchmarks/vector_index.py --method ivfflat --probes 1,4,16,64
+
+The corpus goes to an unlogged table that is kept between runs with the same
+rows, dim and seed (drop it with --drop).
+"""
+import io
+import statistics
+import struct
+import time
+
+import click
+import numpy as np
+from sqlalchemy import text
+
+from kubric_mcp.db import engine
+from kubric_mcp.services.vector_search import OPERATOR_CLASSES, index_ddl, ivfflat_lists
+
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+COPY_TRAILER = struct.pack("!h", -1)
+DISTANCE_OPERATORS = {"cosine": "<=>", "ip": "<#>", "l2": "<->"}
+# generator stream of the held out queries, past any corpus chunk index
+QUERY_STREAM = 2 ** 32
+
+
+def corpus_chunk(index: int, size: int, centers: np.ndarray, seed: int) -> np.ndarray:
+    # every chunk has its own generator, so the corpus is reproducible chunk by chunk
+    rng = np.random.default_rng((seed, index))
+    points = centers[rng.integers(len(centers), size=size)] + 0.35 * rng.standard_normal((size, centers.shape[1]))
+    return (points / np.linalg.norm(points, axis=1, keepdims=True)).astype(np.float32)
+
+
+def copy_payload(ids: np.ndarray, vectors: np.ndarray) -> bytes:
+    """Binary COPY rows (bigint id, vector) built as one numpy record array"""
+    dim = vectors.shape[1]
+    rows = np.zeros(len(ids), dtype=np.dtype([
+        ("fields", ">i2"), ("id_length", ">i4"), ("id", ">i8"),
+        ("vector_length", ">i4"), ("dim", ">u2"), ("unused", ">u2"), ("vector", ">f4", (dim,)),
+    ]))
+    rows["fields"] = 2
+    rows["id_length"] = 8
+    rows["id"] = ids
+    rows["vector_length"] = 4 + 4 * dim
+    rows["dim"] = dim
+    rows["vector"] = vectors
+    return COPY_HEADER + rows.tobytes() + COPY_TRAILER
+
+
+def merge_top_k(best_scores, best_ids, scores, ids, k):
+    scores = np.concatenate([best_scores, scores], axis=1)
+    ids = np.concatenate([best_ids, np.broadcast_to(ids, (len(scores), len(ids)))], axis=1)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(scores, top, axis=1), np.take_along_axis(ids, top, axis=1)
+
+
+def load_corpus(table, rows, dim, seed, chunk_size, centers, queries, k):
+    """Create and fill the corpus table, returns the exact top-k ids of every query"""
+    best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    best_ids = np.full((len(queries), k), -1, dtype=np.int64)
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT to_regclass('{table}') IS NOT NULL")
+        exists = cursor.fetchone()[0]
+        if exists:
+            cursor.execute(f"SELECT count(*) FROM {table}")
+            exists = cursor.fetchone()[0] == rows
+        if not exists:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute(f"CREATE UNLOGGED TABLE {table} (id bigint PRIMARY KEY, embedding vector({dim}))")
+        started = time.perf_counter()
+        for index, offset in enumerate(range(0, rows, chunk_size)):
+            size = min(chunk_size, rows - offset)
+            vectors = corpus_chunk(index, size, centers, seed)
+            ids = np.arange(offset, offset + size, dtype=np.int64)
+            if not exists:
+                cursor.copy_expert(f"COPY {table} (id, embedding) FROM STDIN WITH (FORMAT binary)",
+                                   io.BytesIO(copy_payload(ids, vectors)))
+            # unit vectors, so inner product gives the exact neighbours for every metric
+            best_scores, best_ids = merge_top_k(best_scores, best_ids, queries @ vectors.T, ids, k)
+        connection.commit()
+        if not exists:
+            cursor.execute(f"ANALYZE {table}")
+            connection.commit()
+        print(f"corpus: {rows} x {dim} {'loaded' if not exists else 'reused'} "
+              f"and exact top-{k} computed in {time.perf_counter() - started:.1f}s")
+    finally:
+        connection.close()
+    return [set(ids) for ids in best_ids.tolist()]
+
+
+def run_queries(connection, table, metric, queries, truth, k, settings):
+    latencies, recalls = [], []
+    operator = DISTANCE_OPERATORS[metric]
+    for query, expected in zip(queries, truth):
+        literal = "[" + ",".join(f"{value:.7g}" for value in query) + "]"
+        with connection.begin():
+            for name, value in settings.items():
+                connection.execute(text("SELECT set_config(:name, :value, true)"), {"name": name, "value": value})
+            started = time.perf_counter()
+            ids = connection.execute(text(
+                f"SELECT id FROM {table} ORDER BY embedding {operator} CAST(:query AS vector) LIMIT :k"
+            ), {"query": literal, "k": k}).scalars().all()
+            latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(len(expected.intersection(ids)) / k)
+    latencies.sort()
+    return {
+        "recall": statistics.fmean(recalls),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+        "qps": len(latencies) / (sum(latencies) / 1000),
+    }
+
+
+def print_row(label, result):
+    print(f"{label:>18} {result['recall']:8.4f} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['qps']:9.1f}")
+
+
+@click.command()
+@click.option("--rows", default=1_000_000, help="Corpus size")
+@click.option("--dim", default=512, help="Vector width, 512 is frame_embedding and 1536 the text embeddings")
+@click.option("--queries", "query_count", default=200, help="Held out query vectors")
+@click.option("--top-k", "k", default=10, help="Neighbours per query, recall is recall@k")
+@click.option("--method", type=click.Choice(["hnsw", "ivfflat"]), default="hnsw")
+@click.option("--metric", type=click.Choice(list(OPERATOR_CLASSES)), default="cosine")
+@click.option("--ef-search", default="10,20,40,80,160,320", help="HNSW ef_search values to sweep")
+@click.option("--probes", default="1,2,4,8,16,32,64", help="IVFFlat probes values to sweep")
+@click.option("--exact-queries", default=20, help="Queries timed without the index, 0 to skip")
+@click.option("--maintenance-work-mem", default="4GB", help="Index build memory, HNSW builds slow down a lot once the graph does not fit")
+@click.option("--seed", default=7)
+@click.option("--chunk-size", default=50_000, help="Rows generated and copied at a time")
+@click.option("--drop/--keep", default=False, help="Drop the corpus table afterwards")
+def benchmark(rows, dim, query_count, k, method, metric, ef_search, probes, exact_queries,
+              maintenance_work_mem, seed, chunk_size, drop):
+    table = f"vector_benchmark_{rows}_{dim}_{seed}"
+    centers = np.random.default_rng(seed).standard_normal((max(rows // 1000, 16), dim))
+    queries = corpus_chunk(QUERY_STREAM, query_count, centers, seed)
+    truth = load_corpus(table, rows, dim, seed, chunk_size, centers, queries, k)
+
+    name = f"ix_{table}_{method}_{metric}"
+    lists = ivfflat_lists(rows) if method == "ivfflat" else None
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(f"SET maintenance_work_mem = '{maintenance_work_mem}'"))
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        started = time.perf_counter()
+        connection.execute(text(index_ddl(name, table, "embedding", metric, method, lists=lists)))
+        build_seconds = time.perf_counter() - started
+        size = connection.execute(text(f"SELECT pg_size_pretty(pg_relation_size('{name}'))")).scalar()
+    print(f"index: {method} {metric}{f' lists={lists}' if lists else ''} built in {build_seconds:.1f}s, {size}")
+
+    print(f"{'':>18} {'recall@' + str(k):>8} {'p50 ms':>9} {'p95 ms':>9} {'qps':>9}")
+    with engine.connect() as connection:
+        if exact_queries:
+            exact = run_queries(connection, table, metric, queries[:exact_queries], truth[:exact_queries], k,
+                                {"enable_indexscan": "off"})
+            print_row("exact", exact)
+        parameter, values = ("hnsw.ef_search", ef_search) if method == "hnsw" else ("ivfflat.probes", probes)
+        for value in values.split(","):
+            result = run_queries(connection, table, metric, queries, truth, k, {parameter: value.strip()})
+            print_row(f"{parameter.split('.')[1]}={value.strip()}", result)
+
+    if drop:
+        with engine.connect() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
+            connection.commit()
+
+
+if __name__ == "__main__":
+    benchmark()
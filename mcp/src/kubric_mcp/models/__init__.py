@@ -2,6 +2,8 @@ from .base import Base
 from .video import VideoIndex, VideoStatus
 from .audio import AudioIndex, AudioStatus
 from .frames import FrameIndex, FrameStatus
+from .caption_cache import FrameCaptionCache
+from .embedding_cache import TextEmbeddingCache
 
 
-__all__ = ["Base", "VideoIndex","AudioIndex", "FrameIndex" ]
\ No newline at end of file
+__all__ = ["Base", "VideoIndex","AudioIndex", "FrameIndex", "FrameCaptionCache", "TextEmbeddingCache" ]
\ No newline at end of file
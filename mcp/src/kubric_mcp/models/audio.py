@@ -12,6 +12,7 @@ class AudioStatus(str,Enum):
     PENDING_TRANSCRIPTION = "pending_transcription"
     PENDING_EMBEDDING = "pedning_embedding"
     COMPLETE = "complete"
+    SILENT = "silent"
 
 class AudioIndex(Base):
     __tablename__ = "audio_index"
@@ -22,7 +23,7 @@ class AudioIndex(Base):
     end_time = Column(Float, nullable=False)
     chunk_index = Column(Integer, nullable=False)
     transcript_embedding = Column(VECTOR(1536))
-    transcription_text = Column(String(255))
+    transcription_text = Column(Text)
     status = Column(PGEnum(AudioStatus), nullable=False, default="pending_transcription")
     create_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc),nullable=False)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, BigInteger, DateTime, Text
+from sqlalchemy.dialects.postgresql import UUID
+from pgvector.sqlalchemy import VECTOR
+from datetime import datetime, timezone
+import uuid
+from .base import Base
+
+
+class FrameCaptionCache(Base):
+    __tablename__ = "frame_caption_cache"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    perceptual_hash = Column(BigInteger, nullable=False, unique=True)
+    caption = Column(Text, nullable=False)
+    caption_embedding = Column(VECTOR(1536), nullable=False)
+    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
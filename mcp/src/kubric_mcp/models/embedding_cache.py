@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Integer, DateTime, Index, PrimaryKeyConstraint
+from pgvector.sqlalchemy import VECTOR
+from datetime import datetime, timezone
+from .base import Base
+
+
+class TextEmbeddingCache(Base):
+    __tablename__ = "text_embedding_cache"
+
+    model = Column(String(100), nullable=False)
+    dimensions = Column(Integer, nullable=False)
+    text_sha256 = Column(String(64), nullable=False)
+    embedding = Column(VECTOR(), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+    last_used_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
+
+    ## constraints
+    __table_args__ = (
+        PrimaryKeyConstraint("model", "dimensions", "text_sha256", name="text_embedding_cache_pkey"),
+        Index("ix_text_embedding_cache_last_used_at", "last_used_at"),
+    )
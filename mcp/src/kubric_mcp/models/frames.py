@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, DateTime, Text, ForeignKey, UniqueConstraint, Enum as PGEnum
+from sqlalchemy import Column, BigInteger, Float, DateTime, Text, ForeignKey, UniqueConstraint, Enum as PGEnum
 from sqlalchemy.dialects.postgresql import UUID
 from pgvector.sqlalchemy import VECTOR
 from sqlalchemy.orm import relationship
@@ -20,9 +20,10 @@ class FrameIndex(Base):
     id= Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     video_id= Column(UUID(as_uuid=True), ForeignKey("video_index.id", ondelete="CASCADE"), nullable=False)
     timestamp_seconds = Column(Float, nullable=False)
-    caption= Column(Text, nullable=False)
-    caption_embedding = Column(VECTOR(1536), nullable=False)
+    caption= Column(Text)
+    caption_embedding = Column(VECTOR(1536))
     frame_embedding = Column(VECTOR(512), nullable=False)
+    perceptual_hash = Column(BigInteger)
     created_at = Column(DateTime, default=datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime, default=datetime.now(timezone.utc),onupdate=datetime.now(timezone.utc), nullable=False)
     status = Column(PGEnum(FrameStatus), nullable=False, default="pending_image_embedding")
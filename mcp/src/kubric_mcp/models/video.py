@@ -23,6 +23,7 @@ class VideoIndex(Base):
     mime_type = Column(String(50))
     duration_seconds= Column(Float)
     file_size_bytes = Column(BigInteger)
+    content_sha256 = Column(String(64), index=True)
     status = Column(PGEnum(VideoStatus),  default="uploaded")
     processing_started_at = Column(DateTime)
     processing_completed_at = Column(DateTime)
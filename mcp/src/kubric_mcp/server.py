@@ -5,7 +5,9 @@ from kubric_mcp.config import get_settings
 from kubric_mcp.services.minio import get_minio_service
 from kubric_mcp.video.ingestion.video_processor import VideoProcessor
 import asyncio
-from kubric_mcp.db import init_db, get_session
+import threading
+import uuid
+from kubric_mcp.db import init_db, ensure_vector_indexes, get_session
 from concurrent.futures import ThreadPoolExecutor
 from kubric_mcp.video.ingestion.video_processor import VideoPorcessorStatus
 mcp = FastMCP("Kubric_MCP")
@@ -13,44 +15,173 @@ mcp = FastMCP("Kubric_MCP")
 executer = ThreadPoolExecutor(max_workers=5)
 
 
-@mcp.tool(name="processsss_video")
-async def processss_video(video_path: str) -> str:
+@mcp.tool(name="process_video")
+async def process_video(video_path: str) -> str:
     settings = get_settings()
     minio_client = get_minio_service(settings)
 
-    videoProcessor = VideoProcessor(
-        minio_client=minio_client, video_path=video_path)
-    current_video_status =videoProcessor._check_status()
-    print("Current Video Status", current_video_status)
-    if (current_video_status == VideoPorcessorStatus.PENDING):
-        video_processor_task = asyncio.create_task(
-        videoProcessor._extract_frames())
-        videoProcessor.background_task.add(video_processor_task)
-        video_processor_task.add_done_callback(
-            videoProcessor.background_task.discard)
-    elif(current_video_status == VideoPorcessorStatus.PENDING_EMBEDDING):
-        videoProcessor._generate_embedding_for_transription()
-    elif(current_video_status == VideoPorcessorStatus.PENDING_TRANSCRIPTION):
-        videoProcessor._start_audio_processsing()
-    elif(current_video_status == VideoPorcessorStatus.PENDING_IMAGE_EMBEDDING):
-        videoProcessor._generate_embedding_for_frames()
+    # loading may download the video or wait on another processor's download
+    videoProcessor = await asyncio.to_thread(
+        VideoProcessor, minio_client=minio_client, video_path=video_path)
+    try:
+        await videoProcessor._register_video()
+        current_video_status = await videoProcessor._check_status()
+        if (current_video_status == VideoPorcessorStatus.PENDING):
+            video_processor_task = asyncio.create_task(
+            videoProcessor._extract_frames())
+            videoProcessor.background_task.add(video_processor_task)
+            video_processor_task.add_done_callback(
+                videoProcessor.background_task.discard)
+        elif(current_video_status == VideoPorcessorStatus.PENDING_EMBEDDING):
+            embedding_task = asyncio.create_task(
+            videoProcessor._generate_embedding_for_transription())
+            videoProcessor.background_task.add(embedding_task)
+            embedding_task.add_done_callback(
+                videoProcessor.background_task.discard)
+        elif(current_video_status == VideoPorcessorStatus.PENDING_TRANSCRIPTION):
+            videoProcessor._start_audio_processsing()
+        elif(current_video_status == VideoPorcessorStatus.PENDING_IMAGE_EMBEDDING):
+            frame_embedding_task = asyncio.create_task(
+            videoProcessor._embed_frames())
+            videoProcessor.background_task.add(frame_embedding_task)
+            frame_embedding_task.add_done_callback(
+                videoProcessor.background_task.discard)
+        elif(current_video_status == VideoPorcessorStatus.PENDING_CAPTION_GENERATION):
+            caption_task = asyncio.create_task(
+            videoProcessor._process_captions())
+            videoProcessor.background_task.add(caption_task)
+            caption_task.add_done_callback(
+                videoProcessor.background_task.discard)
+        elif(current_video_status == VideoPorcessorStatus.PENDING_CAPTION_EMBEDDING):
+            caption_embedding_task = asyncio.create_task(
+            videoProcessor._generate_embedding_for_captions())
+            videoProcessor.background_task.add(caption_embedding_task)
+            caption_embedding_task.add_done_callback(
+                videoProcessor.background_task.discard)
+    finally:
+        # stages already scheduled keep the lease until they finish
+        videoProcessor._release_video_when_done()
     return f"Video Processing started"
 
 
+@mcp.tool(name="get_video_clip")
+async def get_video_clip(video_id: str, start_time: float, end_time: float, exact: bool = False) -> dict:
+    """
+    Cut a clip of an indexed video, snapped to keyframes unless exact is set,
+    and return a presigned URL to it. Clips are cached in MinIO
+    """
+    from kubric_mcp.services.clip_service import ClipService
+
+    clip = await ClipService(get_minio_service()).get_clip(uuid.UUID(video_id), start_time, end_time, exact=exact)
+    return {
+        "bucket": clip.bucket_name,
+        "object_name": clip.object_name,
+        "start_time": clip.start_time,
+        "end_time": clip.end_time,
+        "cached": clip.cached,
+        "url": clip.url,
+    }
+
+
+@mcp.tool(name="search_videos")
+async def search_videos(query: str, modality: str = "speech", top_k: int | None = None,
+                        ef_search: int | None = None, probes: int | None = None) -> list:
+    """
+    Find the moments of indexed videos closest to the query, in what is said
+    (modality "speech") or in the frame captions ("caption"). ef_search and
+    probes raise recall at the cost of latency
+    """
+    from dataclasses import asdict
+    from kubric_mcp.services.vector_search import VectorSearchService
+    from kubric_mcp.video.ingestion.text_embedding import TextEmbedder
+
+    settings = get_settings()
+    service = VectorSearchService()
+    if modality == "speech":
+        embedding = (await TextEmbedder(settings.TRANSCRIPT_SIMILARITY_EMDB_MODEL).embed([query]))[0]
+        hits = await service.search_transcripts(
+            embedding, top_k or settings.VIDEO_CLIP_SPEECH_SEARCH_TOP_K, ef_search=ef_search, probes=probes)
+    elif modality == "caption":
+        embedding = (await TextEmbedder(settings.CAPTION_SIMILARITY_EMBD_MODEL).embed([query]))[0]
+        hits = await service.search_captions(
+            embedding, top_k or settings.VIDEO_CLIP_CAPTION_SEARCH_TOP_K, ef_search=ef_search, probes=probes)
+    else:
+        raise ValueError(f"unknown modality {modality}, expected speech or caption")
+    return [{**asdict(hit), "id": str(hit.id), "video_id": str(hit.video_id)} for hit in hits]
+
+
+@mcp.tool(name="model_stats")
+async def model_stats() -> dict:
+    """
+    Load time, memory and usage stats of the warm CLIP models
+    """
+    from kubric_mcp.video.ingestion.model_registry import get_clip_registry
+    return get_clip_registry().stats()
+
+
+@mcp.tool(name="embedding_cache_stats")
+async def embedding_cache_stats() -> dict:
+    """
+    Hit/miss counters of the text embedding cache
+    """
+    from kubric_mcp.services.embedding_cache import get_embedding_cache
+    return get_embedding_cache().stats()
+
+
+@mcp.tool(name="video_cache_stats")
+async def video_cache_stats() -> dict:
+    """
+    Hit rate, bytes saved and size of the local video cache
+    """
+    from kubric_mcp.services.video_cache import get_video_cache
+    return get_video_cache().stats()
+
+
+@mcp.tool(name="storage_stats")
+async def storage_stats() -> dict:
+    """
+    Upload counters and latency of the shared MinIO service
+    """
+    return get_minio_service().stats()
+
+
+@mcp.tool(name="transcription_stats")
+async def transcription_stats() -> dict:
+    """
+    Request counters of the transcription backends, including overflow routing
+    """
+    from kubric_mcp.video.ingestion.transcriber import get_transcriber
+    return get_transcriber().stats()
+
+
 @click.command()
 @click.option("--host", default="0.0.0.0", help="Enter the host number you want to run the MCP")
 @click.option("--port", default=8081, help="Enter the port number you want MCP to run")
 @click.option("--transport", default="streamable-http")
-def run_mcp(port, host, transport):
+@click.option("--preload-models/--no-preload-models", default=None, help="Load the CLIP and local whisper models before serving (defaults to PRELOAD_IMAGE_EMDB_MODEL)")
+def run_mcp(port, host, transport, preload_models):
     """
     Run FastMcp server with provided port, host and transport
     """
     print("initializing database")
     init_db()
     session = next(get_session())
-    print(session,"session initiated")
     session.close()
     print("Database connection established")
+    # concurrent builds do not block writes, serve while they run
+    threading.Thread(target=ensure_vector_indexes, name="vector-indexes", daemon=True).start()
+    settings = get_settings()
+    get_minio_service(settings).ensure_buckets(
+        settings.MINIO_BUCKET_NAME, settings.MINIO_AUDIO_BUCKET, settings.MINIO_CLIP_BUCKET)
+    print("Storage buckets ready")
+    if preload_models is None:
+        preload_models = settings.PRELOAD_IMAGE_EMDB_MODEL
+    if preload_models:
+        from kubric_mcp.video.ingestion.image_embedding import get_image_embedding_backend
+        get_image_embedding_backend().tuned_batch_size()
+        from kubric_mcp.video.ingestion.transcriber import LocalWhisperBackend, get_transcription_backend
+        if LocalWhisperBackend.name in (settings.TRANSCRIPTION_BACKEND, settings.TRANSCRIPTION_OVERFLOW_BACKEND):
+            get_transcription_backend(LocalWhisperBackend.name).load()
     mcp.run(host=host, port=port, transport=transport)
 
 
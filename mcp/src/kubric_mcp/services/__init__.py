@@ -1,5 +1,7 @@
 from .video_service import VideoService
 from .audio_service import AudioService
+from .frame_service import FrameService
+from .caption_cache_service import CaptionCacheService
 
 
-__all__ = [VideoService, AudioService]
\ No newline at end of file
+__all__ = [VideoService, AudioService, FrameService, CaptionCacheService]
\ No newline at end of file
@@ -1,5 +1,6 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, update
 from sqlalchemy.exc import IntegrityError
+from kubric_mcp.db import unit_of_work
 from kubric_mcp.models import VideoIndex, AudioIndex
 from datetime import datetime, timezone
 from kubric_mcp.models.audio import AudioStatus
@@ -9,12 +10,10 @@ import uuid
 
 class AudioService:
     """
-    DB services for audio
+    DB services for audio, each method runs in its own unit of work
     """
-    def __init__(self, session: Session):
-        self.session = session
 
-    def _create_entry(self, video_id: uuid.UUID, audio_chunks_info, ) -> AudioIndex:
+    async def _create_entry(self, video_id: uuid.UUID, audio_chunks_info, ) -> AudioIndex:
         """
         Create a bulk entry for audio chunks in database for ongoing vidoe processing
         """
@@ -31,51 +30,108 @@ class AudioService:
                 bulk_data.append(chunk)
             
             
-            self.session.add_all(bulk_data)
-            self.session.commit()
+            async with unit_of_work() as session:
+                session.add_all(bulk_data)
 
-            for chunk in bulk_data:
-                self.session.refresh(chunk)
-            
             print(f"✅  [Audio Service] audio chunk inserted : {len(bulk_data)}")
             return bulk_data
         except Exception as e:
-            self.session.rollback()
             print(f"❌  [Audio Service] audio chunk insertion failed: {e}")
             raise
     
-    def _update_transcription(self,video_id: uuid.UUID, transcriptions):
+    async def _get_chunks(self, video_id: uuid.UUID):
+        """
+        Audio chunks of a video ordered by chunk index
+        """
+        async with unit_of_work() as session:
+            return (await session.scalars(
+                select(AudioIndex).where(AudioIndex.video_id == video_id).order_by(AudioIndex.chunk_index)
+            )).all()
+
+    async def _get_statuses(self, video_id: uuid.UUID):
+        """
+        Distinct stages the chunks of a video are in
+        """
+        async with unit_of_work() as session:
+            return (await session.scalars(
+                select(AudioIndex.status).where(AudioIndex.video_id == video_id).distinct()
+            )).all()
+
+    async def _get_pending_embedding(self, video_id: uuid.UUID):
+        """
+        (transcription text, id) of the chunks waiting for a transcript embedding
+        """
+        async with unit_of_work() as session:
+            return (await session.execute(
+                select(AudioIndex.transcription_text, AudioIndex.id)
+                .where(AudioIndex.video_id == video_id)
+                .where(AudioIndex.status == AudioStatus.PENDING_EMBEDDING)
+            )).all()
 
-        audio_chunks = self.session.query(AudioIndex).filter(
-            AudioIndex.video_id == video_id
-        ).all()
-        
-        chunk_id_map = {chunk.chunk_index : chunk.id for chunk in audio_chunks}
+    async def _update_transcription(self,video_id: uuid.UUID, transcriptions):
+
+        async with unit_of_work() as session:
+            chunk_ids = (await session.execute(
+                select(AudioIndex.chunk_index, AudioIndex.id).where(AudioIndex.video_id == video_id)
+            )).all()
+
+        chunk_id_map = {chunk_index : chunk_id for chunk_index, chunk_id in chunk_ids}
 
         updates = []
+        merged_ids = []
         try:
             for transcription in transcriptions:
                 chunk_id = chunk_id_map.get(transcription["chunk_index"])
                 print("[Audio Processor]: Log: transcription", transcription)
                 print("[Audio Processor]: Log: transcription Text", transcription["transcription"])
                 if chunk_id:
-                    updates.append({
+                    chunk_update = {
                         "id":chunk_id,
                         "transcription_text" : transcription["transcription"],
                         "status": AudioStatus.PENDING_EMBEDDING,
                         "updated_at": datetime.now(timezone.utc)
-                    })
+                    }
+                    # merged speech regions keep the first chunk and span to the last one
+                    if transcription.get("merged_chunk_indexes"):
+                        chunk_update["end_time"] = transcription["end_time"]
+                        merged_ids.extend(
+                            chunk_id_map[index] for index in transcription["merged_chunk_indexes"]
+                            if index in chunk_id_map)
+                    updates.append(chunk_update)
             
-            self.session.bulk_update_mappings(AudioIndex, updates)
-            self.session.commit()
+            async with unit_of_work() as session:
+                if merged_ids:
+                    await session.execute(
+                        delete(AudioIndex).where(AudioIndex.id.in_(merged_ids)),
+                        execution_options={"synchronize_session": False})
+                if updates:
+                    await session.execute(update(AudioIndex), updates)
             print(f"✅  [Audio Service] Transcriptions updated successfully")
-        
+
         except Exception as e:
-            self.session.rollback()
             print(f"❌  [Audio Service] audio transcription insertion failed: {e}")
             raise
 
-    def _update_transcription_embedding(self, embdeddings_info):
+    async def _mark_silent(self, video_id: uuid.UUID, chunk_indexes):
+        """
+        Mark chunks without speech so they are never sent to transcription
+        """
+        if not chunk_indexes:
+            return
+        try:
+            async with unit_of_work() as session:
+                await session.execute(
+                    update(AudioIndex).where(
+                        AudioIndex.video_id == video_id,
+                        AudioIndex.chunk_index.in_(list(chunk_indexes))
+                    ).values(status=AudioStatus.SILENT, updated_at=datetime.now(timezone.utc)),
+                    execution_options={"synchronize_session": False})
+            print(f"✅  [Audio Service] silent chunks marked : {len(chunk_indexes)}")
+        except Exception as e:
+            print(f"❌  [Audio Service] marking silent chunks failed: {e}")
+            raise
+
+    async def _update_transcription_embedding(self, embdeddings_info):
         updates=[]
         print(embdeddings_info[0],"ssss")
         try:
@@ -87,11 +143,10 @@ class AudioService:
                     "transcript_embedding": embedding,
                     "status": AudioStatus.COMPLETE
                 })
-            self.session.bulk_update_mappings(AudioIndex, updates)
-            self.session.commit()
+            async with unit_of_work() as session:
+                await session.execute(update(AudioIndex), updates)
             print(f"✅  [Audio Service] embeddings updated successfully")
         except Exception as e:
-            self.session.rollback()
             print(f"❌  [Audio Service] embedding updation failed",e)
             raise
 
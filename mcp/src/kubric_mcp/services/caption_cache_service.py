@@ -0,0 +1,74 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from kubric_mcp.db import unit_of_work
+from kubric_mcp.models import FrameCaptionCache
+from kubric_mcp.video.ingestion.frame_hash import hamming_distances
+from typing import Optional
+import numpy as np
+
+
+class CaptionCacheService:
+    """
+    DB services for the perceptual hash caption cache.
+
+    The hashes of every cached frame are loaded once into an int64 array, so a
+    lookup is a single vectorised Hamming distance scan. Only the matched row
+    is then read back for its caption and caption embedding.
+    """
+    def __init__(self, max_distance: int = 4):
+        self.max_distance = max_distance
+        self._hashes: Optional[np.ndarray] = None
+        self._ids = []
+        self.hits = 0
+        self.misses = 0
+
+    async def _load_index(self):
+        async with unit_of_work() as session:
+            rows = (await session.execute(select(FrameCaptionCache.id, FrameCaptionCache.perceptual_hash))).all()
+        self._ids = [row[0] for row in rows]
+        self._hashes = np.array([row[1] for row in rows], dtype=np.int64)
+
+    async def _lookup(self, perceptual_hash: Optional[int]) -> Optional[FrameCaptionCache]:
+        """
+        Return the cached entry closest to the hash within max_distance
+        """
+        if perceptual_hash is None:
+            return None
+        if self._hashes is None:
+            await self._load_index()
+        if len(self._hashes):
+            distances = hamming_distances(self._hashes, perceptual_hash)
+            best = int(np.argmin(distances))
+            if distances[best] <= self.max_distance:
+                async with unit_of_work() as session:
+                    entry = await session.get(FrameCaptionCache, self._ids[best])
+                if entry is not None:
+                    self.hits += 1
+                    return entry
+        self.misses += 1
+        return None
+
+    async def _store(self, entries):
+        """
+        Add captioned and embedded frames to the cache. Entries whose hash is
+        already cached are skipped.
+        """
+        rows = [entry for entry in entries if entry.get("perceptual_hash") is not None]
+        if not rows:
+            return
+        try:
+            statement = insert(FrameCaptionCache).values([
+                {
+                    "perceptual_hash": row["perceptual_hash"],
+                    "caption": row["caption"],
+                    "caption_embedding": row["caption_embedding"],
+                }
+                for row in rows
+            ]).on_conflict_do_nothing(index_elements=["perceptual_hash"])
+            async with unit_of_work() as session:
+                await session.execute(statement)
+            self._hashes = None
+            print(f"✅  [Caption Cache] cached captions : {len(rows)}")
+        except Exception as e:
+            print(f"❌  [Caption Cache] caching captions failed: {e}")
+            raise
@@ -0,0 +1,252 @@
+from minio.error import S3Error
+from kubric_mcp.config import get_settings
+from kubric_mcp.db import unit_of_work
+from kubric_mcp.models import VideoIndex
+from kubric_mcp.services.minio import Artifact, MinIOService
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+import asyncio
+import json
+import subprocess
+import tempfile
+import uuid
+
+
+@dataclass
+class Clip:
+    bucket_name: str
+    object_name: str
+    start_time: float
+    end_time: float
+    cached: bool
+    url: str
+
+
+def _run(command: List[str]) -> str:
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"[Clip Service] {command[0]} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+@dataclass
+class SourceStreams:
+    video_codec: Optional[str]
+    profile: Optional[str]
+    level: Optional[int]
+    pix_fmt: Optional[str]
+    audio_codec: Optional[str]
+    duration: float
+
+
+# ffprobe H.264 profile -> libx264 -profile:v
+X264_PROFILES = {
+    "Constrained Baseline": "baseline",
+    "Baseline": "baseline",
+    "Main": "main",
+    "High": "high",
+    "High 10": "high10",
+    "High 4:2:2": "high422",
+    "High 4:4:4 Predictive": "high444",
+}
+
+
+def probe_streams(url: str) -> SourceStreams:
+    """Codec parameters of the first video and audio streams and the container duration"""
+    probe = json.loads(_run([
+        "ffprobe", "-v", "error",
+        "-show_entries", "stream=codec_type,codec_name,profile,level,pix_fmt:format=duration", "-of", "json", url,
+    ]))
+    streams = probe.get("streams") or []
+    video = next((stream for stream in streams if stream.get("codec_type") == "video"), {})
+    audio = next((stream for stream in streams if stream.get("codec_type") == "audio"), {})
+    level = video.get("level")
+    return SourceStreams(
+        video_codec=video.get("codec_name"),
+        profile=video.get("profile"),
+        level=int(level) if level not in (None, "", -99) else None,
+        pix_fmt=video.get("pix_fmt"),
+        audio_codec=audio.get("codec_name"),
+        duration=float(probe.get("format", {}).get("duration") or 0),
+    )
+
+
+def exact_cut_boundaries(streams: SourceStreams, keyframes: List[float], start: float,
+                         end: float) -> Optional[Tuple[float, float]]:
+    """
+    Keyframes ending the re-encoded head and starting the re-encoded tail of
+    an exact cut, or None when the whole range has to be re-encoded. The
+    copied body is only joined with re-encoded ends when those can match
+    it: H.264 in a profile libx264 can produce, and AAC audio or none
+    """
+    if streams.video_codec != "h264" or streams.profile not in X264_PROFILES or streams.level is None:
+        return None
+    if streams.audio_codec not in (None, "aac"):
+        return None
+    inner = [k for k in keyframes if start < k < end]
+    if len(inner) < 2:
+        return None
+    return inner[0], inner[-1]
+
+
+def probe_keyframes(url: str, start: float, end: float) -> List[float]:
+    """
+    Keyframe timestamps between `start` and `end`. Only that interval is
+    read, over HTTP range requests when `url` is remote.
+    """
+    output = _run([
+        "ffprobe", "-v", "error", "-select_streams", "v:0", "-skip_frame", "nokey",
+        "-read_intervals", f"{max(start, 0):.3f}%{end:.3f}",
+        "-show_entries", "frame=pts_time,best_effort_timestamp_time", "-of", "csv=p=0", url,
+    ])
+    keyframes = set()
+    for line in output.splitlines():
+        for value in line.split(","):
+            if value and value != "N/A":
+                keyframes.add(round(float(value), 6))
+                break
+    return sorted(keyframes)
+
+
+class ClipService:
+    """
+    Cut clips of indexed videos with ffmpeg.
+
+    ffmpeg reads the source through a presigned MinIO URL, so only the
+    requested byte ranges are fetched. By default the clip is a stream copy
+    starting at the keyframe at or before `start_time`. With `exact=True` the
+    cut starts and ends exactly on the requested times: the partial GOPs at
+    both ends are re-encoded with the source's H.264 profile and level and
+    the keyframe-aligned middle is still stream copied. Sources that cannot
+    be joined that way (another codec, non AAC audio) are re-encoded whole.
+    Clips are stored in `MINIO_CLIP_BUCKET` under a key derived from the
+    video, its ETag, the range and the mode, so a repeated request is a
+    single HEAD.
+    """
+
+    def __init__(self, minio: MinIOService):
+        self.minio = minio
+        self.settings = get_settings()
+        self.bucket_name = self.settings.MINIO_CLIP_BUCKET
+
+    def _presigned_url(self, bucket_name: str, object_name: str) -> str:
+        return self.minio.client.presigned_get_object(
+            bucket_name, object_name, expires=timedelta(seconds=self.settings.CLIP_PRESIGNED_EXPIRY_SECONDS))
+
+    def _cached(self, object_name: str) -> bool:
+        try:
+            self.minio.client.stat_object(self.bucket_name, object_name)
+            return True
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return False
+            raise
+
+    def _keyframe_before(self, url: str, time: float) -> float:
+        window = self.settings.CLIP_KEYFRAME_SEARCH_SECONDS
+        while True:
+            keyframes = [k for k in probe_keyframes(url, time - window, time + 0.001) if k <= time + 1e-3]
+            if keyframes:
+                return keyframes[-1]
+            if time - window <= 0:
+                return 0.0
+            window *= 2
+
+    def _stream_copy(self, url: str, start: float, end: float, output: Path, container: str):
+        _run([
+            "ffmpeg", "-nostdin", "-v", "error", "-y", "-ss", f"{start:.6f}", "-i", url,
+            "-t", f"{end - start:.6f}", "-map", "0:v:0", "-map", "0:a:0?", "-c", "copy",
+            "-avoid_negative_ts", "make_zero", "-f", container, str(output),
+        ])
+
+    def _reencode(self, url: str, start: float, end: float, output: Path, container: str,
+                  match: Optional[SourceStreams] = None):
+        """
+        Re-encode a range to H.264 and AAC. With `match` the encoder uses the
+        source's profile, level and pixel format, so the segment can be
+        joined with stream copied H.264 from the same source
+        """
+        video_arguments = ["-c:v", "libx264", "-preset", self.settings.CLIP_ENCODER_PRESET, "-crf", "18"]
+        if match is not None:
+            video_arguments += ["-profile:v", X264_PROFILES[match.profile],
+                                "-level:v", f"{match.level / 10:.1f}"]
+            if match.pix_fmt:
+                video_arguments += ["-pix_fmt", match.pix_fmt]
+        _run([
+            "ffmpeg", "-nostdin", "-v", "error", "-y", "-ss", f"{start:.6f}", "-i", url,
+            "-t", f"{end - start:.6f}", "-map", "0:v:0", "-map", "0:a:0?",
+            *video_arguments, "-c:a", "aac", "-f", container, str(output),
+        ])
+
+    def _cut_exact(self, url: str, streams: SourceStreams, start: float, end: float, workdir: Path) -> Path:
+        output = workdir / "clip.mp4"
+        boundaries = exact_cut_boundaries(streams, probe_keyframes(url, start, end), start, end)
+        if boundaries is None:
+            self._reencode(url, start, end, output, "mp4")
+            return output
+
+        head_end, tail_start = boundaries
+        segments = []
+        for name, copy, segment_start, segment_end in (
+            ("head", False, start, head_end),
+            ("body", True, head_end, tail_start),
+            ("tail", False, tail_start, end),
+        ):
+            segment = workdir / f"{name}.ts"
+            if copy:
+                self._stream_copy(url, segment_start, segment_end, segment, "mpegts")
+            else:
+                self._reencode(url, segment_start, segment_end, segment, "mpegts", match=streams)
+            segments.append(segment)
+        _run([
+            "ffmpeg", "-nostdin", "-v", "error", "-y",
+            "-i", "concat:" + "|".join(str(segment) for segment in segments),
+            "-c", "copy", "-bsf:a", "aac_adtstoasc", "-movflags", "+faststart", str(output),
+        ])
+        return output
+
+    async def get_clip(self, video_id: uuid.UUID, start_time: float, end_time: float, exact: bool = False) -> Clip:
+        if start_time < 0 or start_time >= end_time:
+            raise ValueError("start_time must be non negative and less than end_time")
+        async with unit_of_work() as session:
+            video = await session.get(VideoIndex, video_id)
+        if video is None:
+            raise ValueError(f"[Clip Service] video {video_id} not found")
+        # probing, cutting and uploading block, keep them off the event loop
+        return await asyncio.to_thread(self._get_clip, video, start_time, end_time, exact)
+
+    def _get_clip(self, video: VideoIndex, start_time: float, end_time: float, exact: bool) -> Clip:
+        source_bucket = self.minio.bucket_name
+        stat = self.minio.client.stat_object(source_bucket, video.minio_path)
+        mode = "exact" if exact else "keyframe"
+        object_name = f"{video.id}/{stat.etag}/{int(start_time * 1000)}-{int(end_time * 1000)}-{mode}.mp4"
+        if self._cached(object_name):
+            return Clip(self.bucket_name, object_name, start_time, end_time, True,
+                        self._presigned_url(self.bucket_name, object_name))
+
+        url = self._presigned_url(source_bucket, video.minio_path)
+        streams = probe_streams(url)
+        if streams.duration:
+            end_time = min(end_time, streams.duration)
+        with tempfile.TemporaryDirectory(prefix="kubric-clip-") as workdir:
+            workdir = Path(workdir)
+            if exact:
+                output = self._cut_exact(url, streams, start_time, end_time, workdir)
+                clip_start = start_time
+            else:
+                clip_start = self._keyframe_before(url, start_time)
+                output = workdir / "clip.mp4"
+                self._stream_copy(url, clip_start, end_time, output, "mp4")
+            self.minio.put(Artifact(
+                bucket_name=self.bucket_name,
+                object_name=object_name,
+                data=output.read_bytes(),
+                content_type="video/mp4",
+                metadata={"video_id": str(video.id), "clip_start": f"{clip_start:.3f}",
+                          "clip_end": f"{end_time:.3f}"},
+            ))
+        print(f"✅ [Clip Service] stored clip {object_name}")
+        return Clip(self.bucket_name, object_name, clip_start, end_time, False,
+                    self._presigned_url(self.bucket_name, object_name))
@@ -0,0 +1,191 @@
+from sqlalchemy import func, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from kubric_mcp.models import TextEmbeddingCache
+from kubric_mcp.db import unit_of_work
+from kubric_mcp.config import get_settings
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+import hashlib
+import threading
+import unicodedata
+
+CacheKey = Tuple[str, int, str]
+
+# rows per statement, asyncpg takes at most 32767 bind parameters per query
+DB_BATCH_SIZE = 1000
+# the stored size is re-read from the table every this many writes, so
+# other processes' writes are counted too
+SIZE_RESYNC_WRITES = 100
+
+
+def normalise_text(text: Optional[str]) -> str:
+    """NFKC, trimmed, whitespace collapsed"""
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+def cache_key(model: str, dimensions: Optional[int], text: str) -> CacheKey:
+    digest = hashlib.sha256(normalise_text(text).encode("utf-8")).hexdigest()
+    return (model, dimensions or 0, digest)
+
+
+class EmbeddingCache:
+    """
+    Two tier content-addressed cache for text embeddings.
+
+    Keys are (model, dimensions, sha256 of the normalised text); dimensions is
+    0 when the model's native size is used. The first tier is an in-process
+    LRU of `lru_size` entries, the second the text_embedding_cache table,
+    trimmed back to `max_bytes` of embeddings by least recent use. Writes keep
+    a running total of the stored bytes, so the table is only summed again
+    after an eviction or every `SIZE_RESYNC_WRITES` writes.
+    """
+
+    def __init__(self, lru_size: int, max_bytes: int):
+        self.lru_size = lru_size
+        self.max_bytes = max_bytes
+        self._lru: "OrderedDict[CacheKey, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.lru_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._stored_bytes: Optional[int] = None
+        self._writes = 0
+
+    def _remember(self, key: CacheKey, embedding: List[float]):
+        with self._lock:
+            self._lru[key] = embedding
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    async def get_many(self, keys: Sequence[CacheKey]) -> Dict[CacheKey, List[float]]:
+        found: Dict[CacheKey, List[float]] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[key] = self._lru[key]
+            self.lru_hits += len(found)
+
+        missing = list({key for key in keys if key not in found})
+        rows = []
+        if missing:
+            key_columns = tuple_(TextEmbeddingCache.model, TextEmbeddingCache.dimensions,
+                                 TextEmbeddingCache.text_sha256)
+            async with unit_of_work() as session:
+                for start in range(0, len(missing), DB_BATCH_SIZE):
+                    batch = (await session.execute(
+                        select(TextEmbeddingCache.model, TextEmbeddingCache.dimensions,
+                               TextEmbeddingCache.text_sha256, TextEmbeddingCache.embedding)
+                        .where(key_columns.in_(missing[start:start + DB_BATCH_SIZE]))
+                    )).all()
+                    if batch:
+                        await session.execute(
+                            update(TextEmbeddingCache)
+                            .where(key_columns.in_([tuple(row[:3]) for row in batch]))
+                            .values(last_used_at=datetime.now(timezone.utc))
+                        )
+                    rows.extend(batch)
+            for model, dimensions, digest, embedding in rows:
+                key = (model, dimensions, digest)
+                found[key] = list(embedding)
+                self._remember(key, found[key])
+            with self._lock:
+                self.db_hits += len(rows)
+                self.misses += len(missing) - len(rows)
+        return found
+
+    async def put_many(self, entries: Dict[CacheKey, List[float]]):
+        if not entries:
+            return
+        for key, embedding in entries.items():
+            self._remember(key, embedding)
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "model": model,
+                "dimensions": dimensions,
+                "text_sha256": digest,
+                "embedding": embedding,
+                "size_bytes": len(embedding) * 4,
+                "created_at": now,
+                "last_used_at": now,
+            }
+            for (model, dimensions, digest), embedding in entries.items()
+        ]
+        try:
+            async with unit_of_work() as session:
+                for start in range(0, len(rows), DB_BATCH_SIZE):
+                    statement = insert(TextEmbeddingCache).values(rows[start:start + DB_BATCH_SIZE])
+                    statement = statement.on_conflict_do_update(
+                        constraint="text_embedding_cache_pkey",
+                        set_={"last_used_at": statement.excluded.last_used_at},
+                    )
+                    await session.execute(statement)
+                await session.commit()
+                await self._evict(session, sum(row["size_bytes"] for row in rows))
+        except Exception as e:
+            print(f"❌  [Embedding Cache] caching embeddings failed: {e}")
+            raise
+
+    async def _evict(self, session, written_bytes: int):
+        with self._lock:
+            self._writes += 1
+            resync = self._stored_bytes is None or self._writes % SIZE_RESYNC_WRITES == 0
+            if not resync:
+                # conflicting rows are counted again, which only brings the next resync forward
+                self._stored_bytes += written_bytes
+                total = self._stored_bytes
+        if resync:
+            total = (await session.execute(
+                select(func.coalesce(func.sum(TextEmbeddingCache.size_bytes), 0)))).scalar()
+            with self._lock:
+                self._stored_bytes = total
+        if total <= self.max_bytes:
+            return
+        evicted = (await session.execute(text("""
+            WITH ranked AS (
+                SELECT ctid, SUM(size_bytes) OVER (ORDER BY last_used_at DESC) AS running_bytes
+                FROM text_embedding_cache
+            )
+            DELETE FROM text_embedding_cache
+            WHERE ctid IN (SELECT ctid FROM ranked WHERE running_bytes > :max_bytes)
+        """), {"max_bytes": self.max_bytes})).rowcount
+        await session.commit()
+        with self._lock:
+            self.evicted += evicted
+            self._stored_bytes = None
+        if evicted:
+            print(f"✅  [Embedding Cache] evicted {evicted} embeddings over the {self.max_bytes} byte budget")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.lru_hits + self.db_hits + self.misses
+            return {
+                "lru_hits": self.lru_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.lru_hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+                "lru_entries": len(self._lru),
+                "evicted": self.evicted,
+            }
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _embedding_cache
+
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                settings = get_settings()
+                _embedding_cache = EmbeddingCache(
+                    lru_size=settings.EMBEDDING_CACHE_LRU_SIZE,
+                    max_bytes=settings.EMBEDDING_CACHE_MAX_BYTES,
+                )
+    return _embedding_cache
@@ -0,0 +1,193 @@
+from sqlalchemy import select, text, update
+from kubric_mcp.db import unit_of_work
+from kubric_mcp.models import FrameIndex
+from kubric_mcp.models.frames import FrameStatus
+from typing import Iterable, Iterator, List, Optional, Sequence
+from datetime import datetime, timezone
+import numpy as np
+import struct
+import uuid
+import io
+
+# binary COPY framing, see https://www.postgresql.org/docs/current/sql-copy.html
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+COPY_TRAILER = struct.pack("!h", -1)
+COPY_NULL = struct.pack("!i", -1)
+
+
+def _encode_vector(embedding) -> bytes:
+    """pgvector binary format: int16 dim, int16 unused, float4[dim] big-endian"""
+    values = np.asarray(embedding, dtype=">f4").ravel()
+    return struct.pack("!HH", values.shape[0], 0) + values.tobytes()
+
+
+def _field(data: bytes) -> bytes:
+    return struct.pack("!i", len(data)) + data
+
+
+class _CopyStream(io.RawIOBase):
+    """File-like view over an iterator of byte strings, read by copy_to_table"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class FrameService:
+    """
+    DB services for frames, each method runs in its own unit of work
+    """
+
+    def _frame_rows(self, video_id: uuid.UUID, timestamps: Sequence[float], embeddings,
+                    perceptual_hashes: Sequence[Optional[int]], status: FrameStatus) -> Iterable[bytes]:
+        yield COPY_HEADER
+        video_id_field = _field(video_id.bytes)
+        status_field = _field(status.name.encode("utf-8"))
+        for timestamp, embedding, perceptual_hash in zip(timestamps, embeddings, perceptual_hashes):
+            hash_field = COPY_NULL if perceptual_hash is None else _field(struct.pack("!q", perceptual_hash))
+            yield (
+                struct.pack("!h", 5)
+                + video_id_field
+                + _field(struct.pack("!d", float(timestamp)))
+                + _field(_encode_vector(embedding))
+                + hash_field
+                + status_field
+            )
+        yield COPY_TRAILER
+
+    async def _bulk_upsert_frame_embeddings(self, video_id: uuid.UUID, timestamps: Sequence[float], embeddings,
+                                      perceptual_hashes: Optional[Sequence[Optional[int]]] = None,
+                                      status: FrameStatus = FrameStatus.PENDING_CAPTON) -> int:
+        """
+        Stream frame embeddings into frames_index with a single binary COPY.
+
+        Rows land in a temporary staging table and are merged into
+        frames_index on the unique_frame_timestamp constraint, so re-running
+        the frame stage refreshes embeddings instead of failing. Frames that
+        already moved past the image embedding stage keep their status.
+        """
+        if len(timestamps) != len(embeddings):
+            raise ValueError("❌ [Frame Service] timestamps and embeddings length mismatch")
+        if not len(timestamps):
+            return 0
+        if perceptual_hashes is None:
+            perceptual_hashes = [None] * len(timestamps)
+
+        status_type = FrameIndex.__table__.c.status.type.name
+        dimensions = FrameIndex.__table__.c.frame_embedding.type.dim
+        try:
+            async with unit_of_work() as session:
+                await session.execute(text(f"""
+                    CREATE TEMP TABLE frames_index_staging (
+                        video_id uuid,
+                        timestamp_seconds float8,
+                        frame_embedding vector({dimensions}),
+                        perceptual_hash bigint,
+                        status text
+                    ) ON COMMIT DROP
+                """))
+                # binary COPY straight on the asyncpg connection, inside the session's transaction
+                connection = await (await session.connection()).get_raw_connection()
+                await connection.driver_connection.copy_to_table(
+                    "frames_index_staging",
+                    source=_CopyStream(iter(self._frame_rows(video_id, timestamps, embeddings, perceptual_hashes, status))),
+                    format="binary",
+                )
+                result = await session.execute(text(f"""
+                    INSERT INTO frames_index (id, video_id, timestamp_seconds, frame_embedding, perceptual_hash,
+                                              status, created_at, updated_at)
+                    SELECT DISTINCT ON (video_id, timestamp_seconds)
+                        gen_random_uuid(), video_id, timestamp_seconds, frame_embedding, perceptual_hash,
+                        status::{status_type}, now(), now()
+                    FROM frames_index_staging
+                    ON CONFLICT ON CONSTRAINT unique_frame_timestamp DO UPDATE SET
+                        frame_embedding = EXCLUDED.frame_embedding,
+                        perceptual_hash = EXCLUDED.perceptual_hash,
+                        status = CASE
+                            WHEN frames_index.status = '{FrameStatus.PENDING_IMAGE_EMBEDDING.name}'
+                            THEN EXCLUDED.status ELSE frames_index.status END,
+                        updated_at = EXCLUDED.updated_at
+                """))
+                upserted = result.rowcount
+            print(f"✅  [Frame Service] frame embeddings upserted : {upserted}")
+            return upserted
+        except Exception as e:
+            print(f"❌  [Frame Service] frame embedding upsert failed: {e}")
+            raise
+
+    async def _get_frames(self, video_id: uuid.UUID, status: FrameStatus) -> List[FrameIndex]:
+        """
+        Frames of a video in the given stage, ordered by timestamp
+        """
+        async with unit_of_work() as session:
+            return (await session.scalars(
+                select(FrameIndex).where(
+                    FrameIndex.video_id == video_id,
+                    FrameIndex.status == status,
+                ).order_by(FrameIndex.timestamp_seconds)
+            )).all()
+
+    async def _get_statuses(self, video_id: uuid.UUID) -> List[FrameStatus]:
+        """
+        Distinct stages the frames of a video are in
+        """
+        async with unit_of_work() as session:
+            return (await session.scalars(
+                select(FrameIndex.status).where(FrameIndex.video_id == video_id).distinct()
+            )).all()
+
+    async def _update_captions(self, captions_info):
+        """
+        Bulk update frame captions. Each entry carries the frame id, the
+        caption, the next status and optionally a reused caption embedding.
+        """
+        updates = []
+        try:
+            for caption_info in captions_info:
+                caption_update = {
+                    "id": caption_info["id"],
+                    "caption": caption_info["caption"],
+                    "status": caption_info["status"],
+                    "updated_at": datetime.now(timezone.utc),
+                }
+                if caption_info.get("caption_embedding") is not None:
+                    caption_update["caption_embedding"] = caption_info["caption_embedding"]
+                updates.append(caption_update)
+            async with unit_of_work() as session:
+                await session.execute(update(FrameIndex), updates)
+            print(f"✅  [Frame Service] captions updated : {len(updates)}")
+        except Exception as e:
+            print(f"❌  [Frame Service] caption updation failed: {e}")
+            raise
+
+    async def _update_caption_embedding(self, embeddings_info):
+        updates = []
+        try:
+            for embeddings in embeddings_info:
+                updates.append({
+                    "id": embeddings["id"],
+                    "caption_embedding": embeddings["embedding"],
+                    "status": FrameStatus.COMPLETE,
+                    "updated_at": datetime.now(timezone.utc),
+                })
+            async with unit_of_work() as session:
+                await session.execute(update(FrameIndex), updates)
+            print(f"✅  [Frame Service] caption embeddings updated : {len(updates)}")
+        except Exception as e:
+            print(f"❌  [Frame Service] caption embedding updation failed: {e}")
+            raise
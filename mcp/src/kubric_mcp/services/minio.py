@@ -1,19 +1,139 @@
 from minio import Minio
 from minio.error import S3Error
+from minio.helpers import ObjectWriteResult
 from typing import Optional, BinaryIO
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
+import asyncio
+import io
 import logging
+import threading
+import time
+import urllib3
 
 from pathlib import Path
-from kubric_mcp.config import Settings
+from kubric_mcp.config import Settings, get_settings
 
 logger = logging.getLogger("uvicorn")
 
 
-def get_minio_service(setting: Settings):
-    return Minio(
-        endpoint=setting.MINIO_ENDPOINT,
-        access_key=setting.MINIO_ACCESS_KEY,
-        secret_key=setting.MINIO_SECRET_KEY,
-        secure=False
-    )
+@dataclass
+class Artifact:
+    """An object to store, e.g. an audio chunk or a thumbnail"""
+    bucket_name: str
+    object_name: str
+    data: bytes
+    content_type: str = "application/octet-stream"
+    metadata: dict = field(default_factory=dict)
+
+
+class MinIOService:
+    """
+    Process-wide storage service.
+
+    One Minio client shares a urllib3 pool of `MINIO_POOL_MAXSIZE`
+    connections, buckets are checked once per process instead of before
+    every upload, and `put_async` uploads artifacts from the event loop on
+    a pool of `MINIO_UPLOAD_WORKERS` threads.
+    """
+
+    def __init__(self, setting: Settings):
+        self.setting = setting
+        http_client = urllib3.PoolManager(
+            maxsize=setting.MINIO_POOL_MAXSIZE,
+            timeout=urllib3.Timeout(connect=setting.MINIO_CONNECT_TIMEOUT_SECONDS,
+                                    read=setting.MINIO_READ_TIMEOUT_SECONDS),
+            retries=urllib3.Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+        )
+        self.client = Minio(
+            endpoint=setting.MINIO_ENDPOINT,
+            access_key=setting.MINIO_ACCESS_KEY,
+            secret_key=setting.MINIO_SECRET_KEY,
+            secure=False,
+            http_client=http_client
+        )
+        self.bucket_name = setting.MINIO_BUCKET_NAME
+        self._ready_buckets = set()
+        self._bucket_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=setting.MINIO_UPLOAD_WORKERS, thread_name_prefix="minio-upload")
+        self._stats_lock = threading.Lock()
+        self.bucket_checks = 0
+        self.puts = 0
+        self.put_errors = 0
+        self.put_seconds = 0.0
+
+    def ensure_buckets(self, *bucket_names: str):
+        """Create missing buckets, each bucket is only checked once per process"""
+        with self._bucket_lock:
+            for bucket_name in bucket_names:
+                if bucket_name in self._ready_buckets:
+                    continue
+                self.bucket_checks += 1
+                try:
+                    if not self.client.bucket_exists(bucket_name):
+                        self.client.make_bucket(bucket_name)
+                        logger.info(f"Created Bucket : {bucket_name}")
+                except S3Error as e:
+                    # created concurrently by another process
+                    if e.code not in ("BucketAlreadyOwnedByYou", "BucketAlreadyExists"):
+                        logger.error(f"Error creating bucket : {e}")
+                        raise
+                self._ready_buckets.add(bucket_name)
+
+    def put(self, artifact: Artifact) -> ObjectWriteResult:
+        self.ensure_buckets(artifact.bucket_name)
+        started = time.perf_counter()
+        try:
+            result = self.client.put_object(
+                bucket_name=artifact.bucket_name,
+                object_name=artifact.object_name,
+                data=io.BytesIO(artifact.data),
+                length=len(artifact.data),
+                content_type=artifact.content_type,
+                metadata=artifact.metadata or None
+            )
+        except S3Error:
+            with self._stats_lock:
+                self.put_errors += 1
+            raise
+        with self._stats_lock:
+            self.puts += 1
+            self.put_seconds += time.perf_counter() - started
+        return result
+
+    async def put_async(self, artifact: Artifact) -> ObjectWriteResult:
+        """Upload one artifact on the upload pool without blocking the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.put, artifact)
+
+    def get_file(self, file_path: str):
+        try:
+            return self.client.get_object(self.bucket_name, file_path)
+        except S3Error as e:
+            logger.error(f"Error in fetching object:{e}")
+            raise
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "puts": self.puts,
+                "put_errors": self.put_errors,
+                "avg_put_seconds": round(self.put_seconds / self.puts, 4) if self.puts else 0.0,
+                "bucket_checks": self.bucket_checks,
+                "ready_buckets": sorted(self._ready_buckets),
+            }
+
+
+_minio_service: Optional[MinIOService] = None
+_minio_service_lock = threading.Lock()
+
+
+def get_minio_service(setting: Optional[Settings] = None) -> MinIOService:
+    global _minio_service
+
+    if _minio_service is None:
+        with _minio_service_lock:
+            if _minio_service is None:
+                _minio_service = MinIOService(setting or get_settings())
+    return _minio_service
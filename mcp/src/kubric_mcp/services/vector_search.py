@@ -0,0 +1,181 @@
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Engine
+from kubric_mcp.config import get_settings
+from kubric_mcp.db import unit_of_work
+from kubric_mcp.models import AudioIndex, FrameIndex
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+import math
+import time
+import uuid
+
+# metric -> operator class
+OPERATOR_CLASSES = {
+    "cosine": "vector_cosine_ops",
+    "ip": "vector_ip_ops",
+    "l2": "vector_l2_ops",
+}
+
+
+@dataclass(frozen=True)
+class VectorIndexSpec:
+    table: str
+    column: str
+    metric: str
+
+    def index_name(self, method: str) -> str:
+        return f"ix_{self.table}_{self.column}_{method}"
+
+    def distance(self, column, embedding):
+        if self.metric == "ip":
+            return column.max_inner_product(embedding)
+        if self.metric == "cosine":
+            return column.cosine_distance(embedding)
+        return column.l2_distance(embedding)
+
+
+# OpenAI text embeddings are unit length, so inner product ranks like cosine
+# without the normalisation. Frame embeddings are compared with cosine, query
+# vectors for them do not have to come from the normalising image backend.
+VECTOR_INDEXES = [
+    VectorIndexSpec(AudioIndex.__tablename__, "transcript_embedding", "ip"),
+    VectorIndexSpec(FrameIndex.__tablename__, "caption_embedding", "ip"),
+    VectorIndexSpec(FrameIndex.__tablename__, "frame_embedding", "cosine"),
+]
+
+
+def ivfflat_lists(rows: int) -> int:
+    """pgvector's starting point: rows / 1000 up to a million rows, sqrt(rows) above"""
+    if rows <= 1_000_000:
+        return max(rows // 1000, 1)
+    return int(math.sqrt(rows))
+
+
+def index_ddl(name: str, table: str, column: str, metric: str, method: str, lists: Optional[int] = None) -> str:
+    """
+    CREATE INDEX CONCURRENTLY for an ANN index, it has to run outside a
+    transaction
+    """
+    settings = get_settings()
+    operator_class = OPERATOR_CLASSES[metric]
+    if method == "hnsw":
+        options = f"m = {settings.VECTOR_HNSW_M}, ef_construction = {settings.VECTOR_HNSW_EF_CONSTRUCTION}"
+    elif method == "ivfflat":
+        options = f"lists = {lists or 100}"
+    else:
+        raise ValueError(f"[Vector Search] unknown index method {method}")
+    return (f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} "
+            f"USING {method} ({column} {operator_class}) WITH ({options})")
+
+
+def build_index(connection, spec: VectorIndexSpec, method: str, min_rows: int = 0) -> bool:
+    """
+    Build one ANN index on an autocommit connection. An index left invalid
+    by an interrupted concurrent build is dropped and built again.
+    """
+    name = spec.index_name(method)
+    valid = connection.execute(text(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+    ), {"name": name}).scalar()
+    if valid:
+        return False
+    if valid is not None:
+        print(f"[Vector Search] dropping invalid index {name}")
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+    lists = None
+    if method == "ivfflat":
+        rows = connection.execute(text(
+            f"SELECT count(*) FROM {spec.table} WHERE {spec.column} IS NOT NULL")).scalar()
+        if rows < min_rows:
+            print(f"[Vector Search] {spec.table}.{spec.column} has {rows} rows, ivfflat index deferred")
+            return False
+        lists = ivfflat_lists(rows)
+
+    started = time.perf_counter()
+    connection.execute(text(index_ddl(name, spec.table, spec.column, spec.metric, method, lists=lists)))
+    print(f"✅ [Vector Search] built {name} in {time.perf_counter() - started:.1f}s")
+    return True
+
+
+def create_vector_indexes(engine: Engine, method: Optional[str] = None):
+    """
+    Build the ANN index of every embedding column. Builds are concurrent, so
+    ingestion keeps writing to the tables meanwhile.
+    """
+    settings = get_settings()
+    method = method or settings.VECTOR_INDEX_METHOD
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(f"SET maintenance_work_mem = '{settings.VECTOR_INDEX_MAINTENANCE_WORK_MEM}'"))
+        for spec in VECTOR_INDEXES:
+            try:
+                build_index(connection, spec, method, min_rows=settings.VECTOR_IVFFLAT_MIN_ROWS)
+            except Exception as e:
+                print(f"❌ [Vector Search] building {spec.index_name(method)} failed: {e}")
+
+
+@dataclass
+class SearchHit:
+    id: uuid.UUID
+    video_id: uuid.UUID
+    score: float
+    start_time: float
+    end_time: float
+    text: Optional[str]
+
+
+class VectorSearchService:
+    """
+    Nearest neighbour search over the embedding columns.
+
+    `ef_search` (HNSW) and `probes` (IVFFlat) trade recall for latency and are
+    set per query with set_config(..., is_local => true), so they only apply
+    to the query's own transaction. HNSW never returns more than ef_search
+    rows, so it is raised to top_k when lower.
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+
+    async def _search(self, spec: VectorIndexSpec, column, columns, embedding: Sequence[float], top_k: int,
+                      ef_search: Optional[int], probes: Optional[int]):
+        distance = spec.distance(column, embedding)
+        async with unit_of_work() as session:
+            await session.execute(select(
+                func.set_config("hnsw.ef_search", str(max(ef_search or self.settings.VECTOR_HNSW_EF_SEARCH, top_k)), True),
+                func.set_config("ivfflat.probes", str(probes or self.settings.VECTOR_IVFFLAT_PROBES), True),
+            ))
+            return (await session.execute(
+                select(*columns, distance.label("distance")).order_by(distance).limit(top_k)
+            )).all()
+
+    def _score(self, metric: str, distance: float) -> float:
+        # <#> is the negative inner product, <=> is 1 - cosine similarity
+        return -distance if metric == "ip" else 1 - distance
+
+    async def search_transcripts(self, embedding: Sequence[float], top_k: int = 5,
+                                 ef_search: Optional[int] = None, probes: Optional[int] = None) -> List[SearchHit]:
+        spec = VECTOR_INDEXES[0]
+        rows = await self._search(spec, AudioIndex.transcript_embedding, (AudioIndex.id, AudioIndex.video_id, AudioIndex.start_time,
+                                         AudioIndex.end_time, AudioIndex.transcription_text),
+                                  embedding, top_k, ef_search, probes)
+        return [SearchHit(row.id, row.video_id, self._score(spec.metric, row.distance), row.start_time,
+                          row.end_time, row.transcription_text) for row in rows]
+
+    async def search_captions(self, embedding: Sequence[float], top_k: int = 5,
+                              ef_search: Optional[int] = None, probes: Optional[int] = None) -> List[SearchHit]:
+        spec = VECTOR_INDEXES[1]
+        rows = await self._search(spec, FrameIndex.caption_embedding, (FrameIndex.id, FrameIndex.video_id,
+                                                                       FrameIndex.timestamp_seconds, FrameIndex.caption),
+                                  embedding, top_k, ef_search, probes)
+        return [SearchHit(row.id, row.video_id, self._score(spec.metric, row.distance), row.timestamp_seconds,
+                          row.timestamp_seconds, row.caption) for row in rows]
+
+    async def search_frames(self, embedding: Sequence[float], top_k: int = 5,
+                            ef_search: Optional[int] = None, probes: Optional[int] = None) -> List[SearchHit]:
+        spec = VECTOR_INDEXES[2]
+        rows = await self._search(spec, FrameIndex.frame_embedding,
+                                  (FrameIndex.id, FrameIndex.video_id, FrameIndex.timestamp_seconds),
+                                  embedding, top_k, ef_search, probes)
+        return [SearchHit(row.id, row.video_id, self._score(spec.metric, row.distance), row.timestamp_seconds,
+                          row.timestamp_seconds, None) for row in rows]
@@ -0,0 +1,177 @@
+from minio import Minio
+from minio.datatypes import Object
+from kubric_mcp.config import get_settings
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+import hashlib
+import os
+import threading
+import uuid
+
+
+@dataclass
+class CachedVideo:
+    key: str
+    path: str
+    size: int
+    stat: Optional[Object] = None
+
+
+class VideoCache:
+    """
+    On-disk LRU cache of source videos.
+
+    Files are named by the sha256 of bucket/object/etag, so a re-uploaded
+    object never hits a stale copy and the index can be rebuilt from the
+    directory after a restart. The cache is trimmed back to `max_bytes` by
+    least recent use, skipping videos that are leased by a running
+    processor. Concurrent requests for the same object share one download.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CachedVideo]" = OrderedDict()
+        self._leases: Dict[str, int] = {}
+        self._downloads: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.bytes_saved = 0
+        self.bytes_downloaded = 0
+        self.evicted = 0
+        self._load_index()
+
+    def _load_index(self):
+        # downloads interrupted by a crash or restart are never completed
+        for partial in self.directory.glob(".*.part"):
+            partial.unlink(missing_ok=True)
+        files = [path for path in self.directory.iterdir() if path.is_file() and not path.name.startswith(".")]
+        for path in sorted(files, key=lambda path: path.stat().st_mtime):
+            self._entries[path.stem] = CachedVideo(key=path.stem, path=str(path), size=path.stat().st_size)
+
+    @staticmethod
+    def cache_key(bucket: str, object_name: str, etag: str) -> str:
+        return hashlib.sha256(f"{bucket}/{object_name}/{etag}".encode("utf-8")).hexdigest()
+
+    def acquire(self, client: Minio, bucket: str, object_name: str) -> CachedVideo:
+        """
+        Local copy of the object, downloaded on a miss. The video stays
+        leased, and is never evicted, until `release` is called.
+        """
+        stat = client.stat_object(bucket, object_name)
+        key = self.cache_key(bucket, object_name, stat.etag)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and os.path.exists(entry.path):
+                self._entries.move_to_end(key)
+                self._leases[key] = self._leases.get(key, 0) + 1
+                self.hits += 1
+                self.bytes_saved += entry.size
+                os.utime(entry.path)
+                return CachedVideo(key, entry.path, entry.size, stat)
+            self._entries.pop(key, None)
+            download = self._downloads.get(key)
+            owner = download is None
+            if owner:
+                download = self._downloads[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+                self.bytes_saved += stat.size
+            self._leases[key] = self._leases.get(key, 0) + 1
+
+        if not owner:
+            try:
+                entry = download.result()
+            except BaseException:
+                self._release_key(key)
+                raise
+            return CachedVideo(key, entry.path, entry.size, stat)
+
+        path = self.directory / f"{key}{Path(object_name).suffix}"
+        partial = self.directory / f".{key}.{uuid.uuid4().hex}.part"
+        try:
+            client.fget_object(bucket, object_name, str(partial))
+            os.replace(partial, path)
+            entry = CachedVideo(key, str(path), path.stat().st_size)
+        except BaseException as e:
+            partial.unlink(missing_ok=True)
+            with self._lock:
+                self._downloads.pop(key, None)
+            self._release_key(key)
+            download.set_exception(e)
+            raise
+        with self._lock:
+            self._entries[key] = entry
+            self._downloads.pop(key, None)
+            self.bytes_downloaded += entry.size
+        download.set_result(entry)
+        print(f"✅  [Video Cache] downloaded {object_name} ({entry.size} bytes)")
+        self._evict()
+        return CachedVideo(key, entry.path, entry.size, stat)
+
+    def _release_key(self, key: str):
+        with self._lock:
+            leases = self._leases.get(key, 0) - 1
+            if leases > 0:
+                self._leases[key] = leases
+            else:
+                self._leases.pop(key, None)
+
+    def release(self, video: CachedVideo):
+        self._release_key(video.key)
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            total = sum(entry.size for entry in self._entries.values())
+            for key in list(self._entries):
+                if total <= self.max_bytes:
+                    break
+                if self._leases.get(key):
+                    continue
+                entry = self._entries.pop(key)
+                Path(entry.path).unlink(missing_ok=True)
+                total -= entry.size
+                self.evicted += 1
+                print(f"✅  [Video Cache] evicted {entry.path} ({entry.size} bytes)")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "bytes_downloaded": self.bytes_downloaded,
+                "evicted": self.evicted,
+                "entries": len(self._entries),
+                "bytes": sum(entry.size for entry in self._entries.values()),
+                "leased": len(self._leases),
+            }
+
+
+_video_cache: Optional[VideoCache] = None
+_video_cache_lock = threading.Lock()
+
+
+def get_video_cache() -> VideoCache:
+    global _video_cache
+
+    if _video_cache is None:
+        with _video_cache_lock:
+            if _video_cache is None:
+                settings = get_settings()
+                _video_cache = VideoCache(
+                    directory=settings.VIDEO_CACHE_DIR,
+                    max_bytes=settings.VIDEO_CACHE_MAX_BYTES,
+                )
+    return _video_cache
@@ -0,0 +1,126 @@
+import asyncio
+import io
+import multiprocessing
+import os
+import subprocess
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+from scipy.io import wavfile
+
+from kubric_mcp.config import get_settings
+from kubric_mcp.video.ingestion.audio_stream import SAMPLE_RATE
+
+# codec -> (ffmpeg output arguments, content type, file extension)
+CODECS = {
+    "wav": ([], "audio/wav", "wav"),
+    "flac": (["-c:a", "flac", "-compression_level", "5", "-f", "flac"], "audio/flac", "flac"),
+    "opus": (["-c:a", "libopus", "-application", "voip", "-f", "ogg"], "audio/ogg", "ogg"),
+}
+
+
+@dataclass
+class EncodedAudio:
+    data: bytes
+    codec: str
+    content_type: str
+    extension: str
+
+    def to_buffer(self, name: str) -> io.BytesIO:
+        buffer = io.BytesIO(self.data)
+        buffer.name = f"{name}.{self.extension}"
+        return buffer
+
+
+def _run_ffmpeg(input_args, codec: str, sample_rate: int, bitrate: str, stdin: bytes = None) -> bytes:
+    arguments = CODECS[codec][0]
+    if codec == "opus":
+        arguments = arguments + ["-b:a", bitrate]
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", "-f", "s16le", "-ar", str(sample_rate), "-ac", "1",
+         *input_args, *arguments, "pipe:1"],
+        input=stdin,
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"Audio Codec: ffmpeg {codec} encoding failed: {result.stderr.decode(errors='ignore')}")
+    return result.stdout
+
+
+def encode_pcm(pcm: np.ndarray, codec: str, sample_rate: int = SAMPLE_RATE, bitrate: str = "24k") -> EncodedAudio:
+    """
+    Encode mono s16le PCM with the given codec. WAV is written in-process,
+    FLAC and Opus/OGG through an ffmpeg subprocess.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Audio Codec: unknown codec {codec}")
+    _, content_type, extension = CODECS[codec]
+    if codec == "wav":
+        buffer = io.BytesIO()
+        wavfile.write(buffer, sample_rate, pcm)
+        return EncodedAudio(buffer.getvalue(), codec, content_type, extension)
+    data = _run_ffmpeg(["-i", "pipe:0"], codec, sample_rate, bitrate,
+                       stdin=np.ascontiguousarray(pcm, dtype=np.int16).tobytes())
+    return EncodedAudio(data, codec, content_type, extension)
+
+
+def encode_pcm_file(path: str, codec: str, sample_rate: int = SAMPLE_RATE, bitrate: str = "24k") -> EncodedAudio:
+    """
+    Encode raw s16le PCM spooled to `path`. Runs in the encoder processes:
+    ffmpeg reads the file itself and WAV maps it, so the samples never go
+    through pickling.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Audio Codec: unknown codec {codec}")
+    if codec == "wav":
+        return encode_pcm(np.memmap(path, dtype=np.int16, mode="r"), codec, sample_rate, bitrate)
+    _, content_type, extension = CODECS[codec]
+    return EncodedAudio(_run_ffmpeg(["-i", path], codec, sample_rate, bitrate), codec, content_type, extension)
+
+
+def _spool_dir() -> Optional[str]:
+    # tmpfs when available, so spooled PCM stays in memory
+    return "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def _spool_pcm(pcm: np.ndarray, spool):
+    np.ascontiguousarray(pcm, dtype=np.int16).tofile(spool)
+    spool.flush()
+
+
+@lru_cache(maxsize=1)
+def get_encoder_pool() -> Executor:
+    """
+    Worker pool for chunk encoding, one worker per core unless
+    `AUDIO_ENCODER_WORKERS` says otherwise. Threads are the default: FLAC
+    and Opus run in ffmpeg subprocesses and WAV is a buffer copy, neither
+    holds the GIL. `AUDIO_ENCODER_POOL=process` runs the encoders in spawned
+    processes that receive PCM via spool files on tmpfs instead of pickled
+    arrays.
+    """
+    settings = get_settings()
+    workers = settings.AUDIO_ENCODER_WORKERS or os.cpu_count() or 1
+    if settings.AUDIO_ENCODER_POOL == "process":
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="audio-encoder")
+
+
+async def encode_pcm_async(pcm: np.ndarray, codec: str, sample_rate: int = SAMPLE_RATE) -> EncodedAudio:
+    """
+    Encode on the worker pool so the event loop never runs the encoder
+    """
+    settings = get_settings()
+    pool = get_encoder_pool()
+    loop = asyncio.get_running_loop()
+    if not isinstance(pool, ProcessPoolExecutor):
+        return await loop.run_in_executor(pool, encode_pcm, pcm, codec, sample_rate, settings.AUDIO_OPUS_BITRATE)
+
+    with tempfile.NamedTemporaryFile(prefix="kubric-pcm-", suffix=".s16le", dir=_spool_dir()) as spool:
+        await asyncio.to_thread(_spool_pcm, pcm, spool)
+        return await loop.run_in_executor(
+            pool, encode_pcm_file, spool.name, codec, sample_rate, settings.AUDIO_OPUS_BITRATE)
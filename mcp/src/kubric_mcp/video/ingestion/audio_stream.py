@@ -0,0 +1,154 @@
+import json
+import subprocess
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Sequence
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2
+
+
+@dataclass
+class AudioChunk:
+    """Mono 16 kHz PCM of one planned chunk. Times are in milliseconds, like AudioIndex"""
+    chunk_index: int
+    start_time: int
+    end_time: int
+    pcm: np.ndarray
+    # chunks folded into this one when speech regions are merged
+    merged_chunk_indexes: List[int] = field(default_factory=list)
+
+    @property
+    def duration_seconds(self) -> float:
+        return (self.end_time - self.start_time) / 1000
+
+
+def probe_duration(path: str) -> float:
+    """
+    Duration of the audio stream in seconds, read with ffprobe
+    """
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "a:0",
+         "-show_entries", "stream=duration:format=duration", "-of", "json", path],
+        capture_output=True, check=True, text=True,
+    )
+    probe = json.loads(result.stdout)
+    for stream in probe.get("streams", []):
+        if stream.get("duration") not in (None, "N/A"):
+            return float(stream["duration"])
+    return float(probe["format"]["duration"])
+
+
+def plan_audio_chunks(duration_seconds: float, chunk_seconds: float, overlap_seconds: float = 0,
+                      min_chunk_seconds: float = 0) -> List[Dict[str, int]]:
+    """
+    Split a duration into chunks of `chunk_seconds`, each starting
+    `chunk_seconds - overlap_seconds` after the previous one. A tail shorter
+    than `min_chunk_seconds` is folded into the previous chunk.
+    """
+    total_ms = int(duration_seconds * 1000)
+    chunk_ms = int(chunk_seconds * 1000)
+    step_ms = chunk_ms - int(overlap_seconds * 1000)
+    if step_ms <= 0:
+        raise ValueError("audio chunk length must be larger than the overlap")
+    min_ms = int(min_chunk_seconds * 1000)
+
+    chunks = []
+    for start_ms in range(0, total_ms, step_ms):
+        end_ms = min(start_ms + chunk_ms, total_ms)
+        if chunks and end_ms - start_ms < min_ms:
+            chunks[-1]["end_time"] = end_ms
+            break
+        chunks.append({"start_time": start_ms, "end_time": end_ms, "chunk_index": len(chunks)})
+        if end_ms >= total_ms:
+            break
+    return chunks
+
+
+def iter_pcm_segments(path: str, segments: Sequence[Dict[str, int]], sample_rate: int = SAMPLE_RATE,
+                      read_seconds: float = 1.0) -> Iterator[AudioChunk]:
+    """
+    Decode the audio track once with ffmpeg and yield the planned segments
+    as soon as their samples have been decoded.
+
+    ffmpeg does the downmix to mono and the resample to `sample_rate` and
+    pipes raw s16le PCM. Only the samples from the earliest segment still to
+    be emitted onwards are buffered, so memory is bounded by the segment
+    length (plus overlap), not by the length of the video.
+    """
+    segments = sorted(segments, key=lambda s: s["start_time"])
+    if not segments:
+        return
+
+    def to_sample(ms: int) -> int:
+        return ms * sample_rate // 1000
+
+    # stderr goes to a file: a pipe nobody reads until exit can fill up and stall the decode
+    stderr = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        ["ffmpeg", "-nostdin", "-v", "error", "-i", path, "-vn",
+         "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "pipe:1"],
+        stdout=subprocess.PIPE, stderr=stderr,
+    )
+    read_size = int(sample_rate * read_seconds) * BYTES_PER_SAMPLE
+    buffer = np.empty(0, dtype=np.int16)
+    buffer_start = 0
+    # decoded samples still to drop before buffering resumes (gaps between segments)
+    skip = 0
+    pending = 0
+    remainder = b""
+    killed = False
+    try:
+        while pending < len(segments):
+            data = process.stdout.read(read_size)
+            if data:
+                data = remainder + data
+                usable = len(data) - len(data) % BYTES_PER_SAMPLE
+                remainder = data[usable:]
+                samples = np.frombuffer(data[:usable], dtype=np.int16)
+                if skip:
+                    dropped = min(skip, len(samples))
+                    samples = samples[dropped:]
+                    skip -= dropped
+                buffer = np.concatenate([buffer, samples])
+            buffer_end = buffer_start + len(buffer)
+
+            while pending < len(segments):
+                segment = segments[pending]
+                start, end = to_sample(segment["start_time"]), to_sample(segment["end_time"])
+                if end > buffer_end and data:
+                    break
+                end = min(end, buffer_end)
+                if end > start:
+                    yield AudioChunk(
+                        chunk_index=segment["chunk_index"],
+                        start_time=segment["start_time"],
+                        end_time=segment["end_time"],
+                        pcm=buffer[start - buffer_start:end - buffer_start].copy(),
+                    )
+                pending += 1
+
+            if pending < len(segments):
+                keep_from = to_sample(segments[pending]["start_time"])
+                if keep_from > buffer_start:
+                    if keep_from >= buffer_end:
+                        skip += keep_from - buffer_end
+                        buffer = buffer[:0]
+                    else:
+                        buffer = buffer[keep_from - buffer_start:]
+                    buffer_start = keep_from
+            if not data:
+                break
+    finally:
+        process.stdout.close()
+        if process.poll() is None:
+            killed = True
+            process.kill()
+        process.wait()
+        stderr.seek(0)
+        errors = stderr.read().decode(errors="ignore")
+        stderr.close()
+    if not killed and process.returncode != 0:
+        raise RuntimeError(f"ffmpeg audio decode failed: {errors}")
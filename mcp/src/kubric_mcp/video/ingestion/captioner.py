@@ -0,0 +1,86 @@
+import asyncio
+import random
+from typing import Optional
+
+import cv2
+import numpy as np
+import pybase64
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI, RateLimitError
+
+from kubric_mcp.config import get_settings
+
+
+class FrameCaptioner:
+    """
+    Async captioning client for `IMAGE_CAPTION_MODEL`.
+
+    Frames are resized to `IMAGE_RESIZE_WIDTH` x `IMAGE_RESIZE_HEIGHT` and JPEG
+    encoded on a worker thread, and at most `CAPTION_CONCURRENCY` requests are
+    in flight. Rate limits, connection errors and 5xx responses are retried
+    with exponential backoff and jitter, honouring `Retry-After` when the
+    provider sends it. `IMAGE_CAPTION_BASE_URL` points the client at another
+    OpenAI compatible endpoint, e.g. a local stub server.
+    """
+
+    def __init__(self, client: Optional[AsyncOpenAI] = None, concurrency: Optional[int] = None,
+                 max_retries: Optional[int] = None):
+        self.settings = get_settings()
+        self.client = client or AsyncOpenAI(
+            api_key=self.settings.OPENAI_API_KEY,
+            base_url=self.settings.IMAGE_CAPTION_BASE_URL,
+            max_retries=0,
+        )
+        self.concurrency = concurrency or self.settings.CAPTION_CONCURRENCY
+        self.max_retries = self.settings.CAPTION_MAX_RETRIES if max_retries is None else max_retries
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.requests = 0
+        self.retries = 0
+
+    def _prepare_image(self, frame: np.ndarray) -> str:
+        resized = cv2.resize(
+            frame, (self.settings.IMAGE_RESIZE_WIDTH, self.settings.IMAGE_RESIZE_HEIGHT),
+            interpolation=cv2.INTER_AREA)
+        success, buffer = cv2.imencode(".jpg", resized)
+        if not success:
+            raise ValueError(
+                "FrameCaptioner: _prepare_image -> Error in encoding image using cv2")
+        return pybase64.b64encode(buffer).decode("utf-8")
+
+    def _backoff_seconds(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return min(2 ** attempt, 30) * (0.5 + random.random())
+
+    async def caption(self, frame: np.ndarray) -> str:
+        async with self.semaphore:
+            encoded = await asyncio.to_thread(self._prepare_image, frame)
+            attempt = 0
+            while True:
+                try:
+                    self.requests += 1
+                    response = await self.client.chat.completions.create(
+                        model=self.settings.IMAGE_CAPTION_MODEL,
+                        messages=[{
+                            "role": "user",
+                            "content": [
+                                {"type": "text", "text": self.settings.CAPTION_MODEL_PROMPT},
+                                {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{encoded}"}},
+                            ],
+                        }],
+                    )
+                    return response.choices[0].message.content
+                except (RateLimitError, APIConnectionError, APIStatusError) as e:
+                    retryable = not isinstance(e, APIStatusError) or isinstance(e, RateLimitError) \
+                        or e.status_code >= 500
+                    if not retryable or attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff_seconds(attempt, e)
+                    attempt += 1
+                    self.retries += 1
+                    print(f"[Frame Captioner] retry {attempt} in {delay:.1f}s: {e}")
+                    await asyncio.sleep(delay)
@@ -0,0 +1,26 @@
+import cv2
+import numpy as np
+
+HASH_SIZE = 8
+
+
+def dhash(image: np.ndarray, hash_size: int = HASH_SIZE) -> int:
+    """
+    Difference hash of a BGR frame as a signed 64-bit integer.
+
+    The frame is reduced to a (hash_size + 1) x hash_size grayscale thumbnail
+    and each bit records whether a pixel is brighter than its right neighbour,
+    so re-encodes, small crops and overlays change only a few bits. The value
+    is signed so it fits a Postgres bigint column.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">i8")[0])
+
+
+def hamming_distances(hashes: np.ndarray, perceptual_hash: int) -> np.ndarray:
+    """
+    Hamming distance between one hash and an int64 array of hashes
+    """
+    return np.bitwise_count(np.bitwise_xor(hashes, np.int64(perceptual_hash)).view(np.uint64))
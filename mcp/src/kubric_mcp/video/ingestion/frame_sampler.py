@@ -0,0 +1,308 @@
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+import cv2
+import numpy as np
+
+from kubric_mcp.config import get_settings
+
+
+@dataclass
+class SampledFrame:
+    """A decoded frame and its position in the source video"""
+    index: int
+    frame_number: int
+    timestamp_seconds: float
+    image: np.ndarray
+
+
+class FrameSampler:
+    """
+    Single-pass frame sampler.
+
+    The video is decoded once from start to end. Frames that are not on the
+    sampling schedule are only grabbed (no retrieve / colour conversion) and
+    frames on the schedule are yielded with their timestamp, so no seek and
+    no keyframe re-decode happens per sample.
+
+    The schedule samples one frame every `DELTA_SECONDS_FRAME_INTERVAL`
+    seconds. When the interval is not positive, `SPLIT_FRAMES_COUNT` frames
+    are spread evenly over the video instead.
+    """
+
+    def __init__(self, video_path: str, interval_seconds: Optional[float] = None, frames_count: Optional[int] = None):
+        self.settings = get_settings()
+        self.video_path = video_path
+        self.interval_seconds = self.settings.DELTA_SECONDS_FRAME_INTERVAL if interval_seconds is None else interval_seconds
+        self.frames_count = self.settings.SPLIT_FRAMES_COUNT if frames_count is None else frames_count
+
+    def _resolve_interval(self, fps: float, total_frames: int) -> float:
+        if self.interval_seconds and self.interval_seconds > 0:
+            return self.interval_seconds
+        duration = total_frames / fps if fps > 0 else 0
+        if duration <= 0 or self.frames_count <= 0:
+            raise ValueError(
+                "FrameSampler: could not resolve sampling interval from video metadata")
+        return duration / self.frames_count
+
+    def __iter__(self) -> Iterator[SampledFrame]:
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            raise ValueError(f"FrameSampler: could not open video {self.video_path}")
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            interval = self._resolve_interval(fps, total_frames)
+
+            frame_number = 0
+            sample_index = 0
+            next_timestamp = 0.0
+            while cap.grab():
+                if fps > 0:
+                    timestamp = frame_number / fps
+                else:
+                    timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+                if timestamp + 1e-6 >= next_timestamp:
+                    ret, image = cap.retrieve()
+                    if not ret:
+                        raise ValueError(
+                            f"FrameSampler: could not read frame {frame_number}")
+                    yield SampledFrame(
+                        index=sample_index,
+                        frame_number=frame_number,
+                        timestamp_seconds=round(timestamp, 3),
+                        image=image,
+                    )
+                    sample_index += 1
+                    next_timestamp = sample_index * interval
+                frame_number += 1
+        finally:
+            cap.release()
+
+
+class TimestampFrameSampler(FrameSampler):
+    """
+    Single-pass sampler for a known list of timestamps, used to decode the
+    frames of a resumed stage again without seeking.
+    """
+
+    def __init__(self, video_path: str, timestamps: Iterable[float]):
+        super().__init__(video_path)
+        self.timestamps = sorted(timestamps)
+
+    def __iter__(self) -> Iterator[SampledFrame]:
+        if not self.timestamps:
+            return
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            raise ValueError(f"TimestampFrameSampler: could not open video {self.video_path}")
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+            frame_number = 0
+            sample_index = 0
+            while sample_index < len(self.timestamps) and cap.grab():
+                if fps > 0:
+                    timestamp = frame_number / fps
+                else:
+                    timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+                if timestamp + 1e-3 >= self.timestamps[sample_index]:
+                    ret, image = cap.retrieve()
+                    if not ret:
+                        raise ValueError(
+                            f"TimestampFrameSampler: could not read frame {frame_number}")
+                    while sample_index < len(self.timestamps) and timestamp + 1e-3 >= self.timestamps[sample_index]:
+                        yield SampledFrame(
+                            index=sample_index,
+                            frame_number=frame_number,
+                            timestamp_seconds=self.timestamps[sample_index],
+                            image=image,
+                        )
+                        sample_index += 1
+                frame_number += 1
+        finally:
+            cap.release()
+
+
+class ShotBoundarySampler(FrameSampler):
+    """
+    Adaptive single-pass sampler that keeps frames at shot changes.
+
+    The video is probed every `SHOT_PROBE_INTERVAL_SECONDS`. Each probe is
+    downscaled and scored against the previous probe and the last kept frame
+    with a colour histogram distance and a mean pixel difference. A frame is
+    kept when the score crosses `SHOT_CHANGE_THRESHOLD` and at least
+    `SHOT_MIN_INTERVAL_SECONDS` passed since the last kept frame, or when
+    `SHOT_MAX_INTERVAL_SECONDS` passed without a cut, so long shots still get
+    more than one representative frame.
+
+    After iteration `stats` reports how many frames were kept and dropped
+    compared with uniform `DELTA_SECONDS_FRAME_INTERVAL` sampling.
+    """
+
+    HISTOGRAM_BINS_PER_CHANNEL = 8
+    PROBE_SIZE = (64, 36)
+
+    def __init__(self, video_path: str, probe_interval_seconds: Optional[float] = None,
+                 min_interval_seconds: Optional[float] = None, max_interval_seconds: Optional[float] = None,
+                 threshold: Optional[float] = None):
+        super().__init__(video_path)
+        self.probe_interval_seconds = probe_interval_seconds or self.settings.SHOT_PROBE_INTERVAL_SECONDS
+        self.min_interval_seconds = self.settings.SHOT_MIN_INTERVAL_SECONDS if min_interval_seconds is None else min_interval_seconds
+        self.max_interval_seconds = max_interval_seconds or self.settings.SHOT_MAX_INTERVAL_SECONDS
+        self.threshold = self.settings.SHOT_CHANGE_THRESHOLD if threshold is None else threshold
+        self.stats = {}
+
+    def _signature(self, image: np.ndarray):
+        small = cv2.resize(image, self.PROBE_SIZE, interpolation=cv2.INTER_AREA)
+        shift = 8 - int(np.log2(self.HISTOGRAM_BINS_PER_CHANNEL))
+        quantised = (small >> shift).astype(np.int32)
+        bins = self.HISTOGRAM_BINS_PER_CHANNEL
+        codes = (quantised[..., 0] * bins + quantised[..., 1]) * bins + quantised[..., 2]
+        histogram = np.bincount(codes.ravel(), minlength=bins ** 3).astype(np.float32)
+        histogram /= histogram.sum()
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32) / 255
+        return histogram, gray
+
+    @staticmethod
+    def _score(a, b) -> float:
+        """Shot change score in [0, 1]: max of histogram L1/2 and mean pixel difference"""
+        histogram_distance = 0.5 * float(np.abs(a[0] - b[0]).sum())
+        pixel_distance = float(np.abs(a[1] - b[1]).mean())
+        return max(histogram_distance, pixel_distance)
+
+    def __iter__(self) -> Iterator[SampledFrame]:
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            raise ValueError(f"ShotBoundarySampler: could not open video {self.video_path}")
+        kept = 0
+        shots = 0
+        duration = 0.0
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+            frame_number = 0
+            next_probe = 0.0
+            previous = None
+            last_kept = None
+            last_kept_timestamp = None
+            while cap.grab():
+                if fps > 0:
+                    timestamp = frame_number / fps
+                else:
+                    timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+                duration = timestamp
+                if timestamp + 1e-6 >= next_probe:
+                    while next_probe <= timestamp + 1e-6:
+                        next_probe += self.probe_interval_seconds
+                    ret, image = cap.retrieve()
+                    if not ret:
+                        raise ValueError(
+                            f"ShotBoundarySampler: could not read frame {frame_number}")
+                    signature = self._signature(image)
+
+                    keep = last_kept is None
+                    if not keep:
+                        since_kept = timestamp - last_kept_timestamp
+                        score = max(self._score(signature, previous), self._score(signature, last_kept))
+                        is_cut = score >= self.threshold
+                        if is_cut and since_kept >= self.min_interval_seconds:
+                            keep = True
+                            shots += 1
+                        elif since_kept >= self.max_interval_seconds:
+                            keep = True
+                    else:
+                        shots += 1
+
+                    if keep:
+                        yield SampledFrame(
+                            index=kept,
+                            frame_number=frame_number,
+                            timestamp_seconds=round(timestamp, 3),
+                            image=image,
+                        )
+                        kept += 1
+                        last_kept = signature
+                        last_kept_timestamp = timestamp
+                    previous = signature
+                frame_number += 1
+        finally:
+            cap.release()
+            uniform = int(duration // self.settings.DELTA_SECONDS_FRAME_INTERVAL) + 1 \
+                if self.settings.DELTA_SECONDS_FRAME_INTERVAL > 0 else self.settings.SPLIT_FRAMES_COUNT
+            self.stats = {
+                "shots": shots,
+                "kept_frames": kept,
+                "uniform_frames": uniform,
+                "dropped_frames": max(uniform - kept, 0),
+            }
+            print(f"✅ [Frame Sampler] adaptive sampling kept {kept} frames over {shots} shots, "
+                  f"dropped {self.stats['dropped_frames']} of {uniform} uniform frames")
+
+
+def get_frame_sampler(video_path: str) -> FrameSampler:
+    """
+    Build the frame sampler selected by `FRAME_SAMPLING_MODE`
+    """
+    mode = get_settings().FRAME_SAMPLING_MODE
+    if mode == "adaptive":
+        return ShotBoundarySampler(video_path)
+    if mode == "uniform":
+        return FrameSampler(video_path)
+    raise ValueError(f"FrameSampler: unknown sampling mode {mode}")
+
+
+_SENTINEL = object()
+
+
+def iter_frame_batches(frames: Iterable[SampledFrame], batch_size: int, max_queue_size: int) -> Iterator[List[SampledFrame]]:
+    """
+    Decode frames on a background thread and hand them over in batches.
+
+    The producer blocks once `max_queue_size` frames are waiting, so decoding
+    never runs further ahead of the consumer than the queue allows and the
+    full list of frames is never held in memory.
+    """
+    frame_queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+    stop = threading.Event()
+    errors = []
+
+    def _put(item) -> bool:
+        while not stop.is_set():
+            try:
+                frame_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce():
+        try:
+            for frame in frames:
+                if not _put(frame):
+                    return
+        except Exception as e:
+            errors.append(e)
+        finally:
+            _put(_SENTINEL)
+
+    producer = threading.Thread(target=_produce, name="frame-sampler", daemon=True)
+    producer.start()
+
+    batch: List[SampledFrame] = []
+    try:
+        while True:
+            item = frame_queue.get()
+            if item is _SENTINEL:
+                break
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if errors:
+            raise errors[0]
+        if batch:
+            yield batch
+    finally:
+        stop.set()
+        producer.join()
@@ -0,0 +1,252 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+from PIL import Image
+from transformers import CLIPProcessor
+
+from kubric_mcp.config import get_settings
+from kubric_mcp.video.ingestion.model_registry import DEVICE, get_clip_registry
+
+BATCH_SIZE_CANDIDATES = (1, 2, 4, 8, 16, 32, 64)
+
+
+class ImageEmbeddingBackend(ABC):
+    """
+    Interface for image embedding backends.
+
+    `embed` takes BGR frames as decoded by OpenCV and returns L2 normalised
+    float32 embeddings, one row per frame.
+    """
+    name = "base"
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.batch_size = self.settings.IMAGE_EMBD_BATCH_SIZE or None
+        self._tune_lock = threading.Lock()
+
+    @staticmethod
+    def _to_pil(frames: Sequence[np.ndarray]) -> List[Image.Image]:
+        return [Image.fromarray(cv2.cvtColor(f, cv2.COLOR_BGR2RGB)) for f in frames]
+
+    @abstractmethod
+    def embed(self, frames: Sequence[np.ndarray]) -> np.ndarray:
+        ...
+
+    def tuned_batch_size(self) -> int:
+        """
+        Batch size for this backend, tuned on first use unless
+        `IMAGE_EMBD_BATCH_SIZE` pins it. Concurrent first callers wait for
+        one tuning run
+        """
+        if self.batch_size is None:
+            with self._tune_lock:
+                if self.batch_size is None:
+                    self.batch_size = tune_batch_size(self)
+        return self.batch_size
+
+
+class TorchClipBackend(ImageEmbeddingBackend):
+    """Eager PyTorch CLIP from the shared model registry"""
+    name = "torch"
+
+    def __init__(self, device: Optional[str] = None):
+        super().__init__()
+        self.device = device or DEVICE
+        self.clip = get_clip_registry().get(self.settings.IMAGE_EMDB_MODEL, self.device)
+
+    def embed(self, frames: Sequence[np.ndarray]) -> np.ndarray:
+        import torch
+
+        inputs = self.clip.processor(images=self._to_pil(frames), return_tensors="pt").to(self.device)
+        with torch.no_grad():
+            features = self.clip.model.get_image_features(**inputs)
+            features = features / features.norm(p=2, dim=1, keepdim=True)
+        return features.cpu().numpy().astype(np.float32)
+
+
+class OnnxClipBackend(ImageEmbeddingBackend):
+    """
+    CLIP vision tower exported to ONNX with dynamic int8 quantisation and run
+    on the ONNX Runtime CPU provider.
+
+    The export happens once and is cached under `ONNX_MODEL_DIR`. A freshly
+    exported model is checked against the torch backend and rejected when
+    the cosine similarity drops below `ONNX_PARITY_MIN_COSINE`.
+    """
+    name = "onnx"
+    _export_lock = threading.Lock()
+
+    def __init__(self, model_path: Optional[Path] = None, intra_op_threads: Optional[int] = None):
+        super().__init__()
+        import onnxruntime as ort
+
+        self.model_path = Path(model_path) if model_path else self._default_model_path()
+        if not self.model_path.exists():
+            self.export(self.model_path)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads or self.settings.ONNX_INTRA_OP_THREADS
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(self.model_path), sess_options=options, providers=["CPUExecutionProvider"])
+        self.processor = CLIPProcessor.from_pretrained(self.settings.IMAGE_EMDB_MODEL)
+
+    def _default_model_path(self) -> Path:
+        model_name = self.settings.IMAGE_EMDB_MODEL.replace("/", "--")
+        return Path(self.settings.ONNX_MODEL_DIR).expanduser() / f"{model_name}-int8.onnx"
+
+    def export(self, model_path: Path):
+        import torch
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        with self._export_lock:
+            if model_path.exists():
+                return
+            model_path.parent.mkdir(parents=True, exist_ok=True)
+            clip = get_clip_registry().get(self.settings.IMAGE_EMDB_MODEL, "cpu")
+
+            class _ImageFeatures(torch.nn.Module):
+                def __init__(self, model):
+                    super().__init__()
+                    self.model = model
+
+                def forward(self, pixel_values):
+                    features = self.model.get_image_features(pixel_values=pixel_values)
+                    return features / features.norm(p=2, dim=1, keepdim=True)
+
+            size = clip.processor.image_processor.crop_size
+            dummy = torch.randn(1, 3, size["height"], size["width"])
+            fp32_path = model_path.with_name(model_path.stem.replace("-int8", "") + "-fp32.onnx")
+            started = time.perf_counter()
+            torch.onnx.export(
+                _ImageFeatures(clip.model).eval(),
+                (dummy,),
+                str(fp32_path),
+                input_names=["pixel_values"],
+                output_names=["image_embeds"],
+                dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+                opset_version=17,
+            )
+            staged_path = model_path.with_suffix(".tmp.onnx")
+            quantize_dynamic(str(fp32_path), str(staged_path), weight_type=QuantType.QInt8)
+            fp32_path.unlink(missing_ok=True)
+            print(f"✅ [Image Embedding] exported {self.settings.IMAGE_EMDB_MODEL} to {model_path} "
+                  f"in {time.perf_counter() - started:.1f}s")
+
+            try:
+                candidate = OnnxClipBackend(model_path=staged_path)
+                parity_check(TorchClipBackend(device="cpu"), candidate, synthetic_frames(8))
+            except Exception:
+                staged_path.unlink(missing_ok=True)
+                raise
+            staged_path.rename(model_path)
+
+    def embed(self, frames: Sequence[np.ndarray]) -> np.ndarray:
+        inputs = self.processor(images=self._to_pil(frames), return_tensors="np")
+        (features,) = self.session.run(
+            ["image_embeds"], {"pixel_values": inputs["pixel_values"].astype(np.float32)})
+        return features.astype(np.float32)
+
+
+def synthetic_frames(count: int, height: int = 360, width: int = 640, seed: int = 0) -> List[np.ndarray]:
+    """
+    Deterministic smooth BGR frames for tuning and parity checks
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(count):
+        coarse = rng.integers(0, 256, size=(9, 16, 3), dtype=np.uint8)
+        frames.append(cv2.resize(coarse, (width, height), interpolation=cv2.INTER_CUBIC))
+    return frames
+
+
+def cosine_similarities(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    return np.sum(reference * candidate, axis=1)
+
+
+def parity_check(reference: ImageEmbeddingBackend, candidate: ImageEmbeddingBackend,
+                 frames: Sequence[np.ndarray], min_cosine: Optional[float] = None) -> float:
+    """
+    Compare two backends on the same frames and return the lowest cosine
+    similarity. Raises ValueError when it is below the threshold.
+    """
+    min_cosine = get_settings().ONNX_PARITY_MIN_COSINE if min_cosine is None else min_cosine
+    similarities = cosine_similarities(reference.embed(frames), candidate.embed(frames))
+    lowest = float(similarities.min())
+    if lowest < min_cosine:
+        raise ValueError(
+            f"❌ [Image Embedding] {candidate.name} backend parity check failed: "
+            f"min cosine {lowest:.4f} < {min_cosine}")
+    print(f"✅ [Image Embedding] {candidate.name} backend parity with {reference.name}: "
+          f"min cosine {lowest:.4f}, mean {float(similarities.mean()):.4f}")
+    return lowest
+
+
+def measure_throughput(backend: ImageEmbeddingBackend, frames: Sequence[np.ndarray], batch_size: int,
+                       rounds: int = 2) -> float:
+    """
+    Frames per second of the backend at a batch size, after one warm-up batch
+    """
+    backend.embed(frames[:batch_size])
+    started = time.perf_counter()
+    embedded = 0
+    for _ in range(rounds):
+        for i in range(0, len(frames), batch_size):
+            batch = frames[i: i + batch_size]
+            backend.embed(batch)
+            embedded += len(batch)
+    return embedded / (time.perf_counter() - started)
+
+
+def tune_batch_size(backend: ImageEmbeddingBackend, candidates: Sequence[int] = BATCH_SIZE_CANDIDATES) -> int:
+    """
+    Pick the batch size with the best frames/sec, stopping once throughput
+    stops improving
+    """
+    frames = synthetic_frames(max(candidates))
+    best_size, best_fps = candidates[0], 0.0
+    for batch_size in candidates:
+        fps = measure_throughput(backend, frames, batch_size, rounds=1)
+        if fps > best_fps * 1.05:
+            best_size, best_fps = batch_size, fps
+        elif fps < best_fps:
+            break
+    print(f"✅ [Image Embedding] {backend.name} backend batch size {best_size} ({best_fps:.1f} frames/s)")
+    return best_size
+
+
+BACKENDS = {
+    TorchClipBackend.name: TorchClipBackend,
+    OnnxClipBackend.name: OnnxClipBackend,
+}
+
+
+_backends: Dict[str, ImageEmbeddingBackend] = {}
+_backend_locks: Dict[str, threading.Lock] = {}
+_backends_lock = threading.Lock()
+
+
+def get_image_embedding_backend(name: Optional[str] = None) -> ImageEmbeddingBackend:
+    """
+    Process-wide image embedding backend selected by `IMAGE_EMBD_BACKEND`
+    """
+    name = name or get_settings().IMAGE_EMBD_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Image Embedding: unknown backend {name}")
+
+    if name not in _backends:
+        # one lock per backend: building the onnx one can export and parity
+        # check for minutes, the torch backend must not wait behind it
+        with _backends_lock:
+            lock = _backend_locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in _backends:
+                _backends[name] = BACKENDS[name]()
+    return _backends[name]
@@ -0,0 +1,116 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import torch
+from transformers import CLIPModel, CLIPProcessor
+
+from kubric_mcp.config import get_settings
+
+DEVICE = "mps" if torch.backends.mps.is_available() else "cpu"
+
+
+@dataclass
+class LoadedClipModel:
+    """A warm CLIP model and processor pair with its load stats"""
+    model_name: str
+    device: str
+    model: CLIPModel
+    processor: CLIPProcessor
+    load_seconds: float
+    parameter_bytes: int
+    loaded_at: float = field(default_factory=time.time)
+    hits: int = 0
+
+
+class ClipModelRegistry:
+    """
+    Process-wide registry of warm CLIP models keyed by (model name, device).
+
+    Models are loaded lazily on first use and shared by every VideoProcessor.
+    Loading is guarded by a per-key lock so concurrent callers wait for a
+    single load instead of each pulling their own copy of the weights.
+    """
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, str], LoadedClipModel] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    def _key_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            if key not in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+            return self._key_locks[key]
+
+    def get(self, model_name: Optional[str] = None, device: Optional[str] = None) -> LoadedClipModel:
+        """
+        Return the warm model for the key, loading it on first use
+        """
+        model_name = model_name or get_settings().IMAGE_EMDB_MODEL
+        device = device or DEVICE
+        key = (model_name, device)
+
+        entry = self._models.get(key)
+        if entry is None:
+            with self._key_lock(key):
+                entry = self._models.get(key)
+                if entry is None:
+                    entry = self._load(model_name, device)
+                    self._models[key] = entry
+        entry.hits += 1
+        return entry
+
+    def _load(self, model_name: str, device: str) -> LoadedClipModel:
+        started = time.perf_counter()
+        model = CLIPModel.from_pretrained(model_name).to(device)
+        model.eval()
+        processor = CLIPProcessor.from_pretrained(model_name)
+        load_seconds = time.perf_counter() - started
+        parameter_bytes = sum(
+            p.numel() * p.element_size() for p in model.parameters())
+        print(f"✅ [Model Registry] Loaded {model_name} on {device} in {load_seconds:.2f}s "
+              f"({parameter_bytes / 1024 / 1024:.1f} MB)")
+        return LoadedClipModel(
+            model_name=model_name,
+            device=device,
+            model=model,
+            processor=processor,
+            load_seconds=load_seconds,
+            parameter_bytes=parameter_bytes,
+        )
+
+    def preload(self, model_name: Optional[str] = None, device: Optional[str] = None) -> LoadedClipModel:
+        """
+        Load the model eagerly, used at server startup
+        """
+        return self.get(model_name=model_name, device=device)
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Load time, memory and usage stats for every loaded model
+        """
+        return {
+            f"{entry.model_name}@{entry.device}": {
+                "load_seconds": round(entry.load_seconds, 3),
+                "parameter_bytes": entry.parameter_bytes,
+                "loaded_at": entry.loaded_at,
+                "hits": entry.hits,
+            }
+            for entry in list(self._models.values())
+        }
+
+
+_clip_registry: Optional[ClipModelRegistry] = None
+_clip_registry_lock = threading.Lock()
+
+
+def get_clip_registry() -> ClipModelRegistry:
+    global _clip_registry
+
+    if _clip_registry is None:
+        with _clip_registry_lock:
+            if _clip_registry is None:
+                _clip_registry = ClipModelRegistry()
+    return _clip_registry
@@ -0,0 +1,118 @@
+import asyncio
+from typing import List, Optional, Sequence
+
+from openai import AsyncOpenAI
+
+from kubric_mcp.config import get_settings
+from kubric_mcp.services.embedding_cache import EmbeddingCache, cache_key, get_embedding_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+class TextEmbedder:
+    """
+    Batched text embedding client shared by transcripts and captions.
+
+    Texts are packed into as few embeddings requests as the model limits
+    allow (`EMBEDDING_MAX_INPUTS_PER_REQUEST` inputs and
+    `EMBEDDING_MAX_TOKENS_PER_REQUEST` tokens per request, `MAX_TOKENS_PER_INPUT`
+    per text) and the requests run concurrently, at most
+    `EMBEDDING_CONCURRENCY` at a time. Results come back in input order.
+
+    Every text goes through the shared embedding cache first, and identical
+    texts within a call are only sent once.
+    """
+    MAX_TOKENS_PER_INPUT = 8191
+
+    def __init__(self, model: str, client: Optional[AsyncOpenAI] = None, concurrency: Optional[int] = None,
+                 dimensions: Optional[int] = None, cache: Optional[EmbeddingCache] = None):
+        self.settings = get_settings()
+        self.model = model
+        self.dimensions = dimensions
+        self.cache = cache or get_embedding_cache()
+        self.client = client or AsyncOpenAI(api_key=self.settings.OPENAI_API_KEY)
+        self.concurrency = concurrency or self.settings.EMBEDDING_CONCURRENCY
+        self.max_inputs = self.settings.EMBEDDING_MAX_INPUTS_PER_REQUEST
+        self.max_tokens = self.settings.EMBEDDING_MAX_TOKENS_PER_REQUEST
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+        self.requests = 0
+
+    def _count_tokens(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        # conservative estimate, English averages ~4 bytes per token
+        return len(text.encode("utf-8")) // 3 + 1
+
+    def _prepare(self, text: Optional[str]) -> str:
+        # the embeddings endpoint rejects empty input
+        text = (text or "").strip() or " "
+        if self._count_tokens(text) > self.MAX_TOKENS_PER_INPUT:
+            if self._encoding is not None:
+                text = self._encoding.decode(self._encoding.encode(text)[:self.MAX_TOKENS_PER_INPUT])
+            else:
+                text = text[:self.MAX_TOKENS_PER_INPUT * 3]
+        return text
+
+    def _pack(self, texts: Sequence[str]) -> List[List[int]]:
+        """
+        Group text indices into requests within the input and token limits
+        """
+        batches = []
+        batch, batch_tokens = [], 0
+        for index, text in enumerate(texts):
+            tokens = self._count_tokens(text)
+            if batch and (len(batch) >= self.max_inputs or batch_tokens + tokens > self.max_tokens):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(index)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def embed(self, texts: Sequence[Optional[str]]) -> List[List[float]]:
+        if not texts:
+            return []
+        prepared = [self._prepare(text) for text in texts]
+        keys = [cache_key(self.model, self.dimensions, text) for text in prepared]
+        cached = await self.cache.get_many(keys)
+
+        # one request slot per distinct uncached text
+        pending = {}
+        for key, text in zip(keys, prepared):
+            if key not in cached and key not in pending:
+                pending[key] = text
+        pending_keys = list(pending)
+        pending_texts = list(pending.values())
+        batches = self._pack(pending_texts)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        fresh = {}
+
+        async def _request(indices: List[int]):
+            arguments = {"model": self.model, "input": [pending_texts[i] for i in indices]}
+            if self.dimensions:
+                arguments["dimensions"] = self.dimensions
+            async with semaphore:
+                self.requests += 1
+                response = await self.client.embeddings.create(**arguments)
+            for item in response.data:
+                fresh[pending_keys[indices[item.index]]] = item.embedding
+
+        await asyncio.gather(*(_request(indices) for indices in batches))
+        if fresh:
+            # the embeddings are paid for already, a failed cache write must not lose them
+            try:
+                await self.cache.put_many(fresh)
+            except Exception as e:
+                print(f"❌ [Text Embedder] caching {len(fresh)} embeddings failed, continuing: {e}")
+        print(f"✅ [Text Embedder] embedded {len(prepared)} texts with {self.model}: "
+              f"{len(prepared) - len(pending_texts)} from cache, {len(batches)} requests")
+        return [cached.get(key) or fresh[key] for key in keys]
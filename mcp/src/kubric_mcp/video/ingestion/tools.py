@@ -10,5 +10,5 @@ def extract_video_clip(video_path: str, start_time: float, end_time: float, outp
             video_path, start_time, end_time, output_path)
         return extracted_clip
 
-    except e:
+    except Exception as e:
         raise IOError(f"Failed to extract subclip: {str(e)}")
@@ -0,0 +1,321 @@
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import IO, Dict, Optional
+
+from groq import APIConnectionError, APIStatusError, AsyncGroq, RateLimitError
+
+from kubric_mcp.config import get_settings
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limit for a remote API.
+
+    Every success that completes under `latency_target_seconds` grows the
+    limit additively by one slot per window of successes. A rate limit or a
+    slow response halves it (never below `min_limit`), at most once per
+    `cooldown_seconds` so a burst of 429s from the same window counts once.
+    """
+
+    def __init__(self, initial_limit: int, min_limit: int, max_limit: int, latency_target_seconds: float,
+                 cooldown_seconds: float = 1.0):
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target_seconds = latency_target_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.in_flight = 0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_flight >= self.limit
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def on_success(self, latency_seconds: float):
+        if latency_seconds > self.latency_target_seconds:
+            await self.on_overload()
+            return
+        async with self._condition:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_limit:
+                self._successes = 0
+                self.limit += 1
+                self._condition.notify_all()
+
+    async def on_overload(self):
+        async with self._condition:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown_seconds:
+                return
+            self._last_decrease = now
+            self._successes = 0
+            self.limit = max(self.min_limit, self.limit // 2)
+
+
+class TranscriptionBackend(ABC):
+    """
+    Interface for transcription backends.
+
+    `transcribe` takes an encoded audio chunk (any format from audio_codec)
+    and returns its text. `saturated` tells the router that new requests
+    would only queue on this backend.
+    """
+    name = "base"
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.requests = 0
+
+    @property
+    def saturated(self) -> bool:
+        return False
+
+    @abstractmethod
+    async def transcribe(self, buffer: IO[bytes]) -> str:
+        ...
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "requests": self.requests}
+
+
+class GroqTranscriptionBackend(TranscriptionBackend):
+    """
+    Non-blocking transcription of audio chunks with `AUDIO_TRANSCRIPT_MODEL`.
+
+    Requests go through AsyncGroq so the MCP event loop keeps serving other
+    requests, and their concurrency follows an AIMD limit between
+    `TRANSCRIPTION_MIN_CONCURRENCY` and `TRANSCRIPTION_MAX_CONCURRENCY`. Rate
+    limits, connection errors and 5xx responses are retried up to
+    `TRANSCRIPTION_MAX_RETRIES` times with full jitter backoff.
+    """
+    name = "groq"
+
+    def __init__(self, client: Optional[AsyncGroq] = None, limiter: Optional[AdaptiveConcurrencyLimiter] = None):
+        super().__init__()
+        self.client = client or AsyncGroq(api_key=self.settings.GROQ_API_KEY, max_retries=0)
+        self.limiter = limiter or AdaptiveConcurrencyLimiter(
+            initial_limit=self.settings.TRANSCRIPTION_CONCURRENCY,
+            min_limit=self.settings.TRANSCRIPTION_MIN_CONCURRENCY,
+            max_limit=self.settings.TRANSCRIPTION_MAX_CONCURRENCY,
+            latency_target_seconds=self.settings.TRANSCRIPTION_LATENCY_TARGET_SECONDS,
+        )
+        self.max_retries = self.settings.TRANSCRIPTION_MAX_RETRIES
+        self.retries = 0
+
+    @property
+    def saturated(self) -> bool:
+        return self.limiter.saturated
+
+    def _backoff_seconds(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after) + random.uniform(0, 1)
+            except ValueError:
+                pass
+        return random.uniform(0, min(2 ** attempt, 30))
+
+    async def transcribe(self, buffer: IO[bytes]) -> str:
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            started = time.perf_counter()
+            try:
+                self.requests += 1
+                buffer.seek(0)
+                transcription = await self.client.audio.transcriptions.create(
+                    model=self.settings.AUDIO_TRANSCRIPT_MODEL,
+                    file=buffer,
+                    response_format="json"
+                )
+                await self.limiter.on_success(time.perf_counter() - started)
+                return transcription.text
+            except (RateLimitError, APIConnectionError, APIStatusError) as e:
+                retryable = not isinstance(e, APIStatusError) or isinstance(e, RateLimitError) \
+                    or e.status_code >= 500
+                if isinstance(e, RateLimitError) or (retryable and isinstance(e, APIStatusError)):
+                    await self.limiter.on_overload()
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                error = e
+            finally:
+                await self.limiter.release()
+            delay = self._backoff_seconds(attempt, error)
+            attempt += 1
+            self.retries += 1
+            print(f"[Transcriber] retry {attempt} in {delay:.1f}s (limit {self.limiter.limit}): {error}")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "retries": self.retries, "limit": self.limiter.limit,
+                "in_flight": self.limiter.in_flight}
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """
+    Offline transcription on the CPU with faster-whisper.
+
+    The `LOCAL_TRANSCRIPTION_MODEL` weights are loaded once per process, on
+    first use, and every request runs in a worker thread (CTranslate2
+    releases the GIL). `LOCAL_TRANSCRIPTION_CONCURRENCY` requests share the
+    model at a time; `LOCAL_TRANSCRIPTION_CPU_THREADS` of 0 lets it use
+    every core.
+    """
+    name = "local"
+
+    def __init__(self):
+        super().__init__()
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._slots = asyncio.Semaphore(self.settings.LOCAL_TRANSCRIPTION_CONCURRENCY)
+        self.load_seconds = None
+
+    @property
+    def saturated(self) -> bool:
+        return self._slots.locked()
+
+    def load(self):
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    from faster_whisper import WhisperModel
+
+                    started = time.perf_counter()
+                    self._model = WhisperModel(
+                        self.settings.LOCAL_TRANSCRIPTION_MODEL,
+                        device="cpu",
+                        compute_type=self.settings.LOCAL_TRANSCRIPTION_COMPUTE_TYPE,
+                        cpu_threads=self.settings.LOCAL_TRANSCRIPTION_CPU_THREADS,
+                        num_workers=self.settings.LOCAL_TRANSCRIPTION_CONCURRENCY,
+                    )
+                    self.load_seconds = time.perf_counter() - started
+                    print(f"✅  [Transcriber] loaded {self.settings.LOCAL_TRANSCRIPTION_MODEL} "
+                          f"in {self.load_seconds:.1f}s")
+        return self._model
+
+    def _transcribe(self, buffer: IO[bytes]) -> str:
+        buffer.seek(0)
+        segments, _ = self.load().transcribe(buffer, beam_size=1, vad_filter=False)
+        return "".join(segment.text for segment in segments).strip()
+
+    async def transcribe(self, buffer: IO[bytes]) -> str:
+        async with self._slots:
+            self.requests += 1
+            return await asyncio.to_thread(self._transcribe, buffer)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "model": self.settings.LOCAL_TRANSCRIPTION_MODEL,
+                "load_seconds": self.load_seconds}
+
+
+class StubTranscriptionBackend(TranscriptionBackend):
+    """
+    Deterministic transcription for benchmarks: the text is derived from the
+    payload hash, after `TRANSCRIPTION_STUB_LATENCY_SECONDS` of simulated
+    latency.
+    """
+    name = "stub"
+
+    async def transcribe(self, buffer: IO[bytes]) -> str:
+        self.requests += 1
+        buffer.seek(0)
+        digest = hashlib.sha256(buffer.read()).hexdigest()
+        if self.settings.TRANSCRIPTION_STUB_LATENCY_SECONDS:
+            await asyncio.sleep(self.settings.TRANSCRIPTION_STUB_LATENCY_SECONDS)
+        return f"stub transcription {digest[:16]}"
+
+
+class OverflowTranscriber(TranscriptionBackend):
+    """
+    Sends chunks to the primary backend and, while it is saturated, to the
+    overflow backend as long as that one has a free slot.
+    """
+    name = "overflow"
+
+    def __init__(self, primary: TranscriptionBackend, overflow: TranscriptionBackend):
+        super().__init__()
+        self.primary = primary
+        self.overflow = overflow
+        self.overflowed = 0
+
+    @property
+    def saturated(self) -> bool:
+        return self.primary.saturated and self.overflow.saturated
+
+    async def transcribe(self, buffer: IO[bytes]) -> str:
+        self.requests += 1
+        if self.primary.saturated and not self.overflow.saturated:
+            self.overflowed += 1
+            return await self.overflow.transcribe(buffer)
+        return await self.primary.transcribe(buffer)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "overflowed": self.overflowed,
+                "primary": self.primary.stats(), "overflow": self.overflow.stats()}
+
+
+BACKENDS = {
+    GroqTranscriptionBackend.name: GroqTranscriptionBackend,
+    LocalWhisperBackend.name: LocalWhisperBackend,
+    StubTranscriptionBackend.name: StubTranscriptionBackend,
+}
+
+
+_backends: Dict[str, TranscriptionBackend] = {}
+_backend_locks: Dict[str, threading.Lock] = {}
+_transcriber: Optional[TranscriptionBackend] = None
+_backends_lock = threading.Lock()
+
+
+def get_transcription_backend(name: Optional[str] = None) -> TranscriptionBackend:
+    """
+    Process-wide transcription backend selected by `TRANSCRIPTION_BACKEND`
+    """
+    name = name or get_settings().TRANSCRIPTION_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Transcription: unknown backend {name}")
+
+    if name not in _backends:
+        # one lock per backend, so a slow constructor only holds up its own callers
+        with _backends_lock:
+            lock = _backend_locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in _backends:
+                _backends[name] = BACKENDS[name]()
+    return _backends[name]
+
+
+def get_transcriber() -> TranscriptionBackend:
+    """
+    Process-wide transcriber, so every video shares one concurrency limit
+    against the provider. Routes overflow to `TRANSCRIPTION_OVERFLOW_BACKEND`
+    when one is set.
+    """
+    global _transcriber
+
+    if _transcriber is None:
+        settings = get_settings()
+        primary = get_transcription_backend(settings.TRANSCRIPTION_BACKEND)
+        overflow = settings.TRANSCRIPTION_OVERFLOW_BACKEND
+        overflow = get_transcription_backend(overflow) if overflow and overflow != primary.name else None
+        with _backends_lock:
+            if _transcriber is None:
+                _transcriber = OverflowTranscriber(primary, overflow) if overflow else primary
+    return _transcriber
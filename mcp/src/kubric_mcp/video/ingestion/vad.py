@@ -0,0 +1,90 @@
+from typing import List, Optional
+
+import numpy as np
+
+from kubric_mcp.config import get_settings
+from kubric_mcp.video.ingestion.audio_stream import SAMPLE_RATE, AudioChunk
+
+
+class VoiceActivityDetector:
+    """
+    Energy and zero-crossing voice activity detection on 16-bit PCM.
+
+    The chunk is cut into `AUDIO_VAD_FRAME_MS` frames and, in one vectorised
+    pass, each frame gets its RMS level in dBFS and its zero-crossing rate. A
+    frame counts as speech when it is louder than `AUDIO_VAD_ENERGY_THRESHOLD_DB`,
+    stands `AUDIO_VAD_NOISE_MARGIN_DB` above the chunk's noise floor (its
+    quietest 20% of frames) and has a zero-crossing rate inside the speech
+    band, which rejects broadband crowd noise and hum. A chunk is speech when
+    at least `AUDIO_VAD_MIN_SPEECH_RATIO` of its frames are.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.settings = get_settings()
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * self.settings.AUDIO_VAD_FRAME_MS / 1000)
+
+    def speech_ratio(self, pcm: np.ndarray) -> float:
+        frames_count = len(pcm) // self.frame_length
+        if frames_count == 0:
+            return 0.0
+        frames = pcm[:frames_count * self.frame_length].reshape(frames_count, self.frame_length)
+        samples = frames.astype(np.float32) / 32768
+
+        rms = np.sqrt(np.mean(samples ** 2, axis=1))
+        energy_db = 20 * np.log10(np.maximum(rms, 1e-10))
+        signs = np.signbit(samples)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_length - 1)
+
+        noise_floor = np.percentile(energy_db, 20)
+        speech = (
+            (energy_db > self.settings.AUDIO_VAD_ENERGY_THRESHOLD_DB)
+            & (energy_db > noise_floor + self.settings.AUDIO_VAD_NOISE_MARGIN_DB)
+            & (zcr >= self.settings.AUDIO_VAD_MIN_ZCR)
+            & (zcr <= self.settings.AUDIO_VAD_MAX_ZCR)
+        )
+        return float(np.count_nonzero(speech)) / frames_count
+
+    def is_speech(self, pcm: np.ndarray) -> bool:
+        return self.speech_ratio(pcm) >= self.settings.AUDIO_VAD_MIN_SPEECH_RATIO
+
+
+class SpeechChunkMerger:
+    """
+    Merge consecutive speech chunks into one variable-length chunk of up to
+    `max_seconds`, so each transcription request carries more speech.
+
+    The merged chunk keeps the first chunk's index and lists the absorbed
+    ones in `merged_chunk_indexes`. Overlapping samples between neighbours
+    are only kept once.
+    """
+
+    def __init__(self, max_seconds: float, sample_rate: int = SAMPLE_RATE):
+        self.max_ms = int(max_seconds * 1000)
+        self.sample_rate = sample_rate
+        self._pending: Optional[AudioChunk] = None
+
+    def push(self, chunk: AudioChunk) -> List[AudioChunk]:
+        ready = []
+        pending = self._pending
+        if pending is not None and (chunk.start_time > pending.end_time
+                                    or chunk.end_time - pending.start_time > self.max_ms):
+            ready.append(pending)
+            pending = None
+        if pending is None:
+            self._pending = chunk
+            return ready
+
+        overlap = max(pending.end_time - chunk.start_time, 0) * self.sample_rate // 1000
+        self._pending = AudioChunk(
+            chunk_index=pending.chunk_index,
+            start_time=pending.start_time,
+            end_time=chunk.end_time,
+            pcm=np.concatenate([pending.pcm, chunk.pcm[overlap:]]),
+            merged_chunk_indexes=pending.merged_chunk_indexes + [chunk.chunk_index],
+        )
+        return ready
+
+    def flush(self) -> List[AudioChunk]:
+        pending, self._pending = self._pending, None
+        return [pending] if pending is not None else []
@@ -5,30 +5,33 @@ import cv2
 from pathlib import Path
 import sys
 import subprocess
-from groq import Groq
 import json
 from openai import OpenAI
 import pybase64
-import tempfile
 import numpy as np
 from kubric_mcp.config import get_settings
-from transformers import CLIPProcessor, CLIPModel
-import torch
 import io
-from PIL import Image
 from tqdm import tqdm
 from scipy.io import wavfile
 from minio.error import S3Error
-from pydub import AudioSegment
 from kubric_mcp.models import VideoIndex, AudioIndex, FrameIndex, AudioStatus, VideoStatus, FrameStatus
-from kubric_mcp.services import AudioService, VideoService
-from kubric_mcp.db import get_session
+from kubric_mcp.services import AudioService, VideoService, FrameService, CaptionCacheService
+from kubric_mcp.services.minio import Artifact, MinIOService
+from kubric_mcp.services.video_cache import get_video_cache
 from tqdm.asyncio import tqdm
 from enum import Enum
-from sqlalchemy import select
+from typing import Iterable, List, Optional
+from kubric_mcp.video.ingestion.frame_sampler import SampledFrame, TimestampFrameSampler, get_frame_sampler, iter_frame_batches
+from kubric_mcp.video.ingestion.frame_hash import dhash, hamming_distances
+from kubric_mcp.video.ingestion.captioner import FrameCaptioner
+from kubric_mcp.video.ingestion.text_embedding import TextEmbedder
+from kubric_mcp.video.ingestion.transcriber import get_transcriber
+from kubric_mcp.video.ingestion.vad import SpeechChunkMerger, VoiceActivityDetector
+from kubric_mcp.video.ingestion.audio_codec import encode_pcm_async
+from kubric_mcp.video.ingestion.audio_stream import AudioChunk, iter_pcm_segments, plan_audio_chunks, probe_duration
+
+from kubric_mcp.video.ingestion.image_embedding import get_image_embedding_backend
 
-DEVICE = "mps" if torch.backends.mps.is_available() else "cpu"
-print(DEVICE, "device")
 
 class VideoPorcessorStatus(str, Enum):
     PENDING_EMBEDDING = "pending_embedding"
@@ -40,69 +43,112 @@ class VideoPorcessorStatus(str, Enum):
     PENDING = "pending"
     
 class VideoProcessor():
-    def __init__(self, minio_client: Minio, video_path: str):
-        self.minio_client = minio_client
+    def __init__(self, minio_client: MinIOService, video_path: str):
+        self.minio = minio_client
+        self.minio_client = minio_client.client
         self.video_path = video_path
         self.temp_video_path = None
         self.temp_audio_path = None
         self.settings = get_settings()
         self.bucket_name = self.settings.MINIO_BUCKET_NAME
-        self.frames = None
         self.openai_client = OpenAI(api_key=self.settings.OPENAI_API_KEY)
-        self.groq_client = Groq(api_key=self.settings.GROQ_API_KEY)
         self.audio_transcripts = []
+        self.audio_uploads = set()
+        self.audio_upload_slots = None
         self.background_task = set()
-        self.db_session = next(get_session())
-        self.audio_service = AudioService(session=self.db_session)
-        self.video_service = VideoService(session=self.db_session)
+        # the services open a short unit of work per call, no connection is held by the processor
+        self.audio_service = AudioService()
+        self.video_service = VideoService()
+        self.frame_service = FrameService()
+        self.caption_cache = CaptionCacheService(max_distance=self.settings.CAPTION_CACHE_MAX_HAMMING_DISTANCE)
         self.video_id = None
+        self.cached_video = None
         self._load_video()
 
 
     def _load_video(self):
-        suffix = Path(self.video_path).suffix
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-        self.temp_video_path = temp_file.name
-        temp_file.close()
-        self.minio_client.fget_object(
-            self.bucket_name,
-            self.video_path,
-            self.temp_video_path
-        )
-        metadata = self.minio_client.stat_object(
-        bucket_name=self.settings.MINIO_BUCKET_NAME, object_name=self.video_path)
-        is_video_exists = self.db_session.query(VideoIndex).filter(VideoIndex.minio_path == self.video_path).first()
-        if(not is_video_exists):
-            video_entry = self.video_service._make_entry(minio_path=self.video_path, filename=metadata.object_name)
-            self.video_id = video_entry.id
-            print("✅  [Video Processor]: Video entry made in databaase")
+        # local copy shared with other processors of the same object, leased until _release_video
+        self.cached_video = get_video_cache().acquire(self.minio_client, self.bucket_name, self.video_path)
+        self.temp_video_path = self.cached_video.path
+        self.content_sha256 = self._content_hash()
 
-        else:
+    async def _register_video(self):
+        """
+        Find the video's row, or the row of an identical upload, or create one
+        """
+        is_video_exists = await self.video_service._find_by_path(self.video_path)
+        duplicate = await self.video_service._find_by_content_hash(self.content_sha256) \
+            if self.content_sha256 and not is_video_exists else None
+        if is_video_exists:
             print("✅  [Video Processor]: Video already exists in databaase")
 
             self.video_id = is_video_exists.id
+            if is_video_exists.content_sha256 is None and self.content_sha256:
+                await self.video_service._set_content_hash(self.video_id, self.content_sha256)
+        elif duplicate:
+            # same content under another object, its audio and frame rows are reused
+            print(f"✅  [Video Processor]: Video content already indexed as {duplicate.minio_path}")
+            self.video_id = duplicate.id
+        else:
+            video_entry = await self.video_service._make_entry(
+                minio_path=self.video_path, filename=self.cached_video.stat.object_name,
+                content_sha256=self.content_sha256)
+            self.video_id = video_entry.id
+            print("✅  [Video Processor]: Video entry made in databaase")
 
         return
-    
-    def _check_status(self):
-        video = self.db_session.query(VideoIndex).filter(VideoIndex.id == self.video_id).first()
+
+    def _content_hash(self) -> Optional[str]:
+        """
+        SHA-256 of the video from the tag the API sets once it has hashed an
+        upload. Untagged objects are not hashed here, reading a multi-GB file
+        again only to find duplicates costs more than processing it twice
+        """
+        try:
+            tags = self.minio_client.get_object_tags(self.bucket_name, self.video_path)
+            if tags and tags.get("content_sha256"):
+                return tags["content_sha256"]
+        except S3Error as e:
+            print(f"[Video Processor] could not read object tags: {e}")
+        return None
+
+    def _release_video(self):
+        if self.cached_video is not None:
+            get_video_cache().release(self.cached_video)
+            self.cached_video = None
+
+    def _release_video_when_done(self):
+        """
+        Hand the cached video back once the scheduled stages have finished
+        """
+        async def release():
+            while self.background_task:
+                await asyncio.gather(*list(self.background_task), return_exceptions=True)
+            self._release_video()
+
+        self._release_task = asyncio.create_task(release())
+
+    async def _check_status(self):
+        video = await self.video_service._get_video(self.video_id)
         if(not video.audio_processing_completed):
-            audio = self.db_session.query(AudioIndex).filter(AudioIndex.video_id == self.video_id).all()
-            if any(item.status == AudioStatus.PENDING_EMBEDDING for item in audio):
+            audio_statuses = await self.audio_service._get_statuses(self.video_id)
+            if AudioStatus.PENDING_EMBEDDING in audio_statuses:
                 print("[Video Processor]: Audio transcription done. start trnascription emebedding")
                 return VideoPorcessorStatus.PENDING_EMBEDDING
-            if any(item.status == AudioStatus.PENDING_TRANSCRIPTION for item in audio):
+            if AudioStatus.PENDING_TRANSCRIPTION in audio_statuses:
                 print("[Video Processor]: start trnascription")
                 return VideoPorcessorStatus.PENDING_TRANSCRIPTION
-        elif(not video.frame_processing_completed):
-            frames = self.db_session.query(FrameIndex).filter(FrameIndex.id == self.video_id).all()
-            if any(item.status == FrameStatus.PENDING_IMAGE_EMBEDDING for item in frames):
+            if not await self._complete_silent_audio(audio_statuses):
+                return None
+        if(not video.frame_processing_completed):
+            frame_statuses = await self.frame_service._get_statuses(self.video_id)
+            if FrameStatus.PENDING_IMAGE_EMBEDDING in frame_statuses:
                 print("Start image embedding")
                 return VideoPorcessorStatus.PENDING_IMAGE_EMBEDDING
-            elif any(item.status == FrameStatus.PENDING_CAPTON for item in frames):
+            elif FrameStatus.PENDING_CAPTON in frame_statuses:
                 print("Start image captioning")
                 return VideoPorcessorStatus.PENDING_CAPTION_GENERATION
-            elif any(item.status == FrameStatus.PENDING_CAPTION_EMBEDDING for item in frames):
+            elif FrameStatus.PENDING_CAPTION_EMBEDDING in frame_statuses:
                 print("Start caption embedding")
                 return VideoPorcessorStatus.PENDING_CAPTION_EMBEDDING
         elif(video.status == VideoStatus.FAILED or video.status == VideoStatus.UPLOADED):
@@ -110,32 +156,13 @@ class VideoProcessor():
             return VideoPorcessorStatus.PENDING
 
 
-    def _extract_frames(self):
+    async def _extract_frames(self):
         if not self.temp_video_path:
             raise ValueError("Video path not found")
 
-        cap = cv2.VideoCapture(self.temp_video_path)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-
-        # compute frame indices to extract uniformly
-
-        frame_indices = np.linspace(
-            0, total_frames - 1, 2, dtype=int)
-
-        frames = []
-        for i, frame_idx in enumerate(frame_indices):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-            ret, frame = cap.read()
-            if ret:
-                frames.append(frame)
-            else:
-                raise ValueError(
-                    f"VideoProcessor: _extract_frames: could not read frame {frame_idx}")
-        cap.release()
-        self.frames = frame
-        print(f"✅ [Video Processor] Extracted frames : {len(frames)}")
+        await self._embed_frames()
+        await self._process_captions()
         print("[Video Processor] Starting to audio processing in background")
-        self._generate_embedding_for_frames()
         # self.__start_audio_processsing()
 
     def _start_audio_processsing(self):
@@ -147,118 +174,160 @@ class VideoProcessor():
     async def _process_audio(self):
         """
         Extract the audio from the video and start audio processing
+
+        The soundtrack is decoded by an ffmpeg subprocess into mono 16 kHz PCM
+        and chunks are transcribed as soon as they are decoded. At most
+        `AUDIO_MAX_INFLIGHT_CHUNKS` chunks are held in memory at once, so the
+        encoder pool works on later chunks while earlier ones are uploaded.
+        Stored chunks go to MinIO as soon as they are encoded, with at most
+        `MINIO_UPLOAD_WORKERS` uploads in flight.
         """
-        audio = AudioSegment.from_file(self.temp_video_path)
-        total_duration_ms = len(audio)
-        chunk_duration_ms = self.settings.AUDIO_CHUNK_LENGTH * 1000
-        audio_chunks_info =[]
-        for i, start_ms in enumerate(range(0, total_duration_ms, chunk_duration_ms)):
-            end_ms = min(start_ms + chunk_duration_ms, total_duration_ms)
-            audio_chunks_info.append({"start_time": start_ms, "end_time": end_ms, "chunk_index":i})
-        coroutines = [
-            self._transcribe_audio(audio, chunk['start_time'], chunk['end_time'], chunk['chunk_index']) 
-            for chunk in audio_chunks_info
-        ]
-        print("✅ [Video Processor] Audio Chunk Info prepared", audio_chunks_info)
-        self.audio_service._create_entry(self.video_id, audio_chunks_info=audio_chunks_info)
-        print(f"[Video Processor] Processing {len(coroutines)} chunks...")
-        results=[]
-        with tqdm(total= len(coroutines), desc="[Video Processor]: transcribing audio chunks") as pbar:
-            for coro in asyncio.as_completed(coroutines):
-                result = await coro
-                results.append(result)
-                pbar.update(1)
-        self.audio_service._update_transcription(self.video_id, transcriptions=results)
+        duration = await asyncio.to_thread(probe_duration, self.temp_video_path)
+        overlap = self.settings.AUDIO_OVERLAP_SECONDS if self.settings.AUDIO_CHUNK_OVERLAP else 0
+        audio_chunks_info = plan_audio_chunks(
+            duration, self.settings.AUDIO_CHUNK_LENGTH, overlap, self.settings.AUDIO_MIN_CHUNK_DURATION_SECONDS)
+        print("✅ [Video Processor] Audio Chunk Info prepared", len(audio_chunks_info))
+
+        existing_chunks = await self.audio_service._get_chunks(self.video_id)
+        if existing_chunks:
+            # resumed run, only transcribe the chunks that are still pending
+            audio_chunks_info = [
+                {"start_time": int(chunk.start_time), "end_time": int(chunk.end_time), "chunk_index": chunk.chunk_index}
+                for chunk in existing_chunks if chunk.status == AudioStatus.PENDING_TRANSCRIPTION
+            ]
+        else:
+            await self.audio_service._create_entry(self.video_id, audio_chunks_info=audio_chunks_info)
+        print(f"[Video Processor] Processing {len(audio_chunks_info)} chunks...")
+
+        chunks = iter_pcm_segments(self.temp_video_path, audio_chunks_info)
+        vad = VoiceActivityDetector() if self.settings.AUDIO_VAD_ENABLED else None
+        merger = SpeechChunkMerger(self.settings.AUDIO_VAD_MAX_MERGED_SECONDS) \
+            if vad is not None and self.settings.AUDIO_VAD_MERGE_SPEECH else None
+        in_flight = asyncio.Semaphore(self.settings.AUDIO_MAX_INFLIGHT_CHUNKS)
+        self.audio_upload_slots = asyncio.Semaphore(self.settings.MINIO_UPLOAD_WORKERS)
+        results = []
+        silent_chunks = []
+        tasks = []
+        with tqdm(total=len(audio_chunks_info), desc="[Video Processor]: transcribing audio chunks") as pbar:
+
+            async def transcribe(chunk: AudioChunk):
+                try:
+                    result = await self._transcribe_audio(chunk)
+                finally:
+                    in_flight.release()
+                if result is not None:
+                    results.append(result)
+                pbar.update(1 + len(chunk.merged_chunk_indexes))
+
+            async def dispatch(ready):
+                for item in ready:
+                    await in_flight.acquire()
+                    tasks.append(asyncio.create_task(transcribe(item)))
+
+            def next_chunk():
+                # decode and VAD stay off the event loop, encoding runs in the encoder pool
+                chunk = next(chunks, None)
+                return chunk, chunk is not None and (vad is None or vad.is_speech(chunk.pcm))
+
+            while True:
+                chunk, speech = await asyncio.to_thread(next_chunk)
+                if chunk is None:
+                    break
+                if not speech:
+                    silent_chunks.append(chunk.chunk_index)
+                    pbar.update(1)
+                    await dispatch(merger.flush() if merger else [])
+                elif merger is not None:
+                    await dispatch(merger.push(chunk))
+                else:
+                    await dispatch([chunk])
+            if merger is not None:
+                await dispatch(merger.flush())
+            await asyncio.gather(*tasks)
+        if silent_chunks:
+            print(f"[Video Processor] skipped {len(silent_chunks)} silent chunks")
+            await self.audio_service._mark_silent(self.video_id, silent_chunks)
+        await self.audio_service._update_transcription(self.video_id, transcriptions=results)
+        await self._complete_silent_audio(await self.audio_service._get_statuses(self.video_id))
+        if self.audio_uploads:
+            stored = await asyncio.gather(*self.audio_uploads)
+            print(f"[Video Processor] stored {sum(stored)}/{len(stored)} remaining audio chunks")
         return True
 
 
-    def _store_audio_to_minio(self,buffer, index):
-        try:
-            if not self.minio_client.bucket_exists("audio"):
-                self.minio_client.make_bucket("audio")
-                print(f"Bucket created")
-        except S3Error as e:
-            print(f"Error {e}")
-        bucket_name= "audio"
-        try:
-            self.minio_client.put_object(
-                bucket_name=bucket_name,
-                object_name= index,
-                content_type="audio/wav",
-                data=buffer,
-                length =buffer.getbuffer().nbytes
-            )
-            print(f"audio {index} stored")
-        except S3Error as e:
-            print(f"Error in storing {e}")
+    async def _store_audio_chunk(self, artifact: Artifact):
+        """
+        Start uploading one encoded chunk. Waits for a free upload slot, so a
+        slow MinIO holds back encoding instead of piling chunks up in memory.
+        """
+        await self.audio_upload_slots.acquire()
+
+        async def upload():
+            try:
+                await self.minio.put_async(artifact)
+                return True
+            except Exception as e:
+                print(f"❌ [Video Processor] storing {artifact.bucket_name}/{artifact.object_name} failed: {e}")
+                return False
+            finally:
+                self.audio_upload_slots.release()
 
-    async def _transcribe_audio(self, audio, start_ms, end_ms, index):
-        chunk = audio[start_ms: end_ms]
-        chunk = chunk.set_channels(1)
-        chunk = chunk.set_frame_rate(16000)
+        upload_task = asyncio.create_task(upload())
+        self.audio_uploads.add(upload_task)
+        upload_task.add_done_callback(self.audio_uploads.discard)
 
-        buffer = io.BytesIO()
-        chunk.export(buffer, format="wav")
-        buffer.seek(0)
-        buffer.name = f"chunk_{index}.wav"
+    async def _transcribe_audio(self, chunk: AudioChunk):
+        index = chunk.chunk_index
         try:
-            transcription = self.groq_client.audio.transcriptions.create(
-                model=self.settings.AUDIO_TRANSCRIPT_MODEL,
-                file=buffer,
-                response_format="json"
-            )
+            encoded = await encode_pcm_async(chunk.pcm, self.settings.AUDIO_PAYLOAD_CODEC)
+            if self.settings.AUDIO_STORE_CHUNKS:
+                await self._store_audio_chunk(Artifact(
+                    bucket_name=self.settings.MINIO_AUDIO_BUCKET,
+                    object_name=f"{self.video_id}/chunk_{index}.{encoded.extension}",
+                    data=encoded.data,
+                    content_type=encoded.content_type,
+                ))
+            transcription = await get_transcriber().transcribe(encoded.to_buffer(f"chunk_{index}"))
             return {
                 'chunk_index': index,
-                'transcription': transcription.text
+                'transcription': transcription,
+                'end_time': chunk.end_time,
+                'merged_chunk_indexes': chunk.merged_chunk_indexes
             }
         except Exception as e:
             print(f"Error transcribing chunk {index}: {e}")
             return None
-        finally:
-            buffer.close()
 
-    def _generate_embedding_for_transription(self):
-        audio_transcriptions = self.db_session.execute(select(AudioIndex.transcription_text, AudioIndex.id)
-                                                       .where(AudioIndex.video_id == self.video_id)
-                                                       .where(AudioIndex.status == AudioStatus.PENDING_EMBEDDING)).all()
+    async def _complete_silent_audio(self, audio_statuses) -> bool:
+        """
+        A track where every chunk is silent has nothing left to transcribe or
+        embed, so audio is marked completed without an embedding pass
+        """
+        if not audio_statuses or not set(audio_statuses) <= {AudioStatus.SILENT, AudioStatus.COMPLETE}:
+            return False
+        await self.video_service._mark_audio_completed(self.video_id)
+        print("✅ [Video Processor] no speech left to transcribe, audio marked completed")
+        return True
+
+    async def _generate_embedding_for_transription(self):
+        audio_transcriptions = await self.audio_service._get_pending_embedding(self.video_id)
         transcription_list = [item[0] for item in audio_transcriptions]
         transcription_ids = [item[1] for item in audio_transcriptions]
 
-        results= []
-        
         try:
-            for index in tqdm(range(0, len(transcription_list)), desc="Generating embedding for transcriptions"):
-                embedding_response = self.openai_client.embeddings.create(
-                    model=self.settings.TRANSCRIPT_SIMILARITY_EMDB_MODEL,
-                    input= transcription_list[index]
-                )
-                results.append({"id":transcription_ids[index], "embedding": embedding_response.data[0].embedding})
-
-            self.audio_service._update_transcription_embedding(embdeddings_info=results)
-            self.db_session.query(VideoIndex).filter(VideoIndex.id == self.video_id).update({"audio_processing_completed", True})
+            embeddings = await TextEmbedder(self.settings.TRANSCRIPT_SIMILARITY_EMDB_MODEL).embed(transcription_list)
+            results = [
+                {"id": transcription_id, "embedding": embedding}
+                for transcription_id, embedding in zip(transcription_ids, embeddings)
+            ]
+
+            await self.audio_service._update_transcription_embedding(embdeddings_info=results)
+            await self.video_service._mark_audio_completed(self.video_id)
             print("✅ [Video Processor] embedding generated for transcription")
         except Exception as e:
             print('❌ [Video Processor] embedding generation failed',e)
 
 
-    def _split_audio(self, audio):
-        duration = audio.duration
-        chunks_info = []
-        current_start = 0
-
-        while current_start < duration:
-            chunk_end = min(
-                current_start + self.settings.AUDIO_CHUNK_LENGTH, duration)
-            chunks_info.append({
-                "start": current_start,
-                "end": chunk_end,
-                "index": len(chunks_info)
-            })
-            current_start += (self.settings.AUDIO_CHUNK_LENGTH -
-                              self.settings.AUDIO_OVERLAP_SECONDS)
-        print(f"created {len(chunks_info)} overlapping chunks")
-        return chunks_info
-
     def _encode_image(self, frame):
         """
         Encoding image for passing the image as argument into openai model for generating image embedding
@@ -270,24 +339,168 @@ class VideoProcessor():
         encoded_bytes = pybase64.b64encode(buffer)
         return encoded_bytes.decode("utf-8")
 
-    def _generate_embedding_for_frames(self):
-        pil_frames = [Image.fromarray(cv2.cvtColor(
-            f, cv2.COLOR_BGR2RGB)) for f in self.frames]
+    def _generate_embedding_for_frames(self, frames: Optional[Iterable[SampledFrame]] = None):
+        """
+        Embed sampled frames with CLIP.
 
-        model = CLIPModel.from_pretrained(
-            self.settings.IMAGE_EMDB_MODEL).to(DEVICE)
-        processor = CLIPProcessor.from_pretrained(
-            self.settings.IMAGE_EMDB_MODEL)
+        Frames are pulled from the single-pass sampler through a bounded queue,
+        so only `FRAME_QUEUE_SIZE` decoded frames are alive at any time.
+        """
+        if frames is None:
+            frames = get_frame_sampler(self.temp_video_path)
 
-        batch_szie = 16
+        backend = get_image_embedding_backend()
+        batch_size = backend.tuned_batch_size()
+        timestamps = []
+        perceptual_hashes = []
         image_embeddings = []
-        for i in tqdm(range(0, len(pil_frames), batch_szie), desc="Embedding frames"):
-            batch = pil_frames[i: i+batch_szie]
-            inputs = processor(images=batch, return_tensors="pt").to(DEVICE)
-            with torch.no_grad():
-                features = model.get_image_features(**inputs)
-                features = features / features.norm(p=2, dim=1, keepdim=True)
-                image_embeddings.append(features)
-        image_embeddings = torch.cat(image_embeddings, dim=0)
+        batches = iter_frame_batches(
+            frames, batch_size=batch_size, max_queue_size=max(self.settings.FRAME_QUEUE_SIZE, batch_size))
+        for batch in tqdm(batches, desc=f"Embedding frames ({backend.name})"):
+            image_embeddings.append(backend.embed([f.image for f in batch]))
+            timestamps.extend(f.timestamp_seconds for f in batch)
+            perceptual_hashes.extend(dhash(f.image) for f in batch)
+        if not image_embeddings:
+            raise ValueError("VideoProcessor: _generate_embedding_for_frames: no frames sampled")
+        image_embeddings = np.concatenate(image_embeddings, axis=0)
+        print(f"✅ [Video Processor] Extracted frames : {len(timestamps)}")
 
-        return
+        return timestamps, image_embeddings, perceptual_hashes
+
+    async def _embed_frames(self):
+        # decoding and CLIP inference are blocking, keep them off the event loop
+        timestamps, image_embeddings, perceptual_hashes = await asyncio.to_thread(
+            self._generate_embedding_for_frames)
+        await self.frame_service._bulk_upsert_frame_embeddings(
+            self.video_id, timestamps, image_embeddings, perceptual_hashes=perceptual_hashes)
+
+    async def _process_captions(self):
+        await self._generate_caption_for_frames()
+        await self._generate_embedding_for_captions()
+
+    async def _generate_caption_for_frames(self):
+        """
+        Caption the frames waiting for a caption.
+
+        Each frame's perceptual hash is checked against the caption cache
+        first. Near-duplicates (replays, re-uploads, static overlays) reuse the
+        cached caption and caption embedding and skip the vision call. Misses
+        are captioned concurrently by FrameCaptioner and written back in
+        batches of `CAPTION_WRITE_BATCH_SIZE`.
+        """
+        pending = await self.frame_service._get_frames(self.video_id, FrameStatus.PENDING_CAPTON)
+        if not pending:
+            return
+        frames_by_timestamp = {frame.timestamp_seconds: frame for frame in pending}
+        sampler = iter(TimestampFrameSampler(self.temp_video_path, frames_by_timestamp.keys()))
+        captioner = FrameCaptioner()
+        # bounds decoded frames waiting for a caption slot
+        in_flight = asyncio.Semaphore(captioner.concurrency * 2)
+        batch_size = self.settings.CAPTION_WRITE_BATCH_SIZE
+        captions_info = []
+        # frames captioned during this run are not in the cache until their captions are embedded
+        run_hashes = []
+        run_tasks = []
+
+        async def flush(force: bool = False):
+            nonlocal captions_info
+            if captions_info and (force or len(captions_info) >= batch_size):
+                batch, captions_info = captions_info, []
+                await self.frame_service._update_captions(batch)
+
+        async def caption_frame(frame, image):
+            try:
+                caption = await captioner.caption(image)
+            except Exception as e:
+                print(f"❌ [Video Processor] captioning frame at {frame.timestamp_seconds}s failed", e)
+                return None
+            finally:
+                in_flight.release()
+            captions_info.append({
+                "id": frame.id,
+                "caption": caption,
+                "status": FrameStatus.PENDING_CAPTION_EMBEDDING,
+            })
+            await flush()
+            return caption
+
+        async def reuse_caption(frame, source_task):
+            try:
+                caption = await source_task
+            finally:
+                in_flight.release()
+            if caption is None:
+                return None
+            captions_info.append({
+                "id": frame.id,
+                "caption": caption,
+                "status": FrameStatus.PENDING_CAPTION_EMBEDDING,
+            })
+            await flush()
+            return caption
+
+        tasks = []
+        with tqdm(total=len(pending), desc="Captioning frames") as pbar:
+            while True:
+                sampled = await asyncio.to_thread(next, sampler, None)
+                if sampled is None:
+                    break
+                frame = frames_by_timestamp[sampled.timestamp_seconds]
+                perceptual_hash = frame.perceptual_hash
+                if perceptual_hash is None:
+                    perceptual_hash = dhash(sampled.image)
+                cached = await self.caption_cache._lookup(perceptual_hash)
+                if cached is not None:
+                    captions_info.append({
+                        "id": frame.id,
+                        "caption": cached.caption,
+                        "caption_embedding": cached.caption_embedding,
+                        "status": FrameStatus.COMPLETE,
+                    })
+                    pbar.update(1)
+                    await flush()
+                    continue
+
+                await in_flight.acquire()
+                source_task = None
+                if run_hashes:
+                    distances = hamming_distances(np.array(run_hashes, dtype=np.int64), perceptual_hash)
+                    best = int(np.argmin(distances))
+                    if distances[best] <= self.caption_cache.max_distance:
+                        source_task = run_tasks[best]
+                if source_task is not None:
+                    task = asyncio.create_task(reuse_caption(frame, source_task))
+                else:
+                    task = asyncio.create_task(caption_frame(frame, sampled.image))
+                    run_hashes.append(perceptual_hash)
+                    run_tasks.append(task)
+                task.add_done_callback(lambda _: pbar.update(1))
+                tasks.append(task)
+            await asyncio.gather(*tasks)
+        await flush(force=True)
+        print(f"✅ [Video Processor] captions generated, cache hits: {self.caption_cache.hits}, "
+              f"misses: {self.caption_cache.misses}, requests: {captioner.requests}, retries: {captioner.retries}")
+
+    async def _generate_embedding_for_captions(self):
+        pending = await self.frame_service._get_frames(self.video_id, FrameStatus.PENDING_CAPTION_EMBEDDING)
+        if not pending:
+            return
+        try:
+            embeddings = await TextEmbedder(self.settings.CAPTION_SIMILARITY_EMBD_MODEL).embed(
+                [frame.caption for frame in pending])
+            results = [
+                {
+                    "id": frame.id,
+                    "perceptual_hash": frame.perceptual_hash,
+                    "caption": frame.caption,
+                    "embedding": embedding,
+                }
+                for frame, embedding in zip(pending, embeddings)
+            ]
+            await self.frame_service._update_caption_embedding(embeddings_info=results)
+            await self.caption_cache._store([
+                {**result, "caption_embedding": result["embedding"]} for result in results
+            ])
+            print("✅ [Video Processor] embedding generated for captions")
+        except Exception as e:
+            print('❌ [Video Processor] caption embedding generation failed', e)
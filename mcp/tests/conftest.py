@@ -0,0 +1,7 @@
+import os
+
+# Settings are read once, the tests never reach these services
+for name in ("OPIK_API_KEY", "OPIK_WORKSPACE", "OPIK_PROJECT", "GROQ_API_KEY", "OPENAI_API_KEY",
+             "MINIO_ACCESS_KEY", "MINIO_SECRET_KEY", "MINIO_BUCKET_NAME"):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("MINIO_SECURE", "false")
@@ -0,0 +1,45 @@
+import asyncio
+import glob
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+from scipy.io import wavfile
+
+from kubric_mcp.config import get_settings
+from kubric_mcp.video.ingestion import audio_codec
+from kubric_mcp.video.ingestion.audio_stream import SAMPLE_RATE
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "AUDIO_ENCODER_POOL", "process")
+    monkeypatch.setattr(settings, "AUDIO_ENCODER_WORKERS", 1)
+    audio_codec.get_encoder_pool.cache_clear()
+    pool = audio_codec.get_encoder_pool()
+    yield pool
+    pool.shutdown()
+    audio_codec.get_encoder_pool.cache_clear()
+
+
+def spooled_files():
+    return set(glob.glob(f"{audio_codec._spool_dir() or '/tmp'}/kubric-pcm-*"))
+
+
+def test_chunk_round_trips_through_process_pool(process_pool):
+    assert isinstance(process_pool, ProcessPoolExecutor)
+    pcm = np.random.default_rng(0).integers(-32768, 32767, 2 * SAMPLE_RATE, dtype=np.int16)
+    before = spooled_files()
+
+    encoded = asyncio.run(audio_codec.encode_pcm_async(pcm, "wav"))
+
+    assert (encoded.codec, encoded.content_type, encoded.extension) == ("wav", "audio/wav", "wav")
+    sample_rate, decoded = wavfile.read(io.BytesIO(encoded.data))
+    assert sample_rate == SAMPLE_RATE
+    np.testing.assert_array_equal(decoded, pcm)
+    # the spool file is gone once the worker has encoded it
+    assert spooled_files() == before
@@ -0,0 +1,110 @@
+import io
+
+import numpy as np
+import pytest
+
+from kubric_mcp.video.ingestion import audio_stream
+from kubric_mcp.video.ingestion.audio_stream import iter_pcm_segments, plan_audio_chunks
+
+
+def spans(chunks):
+    return [(chunk["start_time"], chunk["end_time"]) for chunk in chunks]
+
+
+def test_plan_without_overlap():
+    chunks = plan_audio_chunks(25, 10)
+    assert spans(chunks) == [(0, 10000), (10000, 20000), (20000, 25000)]
+    assert [chunk["chunk_index"] for chunk in chunks] == [0, 1, 2]
+
+
+def test_plan_with_overlap():
+    assert spans(plan_audio_chunks(25, 10, overlap_seconds=1)) == [(0, 10000), (9000, 19000), (18000, 25000)]
+
+
+def test_plan_exact_multiple_has_no_empty_tail():
+    assert spans(plan_audio_chunks(20, 10)) == [(0, 10000), (10000, 20000)]
+    assert spans(plan_audio_chunks(19, 10, overlap_seconds=1)) == [(0, 10000), (9000, 19000)]
+
+
+def test_plan_folds_short_tail():
+    assert spans(plan_audio_chunks(21.5, 10, min_chunk_seconds=2)) == [(0, 10000), (10000, 21500)]
+    assert spans(plan_audio_chunks(22, 10, min_chunk_seconds=2)) == [(0, 10000), (10000, 20000), (20000, 22000)]
+
+
+def test_plan_shorter_than_one_chunk():
+    assert spans(plan_audio_chunks(3.2, 10, min_chunk_seconds=5)) == [(0, 3200)]
+    assert plan_audio_chunks(0, 10) == []
+
+
+def test_plan_rejects_overlap_not_smaller_than_chunk():
+    with pytest.raises(ValueError):
+        plan_audio_chunks(30, 10, overlap_seconds=10)
+
+
+class FakeFfmpeg:
+    """Popen stand-in that pipes a fixed s16le stream"""
+
+    def __init__(self, pcm: np.ndarray, returncode: int = 0, error: bytes = b""):
+        self.pcm = pcm
+        self.returncode = returncode
+        self.error = error
+
+    def __call__(self, command, stdout, stderr):
+        self.stdout = io.BytesIO(self.pcm.astype("<i2").tobytes())
+        stderr.write(self.error)
+        return self
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        pass
+
+    def wait(self):
+        return self.returncode
+
+
+SAMPLES_PER_MS = 16
+
+
+def decode(monkeypatch, segments, seconds: float = 30, read_seconds: float = 0.37, **ffmpeg):
+    # sample i carries i // 16 so every sample names the millisecond it belongs to
+    pcm = (np.arange(int(seconds * 1000 * SAMPLES_PER_MS)) // SAMPLES_PER_MS).astype(np.int16)
+    monkeypatch.setattr(audio_stream.subprocess, "Popen", FakeFfmpeg(pcm, **ffmpeg))
+    return list(iter_pcm_segments("video.mp4", segments, read_seconds=read_seconds))
+
+
+def assert_covers(chunk):
+    expected = np.arange(chunk.start_time * SAMPLES_PER_MS, chunk.end_time * SAMPLES_PER_MS) // SAMPLES_PER_MS
+    np.testing.assert_array_equal(chunk.pcm, expected.astype(np.int16))
+
+
+def test_segments_with_overlap_get_their_exact_samples(monkeypatch):
+    chunks = decode(monkeypatch, plan_audio_chunks(30, 10, overlap_seconds=1))
+    assert [chunk.chunk_index for chunk in chunks] == [0, 1, 2, 3]
+    for chunk in chunks:
+        assert_covers(chunk)
+
+
+def test_gaps_between_segments_are_skipped(monkeypatch):
+    segments = [
+        {"chunk_index": 1, "start_time": 12000, "end_time": 14000},
+        {"chunk_index": 0, "start_time": 500, "end_time": 1500},
+        {"chunk_index": 2, "start_time": 25000, "end_time": 25250},
+    ]
+    chunks = decode(monkeypatch, segments)
+    assert [chunk.chunk_index for chunk in chunks] == [0, 1, 2]
+    for chunk in chunks:
+        assert_covers(chunk)
+
+
+def test_segment_past_the_stream_end_is_truncated(monkeypatch):
+    [chunk] = decode(monkeypatch, [{"chunk_index": 0, "start_time": 1000, "end_time": 4000}], seconds=2)
+    assert len(chunk.pcm) == 1000 * SAMPLES_PER_MS
+    assert chunk.pcm[-1] == 1999
+
+
+def test_decode_failure_reports_ffmpeg_stderr(monkeypatch):
+    with pytest.raises(RuntimeError, match="Invalid data found"):
+        decode(monkeypatch, [{"chunk_index": 0, "start_time": 0, "end_time": 1000}], seconds=0,
+               returncode=1, error=b"Invalid data found when processing input")
@@ -0,0 +1,112 @@
+import asyncio
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+import pytest
+
+from kubric_mcp.config import get_settings
+from kubric_mcp.video.ingestion.captioner import FrameCaptioner
+
+RETRY_AFTER_SECONDS = 0.3
+FRAMES = 6
+
+
+class StubCaptionServer(ThreadingHTTPServer):
+    """
+    OpenAI compatible chat completions endpoint. The first request is
+    rate limited with a Retry-After, later ones caption a frame by its grey
+    level after a delay that is longest for the first frames, so responses
+    finish out of order.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubCaptionHandler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.rate_limited_at = None
+
+
+class StubCaptionHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, body: dict, headers: dict = None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["content-length"])))
+        url = body["messages"][0]["content"][1]["image_url"]["url"]
+        image = cv2.imdecode(np.frombuffer(base64.b64decode(url.split(",", 1)[1]), np.uint8), cv2.IMREAD_GRAYSCALE)
+        frame = int(round(image.mean() / 40))
+        with server.lock:
+            server.requests.append((time.monotonic(), frame))
+            first = server.rate_limited_at is None
+            if first:
+                server.rate_limited_at = time.monotonic()
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if first:
+                self._reply(429, {"error": {"message": "rate limited", "type": "rate_limit"}},
+                            {"retry-after": str(RETRY_AFTER_SECONDS)})
+                return
+            time.sleep(0.05 * (FRAMES - frame))
+            self._reply(200, {
+                "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": f"frame {frame}"}}],
+            })
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+@pytest.fixture
+def caption_server(monkeypatch):
+    server = StubCaptionServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("IMAGE_CAPTION_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setenv("IMAGE_RESIZE_WIDTH", "64")
+    monkeypatch.setenv("IMAGE_RESIZE_HEIGHT", "48")
+    get_settings.cache_clear()
+    yield server
+    server.shutdown()
+    server.server_close()
+    get_settings.cache_clear()
+
+
+def test_captions_retry_rate_limits_within_the_concurrency_cap(caption_server):
+    # frame i is a flat grey of level 40 * i, which survives resizing and JPEG
+    frames = [np.full((96, 128, 3), 40 * index, dtype=np.uint8) for index in range(FRAMES)]
+
+    async def caption_all():
+        captioner = FrameCaptioner(concurrency=2, max_retries=2)
+        return captioner, await asyncio.gather(*(captioner.caption(frame) for frame in frames))
+
+    captioner, captions = asyncio.run(caption_all())
+
+    assert captions == [f"frame {index}" for index in range(FRAMES)]
+    assert captioner.retries == 1
+    assert captioner.requests == FRAMES + 1
+    assert caption_server.max_in_flight == 2
+    # the rate limited frame was retried after Retry-After, not straight away
+    limited_frame = caption_server.requests[0][1]
+    retried_at = next(at for at, frame in caption_server.requests[1:] if frame == limited_frame)
+    assert retried_at - caption_server.rate_limited_at >= RETRY_AFTER_SECONDS
@@ -0,0 +1,98 @@
+from types import SimpleNamespace
+
+from kubric_mcp.services import clip_service
+from kubric_mcp.services.clip_service import ClipService, SourceStreams, exact_cut_boundaries
+
+
+KEYFRAMES = [0.0, 2.0, 4.0, 6.0, 8.0, 10.0]
+
+
+def streams(**overrides) -> SourceStreams:
+    options = dict(video_codec="h264", profile="High", level=40, pix_fmt="yuv420p", audio_codec="aac",
+                   duration=10.0)
+    options.update(overrides)
+    return SourceStreams(**options)
+
+
+def service(search_seconds: float = 3.0) -> ClipService:
+    clips = ClipService(minio=None)
+    clips.settings = SimpleNamespace(CLIP_KEYFRAME_SEARCH_SECONDS=search_seconds, CLIP_ENCODER_PRESET="veryfast")
+    return clips
+
+
+def fake_probe(monkeypatch, keyframes):
+    windows = []
+
+    def probe_keyframes(url, start, end):
+        windows.append((start, end))
+        return [k for k in keyframes if max(start, 0) <= k <= end]
+
+    monkeypatch.setattr(clip_service, "probe_keyframes", probe_keyframes)
+    return windows
+
+
+def test_keyframe_before_snaps_to_previous_keyframe(monkeypatch):
+    fake_probe(monkeypatch, KEYFRAMES)
+    clips = service()
+    assert clips._keyframe_before("url", 5.3) == 4.0
+    assert clips._keyframe_before("url", 6.0) == 6.0
+
+
+def test_keyframe_before_widens_the_search_window(monkeypatch):
+    windows = fake_probe(monkeypatch, [0.0, 20.0])
+    assert service(search_seconds=3.0)._keyframe_before("url", 15.0) == 0.0
+    assert [start for start, _ in windows] == [12.0, 9.0, 3.0, -9.0]
+
+
+def test_keyframe_before_falls_back_to_start(monkeypatch):
+    fake_probe(monkeypatch, [])
+    assert service()._keyframe_before("url", 1.0) == 0.0
+
+
+def test_exact_cut_boundaries_use_first_and_last_inner_keyframes():
+    assert exact_cut_boundaries(streams(), KEYFRAMES, 1.5, 8.5) == (2.0, 8.0)
+
+
+def test_exact_cut_without_audio():
+    assert exact_cut_boundaries(streams(audio_codec=None), KEYFRAMES, 1.5, 8.5) == (2.0, 8.0)
+
+
+def test_exact_cut_reencodes_unmatched_sources():
+    for source in (streams(video_codec="hevc"), streams(audio_codec="mp3"), streams(audio_codec="opus"),
+                   streams(audio_codec="ac3"), streams(profile="High 4:4:4 Intra"), streams(level=None)):
+        assert exact_cut_boundaries(source, KEYFRAMES, 1.5, 8.5) is None
+
+
+def test_exact_cut_reencodes_ranges_within_one_gop():
+    # a single inner keyframe leaves no body to copy
+    assert exact_cut_boundaries(streams(), KEYFRAMES, 1.5, 3.5) is None
+    # keyframes on the boundaries themselves are not inner
+    assert exact_cut_boundaries(streams(), KEYFRAMES, 2.0, 4.0) is None
+
+
+def test_cut_exact_matches_source_profile(monkeypatch, tmp_path):
+    fake_probe(monkeypatch, KEYFRAMES)
+    commands = []
+    monkeypatch.setattr(clip_service, "_run", lambda command: commands.append(command) or "")
+    service()._cut_exact("url", streams(profile="Main", level=31), 1.5, 8.5, tmp_path)
+
+    head, body, tail, join = commands
+    for command in (head, tail):
+        assert command[command.index("-c:v") + 1] == "libx264"
+        assert command[command.index("-profile:v") + 1] == "main"
+        assert command[command.index("-level:v") + 1] == "3.1"
+        assert command[command.index("-pix_fmt") + 1] == "yuv420p"
+    assert body[body.index("-c") + 1] == "copy"
+    assert join[join.index("-i") + 1].startswith("concat:")
+
+
+def test_cut_exact_falls_back_to_full_reencode(monkeypatch, tmp_path):
+    fake_probe(monkeypatch, KEYFRAMES)
+    commands = []
+    monkeypatch.setattr(clip_service, "_run", lambda command: commands.append(command) or "")
+    output = service()._cut_exact("url", streams(audio_codec="opus"), 1.5, 8.5, tmp_path)
+
+    [command] = commands
+    assert command[-1] == str(output)
+    assert command[command.index("-c:a") + 1] == "aac"
+    assert "-profile:v" not in command
@@ -0,0 +1,123 @@
+import asyncio
+import io
+import threading
+import time
+
+from kubric_mcp.video.ingestion import transcriber
+from kubric_mcp.video.ingestion.transcriber import AdaptiveConcurrencyLimiter, OverflowTranscriber
+
+
+class SlowStubBackend(transcriber.StubTranscriptionBackend):
+    name = "slow-stub"
+    created = 0
+
+    def __init__(self):
+        # widen the window between the cache check and the insert
+        time.sleep(0.1)
+        SlowStubBackend.created += 1
+        super().__init__()
+
+
+class FixedBackend(transcriber.StubTranscriptionBackend):
+    """Stub whose saturation is set by the test"""
+
+    def __init__(self, name: str, saturated: bool):
+        super().__init__()
+        self.name = name
+        self._saturated = saturated
+
+    @property
+    def saturated(self) -> bool:
+        return self._saturated
+
+    async def transcribe(self, buffer):
+        self.requests += 1
+        return self.name
+
+
+def limiter(**overrides) -> AdaptiveConcurrencyLimiter:
+    options = dict(initial_limit=4, min_limit=1, max_limit=6, latency_target_seconds=1.0, cooldown_seconds=60.0)
+    options.update(overrides)
+    return AdaptiveConcurrencyLimiter(**options)
+
+
+def test_limiter_grows_one_slot_per_window_of_fast_successes():
+    async def run():
+        limit = limiter()
+        for _ in range(3):
+            await limit.on_success(0.1)
+        assert limit.limit == 4
+        await limit.on_success(0.1)
+        assert limit.limit == 5
+        # the next window is the new limit long, and growth stops at max_limit
+        for _ in range(5 + 6 + 6):
+            await limit.on_success(0.1)
+        return limit.limit
+
+    assert asyncio.run(run()) == 6
+
+
+def test_limiter_halves_on_overload_once_per_cooldown():
+    async def run():
+        limit = limiter(initial_limit=6, cooldown_seconds=60.0)
+        await limit.on_overload()
+        assert limit.limit == 3
+        # a burst of 429s from the same window counts once
+        await limit.on_overload()
+        await limit.on_success(5.0)
+        assert limit.limit == 3
+        limit._last_decrease -= 61
+        # a slow response is an overload too, and the floor is min_limit
+        await limit.on_success(5.0)
+        assert limit.limit == 1
+        limit._last_decrease -= 61
+        await limit.on_overload()
+        return limit.limit
+
+    assert asyncio.run(run()) == 1
+
+
+def test_limiter_blocks_acquire_at_the_limit():
+    async def run():
+        limit = limiter(initial_limit=1)
+        await limit.acquire()
+        assert limit.saturated
+        waiter = asyncio.create_task(limit.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await limit.release()
+        await asyncio.wait_for(waiter, 1)
+        return limit.in_flight
+
+    assert asyncio.run(run()) == 1
+
+
+def test_overflow_routes_only_while_primary_is_saturated():
+    async def transcribe(router):
+        return await router.transcribe(io.BytesIO(b"chunk"))
+
+    idle = OverflowTranscriber(FixedBackend("primary", False), FixedBackend("overflow", False))
+    busy = OverflowTranscriber(FixedBackend("primary", True), FixedBackend("overflow", False))
+    both = OverflowTranscriber(FixedBackend("primary", True), FixedBackend("overflow", True))
+
+    assert asyncio.run(transcribe(idle)) == "primary"
+    assert asyncio.run(transcribe(busy)) == "overflow"
+    # with both saturated the chunk queues on the primary
+    assert asyncio.run(transcribe(both)) == "primary"
+    assert (idle.overflowed, busy.overflowed, both.overflowed) == (0, 1, 0)
+    assert both.saturated and not busy.saturated
+
+
+def test_concurrent_first_calls_share_one_backend(monkeypatch):
+    monkeypatch.setitem(transcriber.BACKENDS, SlowStubBackend.name, SlowStubBackend)
+    monkeypatch.setattr(transcriber, "_backends", {})
+    backends = []
+    threads = [threading.Thread(target=lambda: backends.append(
+        transcriber.get_transcription_backend(SlowStubBackend.name))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert SlowStubBackend.created == 1
+    assert len({id(backend) for backend in backends}) == 1
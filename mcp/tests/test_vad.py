@@ -0,0 +1,86 @@
+import numpy as np
+
+from kubric_mcp.video.ingestion.audio_stream import SAMPLE_RATE, AudioChunk
+from kubric_mcp.video.ingestion.vad import SpeechChunkMerger, VoiceActivityDetector
+
+
+def tone(seconds: float, frequency: float = 200.0, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * 32767 * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16)
+
+
+def test_silence_is_not_speech():
+    detector = VoiceActivityDetector()
+    assert detector.speech_ratio(silence(2)) == 0.0
+    assert not detector.is_speech(silence(2))
+
+
+def test_shorter_than_a_frame_is_not_speech():
+    assert VoiceActivityDetector().speech_ratio(silence(0.01)) == 0.0
+
+
+def test_voiced_bursts_are_speech():
+    # syllable-like bursts between pauses, the pauses set the noise floor
+    pcm = np.concatenate([np.concatenate([tone(0.3), silence(0.2)]) for _ in range(4)])
+    detector = VoiceActivityDetector()
+    assert 0.5 <= detector.speech_ratio(pcm) <= 0.65
+    assert detector.is_speech(pcm)
+
+
+def test_steady_hum_is_not_speech():
+    # loud but never above its own noise floor
+    assert not VoiceActivityDetector().is_speech(tone(2, frequency=60))
+
+
+def test_broadband_noise_is_not_speech():
+    noise = np.random.default_rng(0).normal(0, 0.3 * 32767, 2 * SAMPLE_RATE)
+    pcm = np.concatenate([silence(0.5), np.clip(noise, -32768, 32767).astype(np.int16)])
+    assert VoiceActivityDetector().speech_ratio(pcm) == 0.0
+
+
+def chunk(index: int, start: int, end: int) -> AudioChunk:
+    # one sample per millisecond, valued by its timestamp
+    return AudioChunk(chunk_index=index, start_time=start, end_time=end, pcm=np.arange(start, end))
+
+
+def test_merger_joins_overlapping_chunks_once():
+    merger = SpeechChunkMerger(max_seconds=60, sample_rate=1000)
+    assert merger.push(chunk(0, 0, 10000)) == []
+    assert merger.push(chunk(1, 9000, 19000)) == []
+    [merged] = merger.flush()
+    assert (merged.chunk_index, merged.start_time, merged.end_time) == (0, 0, 19000)
+    assert merged.merged_chunk_indexes == [1]
+    np.testing.assert_array_equal(merged.pcm, np.arange(0, 19000))
+
+
+def test_merger_joins_adjacent_chunks():
+    merger = SpeechChunkMerger(max_seconds=60, sample_rate=1000)
+    merger.push(chunk(0, 0, 10000))
+    merger.push(chunk(1, 10000, 20000))
+    [merged] = merger.flush()
+    np.testing.assert_array_equal(merged.pcm, np.arange(0, 20000))
+
+
+def test_merger_splits_on_gap():
+    merger = SpeechChunkMerger(max_seconds=60, sample_rate=1000)
+    merger.push(chunk(0, 0, 10000))
+    [first] = merger.push(chunk(2, 20000, 30000))
+    assert (first.chunk_index, first.end_time, first.merged_chunk_indexes) == (0, 10000, [])
+    [second] = merger.flush()
+    assert (second.chunk_index, second.start_time) == (2, 20000)
+    assert merger.flush() == []
+
+
+def test_merger_caps_merged_length():
+    merger = SpeechChunkMerger(max_seconds=20, sample_rate=1000)
+    merger.push(chunk(0, 0, 10000))
+    # exactly max_seconds still merges
+    assert merger.push(chunk(1, 10000, 20000)) == []
+    [full] = merger.push(chunk(2, 20000, 30000))
+    assert (full.start_time, full.end_time, full.merged_chunk_indexes) == (0, 20000, [1])
+    [rest] = merger.flush()
+    assert (rest.chunk_index, rest.start_time, rest.end_time) == (2, 20000, 30000)
@@ -7,28 +7,43 @@ export default function VideoUpload() {
     const file = event.target.files?.[0]
     if(file){
       try{
-        const formData = new FormData()
-      formData.append('file',file)
+        // the API only signs the upload, the video goes straight to MinIO
+        const presignResponse = await fetch('http://localhost:8080/uploads/presign', {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json"
+          },
+          body: JSON.stringify({
+            filename: file.name,
+            content_type: file.type || "video/mp4"
+          })
+        })
+        if(!presignResponse.ok){
+          throw new Error(`presign failed: ${presignResponse.status}`)
+        }
+        const presigned = await presignResponse.json()
 
-      const uploadResponse = await fetch('http://localhost:8080/upload-video', {
-        method:"POST",
-        body: formData
-      }).then(async (res)=>{
-        const response = await res.json()
-        const processVideoResponse = await 
-          fetch("http://localhost:8080/process-video", {
-                    method: "POST",
-                    headers: {
-                      "Content-Type": "application/json"
-                    },
-                    body: JSON.stringify({
-                      video_path: response.video_path
-                    })
-                  })
-          const videoResponse = await processVideoResponse.json()
-          console.log(videoResponse)
-        
-      })
+        const uploadResponse = await fetch(presigned.upload_url, {
+          method: "PUT",
+          headers: presigned.headers,
+          body: file
+        })
+        if(!uploadResponse.ok){
+          throw new Error(`upload failed: ${uploadResponse.status}`)
+        }
+
+        const completeResponse = await fetch('http://localhost:8080/uploads/complete', {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json"
+          },
+          body: JSON.stringify({
+            object_name: presigned.object_name,
+            original_filename: file.name
+          })
+        })
+        const videoResponse = await completeResponse.json()
+        console.log(videoResponse)
 
       }catch(e){
         console.log("Error in video uploading", e);